@@ -53,6 +53,8 @@ setup(
         "console_scripts": [
             "wiki-music-gui=wiki_music.app_gui:main",
             "wiki-music-cli=wiki_music.app_cli:main",
+            "wiki-music-server=wiki_music.app_server:main",
+            "wiki-music-client=wiki_music.app_client:main",
         ]
     },
 )
@@ -0,0 +1,77 @@
+"""Compare tag writing throughput of bounded and per device thread pools.
+
+Synthetic library is created by copying test music files to temporary
+directory, or to directory given as first argument to benchmark a specific
+disk. Each file is written twice, first write grows the tags so the whole
+file is rewritten, second one fits in padding.
+
+Usage: python bench_tag_writer.py [directory] [number of files]
+"""
+
+import shutil
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from wiki_music.library.tags_handler import TagCache
+from wiki_music.library.tags_io import read_tags, write_tags
+from wiki_music.utilities.parser_utils import DeviceThreadPool, ThreadPool
+from wiki_music.utilities.utils import device_kind
+
+MUSIC = Path(__file__).parent / "test_music"
+
+
+def make_library(root: Path, n_files: int):
+    sources = sorted(MUSIC.glob("Aventine.*"))
+    sources = [s for s in sources if s.suffix != ".jpg"]
+
+    for i in range(n_files):
+        source = sources[i % len(sources)]
+        album = root / f"album_{i // 12:03d}"
+        album.mkdir(parents=True, exist_ok=True)
+        shutil.copy(source, album / f"{i % 12:02d} track{source.suffix}")
+
+
+def write_all(pool_class, root: Path, lyrics: str) -> float:
+    TagCache.clear()
+
+    data = []
+    for path in sorted(root.rglob("*.*")):
+        tags = read_tags(path)
+        tags.update(FILE=str(path), TYPE="", LYRICS=lyrics)
+        data.append(tags)
+
+    kwargs = {}
+    if pool_class is DeviceThreadPool:
+        kwargs["paths"] = [Path(d["FILE"]) for d in data]
+
+    start = time.perf_counter()
+    t = pool_class(write_tags, [(d, ) for d in data],
+                   progress=lambda *args: None, **kwargs)
+    t.run()
+    t.results()
+    return time.perf_counter() - start
+
+
+def main():
+    base = Path(sys.argv[1]) if len(sys.argv) > 1 else None
+    n_files = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+
+    with TemporaryDirectory(dir=base) as tmp:
+        root = Path(tmp)
+        print(f"device kind: {device_kind(root)[1]}, files: {n_files}")
+
+        for pool_class in (ThreadPool, DeviceThreadPool):
+            make_library(root / pool_class.__name__, n_files)
+
+        for run, lyrics in enumerate(("a" * 20000, "b" * 21000), 1):
+            for pool_class in (ThreadPool, DeviceThreadPool):
+                elapsed = write_all(pool_class, root / pool_class.__name__,
+                                    lyrics)
+                print(f"write {run} {pool_class.__name__:>16}: "
+                      f"{elapsed:6.2f} s, {n_files / elapsed:7.1f} files/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from wiki_music.library.parser import WikipediaRunner
+from wiki_music.utilities.journal import Journal
+
+STAGES = ("get_wiki", "basic_out", "get_release_date", "get_genres",
+          "get_contents", "get_cover_art", "get_tracks", "get_personnel",
+          "get_composers", "save_lyrics", "write_tags")
+
+
+class TestRunBatch(unittest.TestCase):
+    """Test that batch run resumes after the last completed stage."""
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.journal = Journal(self.dir / "journal.jsonl")
+
+        patcher = mock.patch("wiki_music.library.parser.process_page.NLTK")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_batch(self, work_dir: Path, fail: str = ""):
+        """Run batch on album with page processing methods mocked out.
+
+        Method named by `fail` raises, as if the run was interrupted there.
+        """
+        parser = WikipediaRunner(album="Album", band="Band",
+                                 work_dir=work_dir, GUI=False)
+
+        def cover_art(*args, **kwargs):
+            parser.COVERART = b"cover"
+
+        def lyrics(*args, **kwargs):
+            parser._lyrics, parser._lyric_sources = [], []
+
+        def wiki():
+            offline.append(parser.offline_debug)
+
+        offline = []
+        methods = {m: mock.Mock(name=m) for m in STAGES}
+        methods["get_wiki"].side_effect = wiki
+        methods["get_cover_art"].side_effect = cover_art
+        methods["save_lyrics"].side_effect = lyrics
+        methods["write_tags"].return_value = True
+        if fail:
+            methods[fail].side_effect = RuntimeError("interrupted")
+
+        with mock.patch.multiple(WikipediaRunner, **methods), \
+                mock.patch.object(WikipediaRunner, "files",
+                                  new_callable=mock.PropertyMock,
+                                  return_value=[]):
+            if fail:
+                with self.assertLogs("wiki_music.library.parser", "ERROR"):
+                    parser.run_batch(self.journal)
+            else:
+                parser.run_batch(self.journal)
+
+        called = [m for m in STAGES if methods[m].called]
+        return parser, called, offline
+
+    def test_resume(self):
+        # method that fails and methods run again after restart
+        cases = {
+            "page": ("get_release_date", STAGES),
+            "parsed": ("save_lyrics", ("save_lyrics", "write_tags")),
+            "lyrics": ("write_tags", ("write_tags", )),
+            "tags": ("", ()),
+        }
+
+        for stage, (fail, again) in cases.items():
+            with self.subTest(stage=stage):
+                work_dir = self.dir / stage
+                self.run_batch(work_dir, fail=fail)
+
+                parser, called, offline = self.run_batch(work_dir)
+                self.assertEqual(called, list(again))
+                if stage == "page":
+                    self.assertEqual(offline, [True])
+                if stage in ("parsed", "lyrics"):
+                    self.assertEqual(parser.COVERART, b"cover")
+
+    def test_same_title(self):
+        first, _, _ = self.run_batch(self.dir / "Band" / "Album")
+        second, _, _ = self.run_batch(self.dir / "Other" / "Album")
+
+        self.assertNotEqual(first.debug_folder, second.debug_folder)
+        for parser in (first, second):
+            self.assertEqual(parser.debug_folder.parent, self.dir / "journal")
+            self.assertTrue((parser.debug_folder / "cover.jpg").is_file())
+
+
+if __name__ == '__main__':
+    unittest.main()
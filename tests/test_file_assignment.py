@@ -5,7 +5,14 @@ from pathlib import Path
 from random import seed, shuffle
 from unittest import TestCase, main, mock
 
+import numpy as np
+
 from wiki_music.library.parser import in_out
+import rapidfuzz.fuzz as fuzz
+from rapidfuzz.utils import default_process
+
+from wiki_music.utilities import (linear_assignment, normalize_caseless,
+                                  score_matrix)
 
 logging.basicConfig(stream=sys.stderr)
 log = logging.getLogger(__name__)
@@ -46,6 +53,7 @@ class TestFileAssignment(TestCase):
                 with mock.patch(self.mock_this, return_value=shuffle_files):
 
                     self.parser.work_dir = wd
+                    self.parser.files = []
                     self.parser._tracks = tracks
                     self.parser._types = [""] * len(tracks)
 
@@ -75,6 +83,7 @@ class TestFileAssignment(TestCase):
                 with mock.patch(self.mock_this, return_value=shuffle_files):
 
                     self.parser.work_dir = wd
+                    self.parser.files = []
                     self.parser._tracks = tracks
                     self.parser._types = [""] * len(tracks)
 
@@ -91,7 +100,6 @@ class TestFileAssignment(TestCase):
 
                 tracks = [c.split("::")[0] for c in check_file]
                 files = [wd / c.split("::")[1] for c in check_file]
-                shuffle(files)
 
                 log.debug("test less files")
                 log.debug(tracks)
@@ -103,16 +111,134 @@ class TestFileAssignment(TestCase):
                 shuffle_files = shuffle_files[:half]
                 shuffle(shuffle_files)
 
-                with mock.patch(self.mock_this, return_value=files):
+                with mock.patch(self.mock_this, return_value=shuffle_files):
 
                     self.parser.work_dir = wd
+                    self.parser.files = []
                     self.parser._tracks = tracks
                     self.parser._types = [""] * len(tracks)
 
-                    files = files + [None] * half
+                    files = [f if f in shuffle_files else None for f in files]
                     self.assertSequenceEqual(files, self.parser.files,
                                              f"test failed for:"
                                              f" {band.name} - {album.name}")
 
+
+class TestAssignmentCues(TestCase):
+
+    def setUp(self):
+        self.parser = in_out.ParserInOut(protected_vars=True)
+        self.parser.work_dir = Path("album")
+        self.mock_this = "wiki_music.library.parser.in_out.list_files"
+
+    def test_disc_cues(self):
+        # same titles on both discs can only be told apart by numbers
+        files = [Path("album/CD 1/01 - Intro.mp3"),
+                 Path("album/CD 1/02 - Outro.mp3"),
+                 Path("album/CD 2/01 - Intro.mp3"),
+                 Path("album/CD 2/02 - Outro.mp3")]
+        shuffled = [files[3], files[0], files[2], files[1]]
+
+        self.parser._tracks = ["Intro", "Outro", "Intro", "Outro"]
+        self.parser._types = [""] * 4
+        self.parser._numbers = ["1", "2", "1", "2"]
+        self.parser._disc_num = [1, 1, 2, 2]
+
+        with mock.patch(self.mock_this, return_value=shuffled):
+            self.assertSequenceEqual(files, self.parser.files)
+
+    def test_unmatched(self):
+        files = [Path("album/Distance.mp3"), Path("album/Someday.mp3"),
+                 Path("album/interview.mp3")]
+
+        self.parser._tracks = ["Someday", "Paradox", "Distance"]
+        self.parser._types = [""] * 3
+
+        with mock.patch(self.mock_this, return_value=files):
+            self.assertSequenceEqual([files[1], None, files[0]],
+                                     self.parser.files)
+
+    def test_durations(self):
+        # names are identical, only lengths tell the files apart
+        files = [Path("album/Intro.mp3"), Path("album/Intro.flac")]
+
+        self.parser._tracks = ["Intro", "Intro"]
+        self.parser._types = ["", ""]
+        self.parser._durations = [61.0, 242.0]
+
+        with mock.patch(self.mock_this, return_value=files[::-1]), \
+                mock.patch.object(in_out.LibraryIndex, "durations",
+                                  return_value=[240.5, 60.0]):
+            self.assertSequenceEqual(files, self.parser.files)
+
+    def test_duration_mismatch(self):
+        files = [Path("album/Distance.mp3")]
+
+        self.parser._tracks = ["Distance"]
+        self.parser._types = [""]
+        self.parser._durations = [320.0]
+
+        with mock.patch(self.mock_this, return_value=files), \
+                mock.patch.object(in_out.LibraryIndex, "durations",
+                                  return_value=[180.0]):
+            self.assertSequenceEqual([None], self.parser.files)
+
+    def test_checkpoint(self):
+        files = [Path("album/Intro.mp3"), Path("album/Intro.flac")]
+
+        self.parser._tracks = ["Intro", "Intro"]
+        self.parser._types = ["", ""]
+        self.parser._durations = [61.0, 242.0]
+
+        # lengths survive batch restart and still tell the files apart
+        restored = in_out.ParserInOut(protected_vars=True)
+        restored.from_checkpoint(self.parser.to_checkpoint())
+
+        with mock.patch(self.mock_this, return_value=files[::-1]), \
+                mock.patch.object(in_out.LibraryIndex, "durations",
+                                  return_value=[240.5, 60.0]):
+            self.assertSequenceEqual(files, restored.files)
+
+
+class TestLinearAssignment(TestCase):
+
+    def test_optimal(self):
+        cost = np.array([[4, 1, 3], [2, 0, 5], [3, 2, 2]])
+        rows, cols = linear_assignment(cost)
+        self.assertEqual(rows.tolist(), [0, 1, 2])
+        self.assertEqual(cols.tolist(), [1, 0, 2])
+
+    def test_rectangular(self):
+        cost = np.array([[1, 9], [9, 1], [0, 0]])
+        rows, cols = linear_assignment(cost)
+        self.assertEqual(cost[rows, cols].sum(), 1)
+        self.assertEqual(len(rows), 2)
+
+
+class TestScoreMatrix(TestCase):
+
+    queries = ["01 Aventine", "Straße Heaven", "", "live at wacken"]
+    choices = ["Aventine.flac", "STRASSE heaven", "Wacken (Live)", "x"]
+
+    def pairwise(self):
+        return np.array([[fuzz.token_set_ratio(normalize_caseless(q),
+                                               normalize_caseless(c),
+                                               processor=default_process)
+                          for c in self.choices] for q in self.queries])
+
+    def test_cdist(self):
+        np.testing.assert_array_equal(
+            score_matrix(self.queries, self.choices), self.pairwise())
+
+    def test_mask(self):
+        mask = np.eye(len(self.queries), len(self.choices), dtype=bool)
+        np.testing.assert_array_equal(
+            score_matrix(self.queries, self.choices, mask=mask),
+            np.where(mask, self.pairwise(), 0))
+
+    def test_empty(self):
+        self.assertEqual(score_matrix([], self.choices).shape, (0, 4))
+
+
 if __name__ == '__main__':
     main()
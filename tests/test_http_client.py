@@ -0,0 +1,43 @@
+import unittest
+from unittest import mock
+
+import requests
+
+from wiki_music.constants import HTTP_TIMEOUT
+from wiki_music.utilities import HttpClient, get_sizes
+
+
+class TestHttpClient(unittest.TestCase):
+    """Test that requests share one session with default timeout."""
+
+    def setUp(self):
+        HttpClient.close()
+        self.addCleanup(HttpClient.close)
+
+    def test_shared(self):
+        self.assertIs(HttpClient.session(), HttpClient.session())
+
+        adapter = HttpClient.session().get_adapter("https://example.com")
+        self.assertGreater(adapter.max_retries.total, 0)
+
+    def test_timeout(self):
+        with mock.patch.object(HttpClient.session(), "get") as get:
+            HttpClient.get("https://example.com")
+            HttpClient.get("https://example.com", timeout=1)
+
+        self.assertEqual(get.call_args_list[0][1]["timeout"], HTTP_TIMEOUT)
+        self.assertEqual(get.call_args_list[1][1]["timeout"], 1)
+
+    def test_sizes_error(self):
+        response = mock.Mock()
+        response.raise_for_status.side_effect = requests.HTTPError("404")
+
+        with mock.patch.object(HttpClient, "get", return_value=response):
+            self.assertEqual(get_sizes("https://example.com/cover.jpg"),
+                             (None, None))
+
+        response.close.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import shutil
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from wiki_music.library import index
+from wiki_music.library.index import LibraryIndex
+from wiki_music.library.tags_io import read_tags
+from wiki_music.utilities import ThreadPool
+
+
+class TestLibraryIndex(unittest.TestCase):
+    """Test that index serves unchanged files and re-reads changed ones."""
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        for f in ("Aventine.mp3", "Aventine.flac", "Aventine.m4a"):
+            shutil.copy(Path(__file__).parent / "test_music" / f, self.dir)
+        self.files = sorted(self.dir.glob("Aventine.*"))
+
+        LibraryIndex.close()
+        self._path = LibraryIndex._path
+        LibraryIndex._path = self.dir / "index.sqlite"
+
+    def tearDown(self):
+        LibraryIndex.close()
+        LibraryIndex._path = self._path
+        self.tmp.cleanup()
+
+    def test_cached(self):
+        self.assertEqual(LibraryIndex.lookup(self.files), [None] * 3)
+
+        records = LibraryIndex.read_tags(self.files, multi_threaded=False)
+        cached = LibraryIndex.lookup(self.files)
+
+        self.assertEqual(records, cached)
+        for f, record in zip(self.files, cached):
+            with self.subTest(file=f.name):
+                tags = read_tags(f)
+                self.assertGreater(record.pop("DURATION"), 0)
+                self.assertEqual(record, tags)
+
+    def test_changed(self):
+        LibraryIndex.read_tags(self.files, multi_threaded=False)
+
+        stat = self.files[0].stat()
+        os.utime(self.files[0], ns=(stat.st_atime_ns,
+                                    stat.st_mtime_ns + 10**9))
+
+        self.assertIsNone(LibraryIndex.lookup(self.files)[0])
+        self.assertIsNotNone(LibraryIndex.lookup(self.files)[1])
+
+    def test_large_directory(self):
+        with mock.patch.object(index, "PROCESS_POOL_MIN_FILES", 1), \
+                mock.patch.object(index, "ProcessPool",
+                                  side_effect=ThreadPool) as pool:
+            files, records = LibraryIndex.read_stream(iter(self.files))
+
+        # files over the limit are read in process pool
+        self.assertEqual(pool.call_args[0][1],
+                         [(f, ) for f in self.files[1:]])
+        self.assertEqual(files, self.files)
+        self.assertEqual(records, LibraryIndex.lookup(self.files))
+
+    def test_prune(self):
+        LibraryIndex.read_tags(self.files, multi_threaded=False)
+        self.files[0].unlink()
+
+        LibraryIndex.read_stream(iter(self.files[1:]), multi_threaded=False,
+                                 directory=self.dir)
+
+        connection = LibraryIndex._connect()
+        paths = [r[0] for r in connection.execute("SELECT path FROM files")]
+        self.assertCountEqual(paths, [str(f) for f in self.files[1:]])
+
+    def test_unreadable(self):
+        broken = self.dir / "broken.mp3"
+        broken.write_bytes(b"not a music file")
+
+        files, records = LibraryIndex.read_stream(
+            iter(self.files + [broken]), multi_threaded=False)
+
+        # unreadable file is left out so the tag lists stay aligned
+        self.assertEqual(files, self.files)
+        self.assertEqual(len(records), len(self.files))
+
+    def test_progress(self):
+        LibraryIndex.read_tags(self.files[:1], multi_threaded=False,
+                               progress=lambda a, m: None)
+
+        for indexed in ("partly", "fully"):
+            with self.subTest(indexed=indexed):
+                ticks = []
+                LibraryIndex.read_stream(
+                    iter(self.files), progress=lambda a, m: ticks.append(
+                        (a, m)))
+                # both index hits and files read in threads are counted
+                self.assertEqual(max(ticks), (3, 3))
+
+        ticks = []
+        LibraryIndex.read_tags(self.files,
+                               progress=lambda a, m: ticks.append((a, m)))
+        self.assertEqual(ticks, [(3, 3)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from wiki_music.utilities.journal import Journal
+
+
+class TestJournal(unittest.TestCase):
+    """Test that batch run journal survives restarts and file changes."""
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.path = self.dir / "journal.jsonl"
+        self.song = self.dir / "song.mp3"
+        self.song.write_bytes(b"data")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_replay(self):
+        Journal(self.path).record("album", "lyrics", data=[["la"], [None]])
+
+        journal = Journal(self.path)
+        self.assertTrue(journal.done("album", "lyrics"))
+        self.assertFalse(journal.done("album", "tags"))
+        self.assertEqual(journal.data("album", "lyrics"), [["la"], [None]])
+
+    def test_changed_files(self):
+        Journal(self.path).record("album", "tags", files=[self.song, None])
+
+        stat = self.song.stat()
+        os.utime(self.song, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        self.assertFalse(Journal(self.path).done("album", "tags"))
+
+    def test_corrupted_line(self):
+        Journal(self.path).record("album", "page")
+        with self.path.open("a") as f:
+            f.write('{"album": "album", "sta')
+
+        self.assertTrue(Journal(self.path).done("album", "page"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from wiki_music.utilities.utils import iter_files, list_files
+
+
+class TestListFiles(unittest.TestCase):
+    """Test directory walker on small tree with symlink loop."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+        for d in ("a", "a/b", "c"):
+            (self.root / d).mkdir()
+
+        self.music = [self.root / f for f in
+                      ("1.mp3", "a/2.flac", "a/b/3.m4a", "c/4.mp3")]
+        for f in self.music:
+            f.touch()
+
+        for f in ("cover.jpg", "a/notes.txt", "a/b/mp3"):
+            (self.root / f).touch()
+
+        try:
+            os.symlink(self.root, self.root / "a" / "b" / "loop")
+        except (OSError, NotImplementedError):
+            self.skipTest("symbolic links are not supported")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_recurse(self):
+        self.assertEqual(list_files(self.root), sorted(self.music))
+
+    def test_no_recurse(self):
+        self.assertEqual(list_files(self.root, recurse=False),
+                         [self.root / "1.mp3"])
+
+    def test_image(self):
+        self.assertEqual(list(iter_files(self.root, file_type="image")),
+                         [self.root / "cover.jpg"])
+
+    def test_missing(self):
+        self.assertEqual(list_files(self.root / "missing"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
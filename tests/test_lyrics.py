@@ -0,0 +1,201 @@
+import asyncio
+import unittest
+from concurrent.futures import Future
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from wiki_music.library import batch, lyrics
+from wiki_music.library.lyrics import LyricsPrefetch, _find_duplicates
+from wiki_music.library.lyrics_cache import LyricsCache
+from wiki_music.library.parser import in_out
+
+
+class TestDuplicates(unittest.TestCase):
+    """Test that tracks with the same lyrics are downloaded once."""
+
+    TRACKS = ["Aventine", "Love", "Love Song", "Song", "Aventine (Live)",
+              "Medley", "Medley", "Aventine", "Rivers - Demo Version",
+              "Rivers", "Sancta Terra"]
+    TYPES = ["", "", "", "", "Live", "Acoustic Folk Medley", "", "Acoustic",
+             "", "", "Instrumental"]
+
+    def test_groups(self):
+        self.assertEqual(_find_duplicates(self.TRACKS[:-1],
+                                          self.TYPES[:-1]),
+                         [[0, 4, 7], [1, 2], [3], [5], [6], [8, 9]])
+
+    def test_order(self):
+        reverse = _find_duplicates(self.TRACKS[:-1][::-1],
+                                   self.TYPES[:-1][::-1])
+        last = len(self.TRACKS) - 2
+
+        self.assertEqual(sorted(sorted(last - i for i in g) for g in reverse),
+                         [[0, 4, 7], [1, 2], [3], [5], [6], [8, 9]])
+
+    def test_save(self):
+        def search(songs, key, concurrency):
+            return [{"lyrics": f"lyrics of {s[2]}", "artist": s[0],
+                     "title": s[2], "origin": {"source_name": "source",
+                                               "source_url": "url"}}
+                    for s in songs]
+
+        with mock.patch.object(lyrics.GoogleApiKey, "value"), \
+                mock.patch.object(lyrics.LyricsEngine, "search",
+                                  side_effect=search) as engine, \
+                mock.patch.object(lyrics.lyricsfinder.ExtractorStats,
+                                  "save"):
+            found, sources = lyrics.save_lyrics(
+                self.TRACKS, self.TYPES, "Epica", "Omega", False, True)
+
+        self.assertEqual(len(engine.call_args[0][0]), 6)
+        self.assertEqual(found[4], "lyrics of Aventine")
+        self.assertEqual(found[8], "lyrics of Rivers")
+        self.assertEqual(found[10], "Instrumental")
+        self.assertEqual(sources, ["url"] * 10 + [None])
+
+
+class TestPrefetch(unittest.TestCase):
+    """Test that prefetched lyrics are cached only when they are used."""
+
+    TRACKS = ["Aventine", "Rivers"]
+    TYPES = ["", ""]
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+
+        LyricsCache.close()
+        self._path = LyricsCache._path
+        LyricsCache._path = Path(self.tmp.name) / "lyrics.sqlite"
+
+        for target, name, kwargs in (
+                (lyrics.GoogleApiKey, "value", {"return_value": "key"}),
+                (lyrics.LyricsEngine, "_find",
+                 {"new": mock.AsyncMock(side_effect=self._find)}),
+                (lyrics.LyricsEngine, "search", {})):
+            patcher = mock.patch.object(target, name, **kwargs)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        LyricsCache.close()
+        LyricsCache._path = self._path
+        self.tmp.cleanup()
+
+    async def _find(self, *args):
+        await asyncio.sleep(0.05)
+        return None
+
+    def _save(self, prefetch, tracks=TRACKS):
+        with mock.patch.object(lyrics.lyricsfinder.ExtractorStats, "save"):
+            return lyrics.save_lyrics(tracks, self.TYPES, "Epica", "Omega",
+                                      False, True, prefetch=prefetch)
+
+    def test_used(self):
+        prefetch = LyricsPrefetch(self.TRACKS, self.TYPES, "Epica",
+                                  "Omega", False, True)
+        self.assertIsNone(LyricsCache.get("Epica", "Omega", "Aventine"))
+
+        found, _ = self._save(prefetch)
+
+        self.assertEqual(found, ["", ""])
+        self.assertEqual(self._find.await_count, 2)
+        self.search.assert_not_called()
+        self.assertIsNotNone(LyricsCache.get("Epica", "Omega", "Aventine"))
+
+    def test_changed(self):
+        prefetch = LyricsPrefetch(self.TRACKS, self.TYPES, "Epica",
+                                  "Omega", False, True)
+        self.search.return_value = []
+
+        self._save(prefetch, tracks=["Aventine", "Kingdom of Heaven"])
+
+        self.search.assert_called_once()
+        self.assertTrue(prefetch._future.cancelled())
+        self.assertIsNone(LyricsCache.get("Epica", "Omega", "Aventine"))
+
+    def test_failed(self):
+        failed = Future()
+        failed.set_exception(RuntimeError("event loop stopped"))
+        self.search.return_value = [
+            {"lyrics": "lyrics", "artist": "Epica", "title": t,
+             "origin": {"source_name": "source", "source_url": "url"}}
+            for t in self.TRACKS]
+
+        with mock.patch.object(lyrics.LyricsEngine, "submit",
+                               return_value=failed):
+            prefetch = LyricsPrefetch(self.TRACKS, self.TYPES, "Epica",
+                                      "Omega", False, True)
+        prefetch._staging.append(("Epica", "Omega", "Aventine", {}))
+        found, _ = self._save(prefetch)
+
+        # failed prefetch falls back to a new search
+        self.search.assert_called_once()
+        self.assertEqual(found, ["lyrics", "lyrics"])
+        self.assertEqual(prefetch._staging, [])
+
+    def test_no_key(self):
+        self.value.return_value = None
+
+        prefetch = LyricsPrefetch(self.TRACKS, self.TYPES, "Epica",
+                                  "Omega", False, True)
+
+        self.assertFalse(prefetch.matches(self.TRACKS, self.TYPES, "Epica",
+                                          "Omega"))
+
+
+class TestFillLyrics(unittest.TestCase):
+    """Test that only tracks without lyrics in tags are searched."""
+
+    def setUp(self):
+        self.parser = in_out.ParserInOut(protected_vars=True)
+        self.parser._album, self.parser._band = "Omega", "Epica"
+        self.parser._tracks = ["Alpha", "Abyss of Time", "Rivers", "Omega"]
+        self.parser._types = ["Instrumental", "", "", ""]
+        self.parser._lyrics = ["", "Eyes on the sky", " ", ""]
+
+    def _save(self, tracks, types, *args):
+        return ([t if t in ("Rivers", "Alpha") else "" for t in tracks],
+                ["url"] * len(tracks))
+
+    def test_missing(self):
+        with mock.patch.object(in_out, "save_lyrics",
+                               side_effect=self._save) as save:
+            filled = self.parser.fill_lyrics()
+
+        self.assertEqual(save.call_args[0][0], ["Alpha", "Rivers", "Omega"])
+        self.assertEqual(filled, [0, 2])
+        self.assertEqual(self.parser._lyrics,
+                         ["Alpha", "Eyes on the sky", "Rivers", ""])
+        self.assertEqual(self.parser._lyric_sources,
+                         ["url", None, "url", None])
+
+    def test_complete(self):
+        self.parser._lyrics = ["Instrumental", "lyrics", "lyrics", "lyrics"]
+
+        with mock.patch.object(in_out, "save_lyrics") as save:
+            self.assertEqual(self.parser.fill_lyrics(), [])
+
+        save.assert_not_called()
+
+    def test_batch_failure(self):
+        albums = [(Path(f"/music/{a}"), a, "Epica") for a in "ABC"]
+        runner = mock.Mock()
+        runner.return_value.run_lyrics.side_effect = [
+            RuntimeError("broken album"), None, RuntimeError("broken album")]
+
+        with TemporaryDirectory() as tmp, \
+                mock.patch.object(batch.BatchRunner, "albums",
+                                  return_value=albums), \
+                mock.patch.object(batch, "WikipediaRunner", runner), \
+                self.assertLogs(batch.log, "ERROR") as logs:
+            batch.BatchRunner(tmp, journal=Path(tmp) / "journal.jsonl",
+                              multi_threaded=False, lyrics_only=True).run()
+
+        # each failed album is reported, the others are still processed
+        self.assertEqual(runner.return_value.run_lyrics.call_count, 3)
+        self.assertEqual(len(logs.records), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
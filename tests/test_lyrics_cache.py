@@ -0,0 +1,73 @@
+import time
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from wiki_music.library import lyrics_cache
+from wiki_music.library.lyrics_cache import LyricsCache
+from wiki_music.library.lyrics_engine import LyricsEngine
+
+
+class TestLyricsCache(unittest.TestCase):
+    """Test that cached lyrics and misses are served without search."""
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+
+        LyricsCache.close()
+        self._path = LyricsCache._path
+        LyricsCache._path = Path(self.tmp.name) / "lyrics.sqlite"
+
+    def tearDown(self):
+        LyricsCache.close()
+        LyricsCache._path = self._path
+        self.tmp.cleanup()
+
+    def _found(self, *args):
+        found = mock.Mock()
+        found.to_dict.return_value = {
+            "title": "Aventine", "artist": "Epica", "release_date": None,
+            "lyrics": "lyrics text",
+            "origin": {"query": "epica aventine", "url": "url",
+                       "source_name": "Darklyrics",
+                       "source_url": "source url"}}
+        return found
+
+    def _search(self, find, *song):
+        with mock.patch.object(LyricsEngine, "_find", find):
+            return LyricsEngine.search([song], "key")[0]
+
+    def test_hit(self):
+        find = mock.AsyncMock(side_effect=self._found)
+
+        first = self._search(find, "Epica", "Omega", "Aventine")
+        second = self._search(find, " EPICA ", "omega", "aventine")
+
+        self.assertEqual(find.await_count, 1)
+        self.assertEqual(second["lyrics"], first["lyrics"])
+        self.assertEqual(second["origin"]["source_url"], "source url")
+
+    def test_miss(self):
+        find = mock.AsyncMock(return_value=None)
+
+        for _ in range(2):
+            response = self._search(find, "Epica", "Omega", "Rivers")
+            self.assertEqual(response["lyrics"], "")
+        self.assertEqual(find.await_count, 1)
+
+        # negative record expires
+        with mock.patch.object(lyrics_cache.time, "time",
+                               return_value=time.time() + 10 ** 8):
+            self.assertIsNone(LyricsCache.get("Epica", "Omega", "Rivers"))
+
+    def test_discard(self):
+        self._search(mock.AsyncMock(side_effect=self._found), "Epica",
+                     "Omega", "Aventine")
+        LyricsCache.discard("Epica", "Omega", "Aventine")
+
+        self.assertIsNone(LyricsCache.get("Epica", "Omega", "Aventine"))
+
+
+if __name__ == "__main__":
+    unittest.main()
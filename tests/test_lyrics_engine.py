@@ -0,0 +1,128 @@
+import time
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Lock
+from unittest import mock
+
+from wiki_music.external_libraries.lyricsfinder import (LyricsManager,
+                                                      SearchPlanner)
+from wiki_music.external_libraries.lyricsfinder.models import (
+    Lyrics, LyricsOrigin)
+from wiki_music.external_libraries.lyricsfinder.models.exceptions import (
+    NoExtractorError)
+from wiki_music.library import lyrics_engine
+from wiki_music.library.lyrics_cache import LyricsCache
+from wiki_music.library.lyrics_engine import LyricsEngine
+
+
+class TestLyricsEngine(unittest.TestCase):
+    """Test that songs of many albums are searched concurrently."""
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+
+        LyricsCache.close()
+        self._path = LyricsCache._path
+        LyricsCache._path = Path(self.tmp.name) / "lyrics.sqlite"
+
+        self.lock = Lock()
+        self.running = 0
+        self.max_running = 0
+
+        for target, name, effect in (
+                (SearchPlanner, "candidates", self._search),
+                (LyricsManager, "extract_lyrics", self._extract),
+                (LyricsManager, "rank_urls", lambda urls: urls)):
+            patcher = mock.patch.object(target, name, side_effect=effect)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        LyricsEngine.stop()
+        LyricsCache.close()
+        LyricsCache._path = self._path
+        self.tmp.cleanup()
+
+    @staticmethod
+    def _search(artist, album, song, key):
+        return song, [{"link": f"http://lyrics.com/{song}"}]
+
+    def _extract(self, url, song, artist):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        with self.lock:
+            self.running -= 1
+        return Lyrics(song, f"lyrics of {song}", artist=artist,
+                      origin=LyricsOrigin(url, "Lyrics", "http://lyrics.com"))
+
+    def test_albums(self):
+        songs = [(f"band {i % 3}", f"album {i % 3}", f"song {i}")
+                 for i in range(12)]
+
+        responses = LyricsEngine.search(songs, "key")
+
+        self.assertEqual([r["title"] for r in responses],
+                         [s[2] for s in songs])
+        self.assertEqual(responses[5]["lyrics"], "lyrics of song 5")
+        # all songs go to the same host
+        self.assertEqual(self.max_running, lyrics_engine.LYRICS_PER_HOST)
+
+    def test_serial(self):
+        songs = [("band", "album", f"song {i}") for i in range(4)]
+
+        LyricsEngine.search(songs, "key", concurrency=1)
+
+        self.assertEqual(self.max_running, 1)
+
+    def test_timeout(self):
+        with mock.patch.object(lyrics_engine, "LYRICS_TIMEOUT", 0.01):
+            response = LyricsEngine.search([("band", "album", "song")],
+                                           "key")[0]
+
+        self.assertEqual(response["lyrics"], "")
+        # timed out searches are not cached as misses
+        self.assertIsNone(LyricsCache.get("band", "album", "song"))
+
+    def test_unavailable(self):
+        LyricsManager.extract_lyrics.side_effect = NoExtractorError("url")
+
+        response = LyricsEngine.search([("band", "album", "song")], "key")[0]
+
+        self.assertEqual(response["lyrics"], "")
+        # failed requests do not prove that lyrics are missing
+        self.assertIsNone(LyricsCache.get("band", "album", "song"))
+
+    def test_missing(self):
+        LyricsManager.extract_lyrics.side_effect = NoExtractorError(
+            "url", missing=True)
+
+        LyricsEngine.search([("band", "album", "song")], "key")
+
+        self.assertEqual(LyricsCache.get("band", "album", "song")["lyrics"],
+                         "")
+
+    def test_progress(self):
+        songs = [("band", "album", f"song {i}") for i in range(4)]
+        LyricsEngine.search(songs[:1], "key")
+        SearchPlanner.candidates.side_effect = [
+            RuntimeError("search failed"), ("q", [{"link": "http://a.com"}]),
+            ("q", [{"link": "http://b.com"}])]
+        LyricsManager.extract_lyrics.side_effect = NoExtractorError("url")
+
+        ticks = []
+        with mock.patch.object(lyrics_engine.ThreadPoolProgress,
+                               "__init__", return_value=None) as gui:
+            LyricsEngine.search(songs, "key",
+                                progress=lambda a, m: ticks.append((a, m)))
+            LyricsEngine.search(songs[:1], "key")
+
+        # cache hit and failed searches are counted too
+        self.assertEqual(ticks, [(i, 4) for i in range(1, 5)])
+        gui.assert_called_once_with(actual=1, maximum=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
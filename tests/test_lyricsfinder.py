@@ -0,0 +1,284 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from wiki_music.external_libraries.lyricsfinder import (
+    ExtractorStats, Hedge, SearchPlanner, search_planner, utils)
+from wiki_music.external_libraries.lyricsfinder.lyrics import LyricsManager
+from wiki_music.external_libraries.lyricsfinder.models import (
+    Lyrics, exceptions)
+
+ALBUM_PAGE = """
+<html><body>
+<div class="albumlyrics"><h2>album: "Omega" (2021)</h2>
+<a href="#1">1. Alpha - Anteludium</a>
+<a href="#2">2. Abyss of Time</a>
+<a href="#3">3. The Skeleton Key</a>
+</div>
+<div class="lyrics">
+<h3><a name="1">1. Alpha - Anteludium</a></h3><br/>
+<i>[Instrumental]</i><br/>
+<h3><a name="2">2. Abyss of Time</a></h3><br/>
+Eyes on the sky<br/>
+Hear the call<br/>
+<h3><a name="3">3. The Skeleton Key</a></h3><br/>
+Locked inside<br/>
+Find the key<br/>
+<div class="thanks"></div>
+</div>
+</body></html>
+"""
+
+URL = "http://www.darklyrics.com/lyrics/epica/omega.html"
+
+
+def setUpModule():
+    global _tmp, _path
+
+    _tmp = TemporaryDirectory()
+    _path = (ExtractorStats.path, SearchPlanner.path)
+    ExtractorStats.path = Path(_tmp.name) / "stats.json"
+    SearchPlanner.path = Path(_tmp.name) / "search.sqlite"
+
+
+def tearDownModule():
+    ExtractorStats.path, SearchPlanner.path = _path
+    ExtractorStats._records = None
+    SearchPlanner.close()
+    _tmp.cleanup()
+
+
+class TestAlbumPage(unittest.TestCase):
+    """Test that all songs of album are served from one download."""
+
+    def setUp(self):
+        utils._Page.clear()
+
+        response = mock.Mock(status_code=200, text=ALBUM_PAGE)
+        patcher = mock.patch.object(utils.HttpClient, "get",
+                                    return_value=response)
+        self.get = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(utils._Page.clear)
+
+    def test_one_download(self):
+        songs = ["Abyss of Time", "The Skeleton Key", "Abyss of Time"]
+
+        with ThreadPoolExecutor(3) as executor:
+            lyrics = list(executor.map(
+                lambda s: LyricsManager.extract_lyrics(URL, s, "Epica"),
+                songs))
+
+        self.assertEqual(self.get.call_count, 1)
+        self.assertIn("Eyes on the sky", lyrics[0].lyrics)
+        self.assertIn("Find the key", lyrics[1].lyrics)
+        self.assertEqual(lyrics[0].lyrics, lyrics[2].lyrics)
+
+    def test_missing(self):
+        with self.assertRaises(exceptions.NoExtractorError) as e:
+            LyricsManager.extract_lyrics(URL, "Kingdom of Heaven", "Epica")
+        self.assertTrue(e.exception.missing)
+
+        utils._Page.clear()
+        self.get.return_value = mock.Mock(status_code=503, ok=False,
+                                          text="")
+        with self.assertRaises(exceptions.NoExtractorError) as e:
+            LyricsManager.extract_lyrics(URL, "Kingdom of Heaven", "Epica")
+        self.assertFalse(e.exception.missing)
+
+    def test_server_error(self):
+        self.get.return_value = mock.Mock(status_code=503, text="")
+
+        utils.UrlData(URL).resp
+        utils.UrlData(URL).resp
+
+        self.assertEqual(self.get.call_count, 2)
+
+
+class TestHedging(unittest.TestCase):
+    """Test that slow candidate url does not hold up the search."""
+
+    LATENCY = {"http://slow.com/a": 0.5, "http://fast.com/a": 0.01}
+
+    def setUp(self):
+        patcher = mock.patch.object(LyricsManager, "extract_lyrics",
+                                    side_effect=self._extract)
+        self.extract = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        delay = LyricsManager.hedge_delay
+        self.addCleanup(setattr, LyricsManager, "hedge_delay", delay)
+
+    def _extract(self, url, song, artist):
+        time.sleep(self.LATENCY[url])
+        return Lyrics(song, url, artist=artist)
+
+    def _search(self):
+        urls = list(self.LATENCY)
+        start = time.perf_counter()
+        lyrics = next(LyricsManager._hedged_extract(urls, "song", "artist"))
+        return lyrics.lyrics, time.perf_counter() - start
+
+    def test_hedged(self):
+        LyricsManager.hedge_delay = 0.05
+
+        url, elapsed = self._search()
+        self.assertEqual(url, "http://fast.com/a")
+        self.assertLess(elapsed, 0.4)
+
+    def test_not_hedged(self):
+        LyricsManager.hedge_delay = 5
+
+        url, _ = self._search()
+        self.assertEqual(url, "http://slow.com/a")
+        self.assertEqual(self.extract.call_count, 1)
+
+    def test_policy(self):
+        hedge = Hedge("abcd", lambda url: url, delay=1, limit=2)
+        self.assertEqual((hedge.pending, hedge.timeout), ({"a"}, 1))
+
+        # slow extraction is raced until the limit is reached
+        hedge.update(set())
+        self.assertEqual((hedge.pending, hedge.timeout), ({"a", "b"}, None))
+
+        # finished extraction is not replaced while another one runs
+        hedge.update({"a"})
+        self.assertEqual(hedge.pending, {"b"})
+
+        hedge.update({"b"})
+        self.assertEqual(hedge.pending, {"c"})
+
+
+class TestExtractorStats(unittest.TestCase):
+    """Test candidate url ordering and skipping of failing sources."""
+
+    URLS = ["https://www.azlyrics.com/lyrics/a/b.html",
+            "https://genius.com/a-b-lyrics",
+            "https://example.com/a/b",
+            "http://www.darklyrics.com/lyrics/a/b.html"]
+
+    def setUp(self):
+        ExtractorStats._records = {}
+
+    def test_rank(self):
+        for _ in range(5):
+            ExtractorStats.record("Darklyrics", True, 0.2)
+            ExtractorStats.record("AZLyrics", False, 3.0)
+
+        self.assertEqual(LyricsManager.rank_urls(self.URLS),
+                         [self.URLS[3], self.URLS[1], self.URLS[0]])
+
+    def test_circuit_breaker(self):
+        for _ in range(ExtractorStats.failure_threshold):
+            ExtractorStats.record("Genius", False, 1.0, failed=True)
+
+        self.assertFalse(ExtractorStats.available("Genius"))
+        self.assertNotIn(self.URLS[1], LyricsManager.rank_urls(self.URLS))
+
+        with mock.patch.object(time, "time", return_value=time.time() +
+                               ExtractorStats.cooldown + 1):
+            self.assertTrue(ExtractorStats.available("Genius"))
+
+    def test_blocked(self):
+        extractor = LyricsManager.extractors_for(self.URLS[0])[0]
+
+        with mock.patch.object(extractor, "extract_lyrics",
+                               side_effect=exceptions.NotAllowedError):
+            with self.assertRaises(exceptions.NoExtractorError):
+                LyricsManager.extract_lyrics(self.URLS[0], "b", "a")
+
+        self.assertFalse(ExtractorStats.available("AZLyrics"))
+
+    def test_persisted(self):
+        ExtractorStats.record("Genius", True, 1.0)
+        ExtractorStats.save()
+        ExtractorStats._records = None
+
+        self.assertEqual(ExtractorStats.summary("Genius")["p50"], 1.0)
+
+
+class TestSearchPlanner(unittest.TestCase):
+    """Test that custom search queries are cached and quota is planned."""
+
+    ALBUM = {"items": [
+        {"link": "http://www.darklyrics.com/lyrics/epica/omega.html",
+         "title": "EPICA - Omega (2021) album lyrics"},
+        {"link": "https://genius.com/Epica-kingdom-of-heaven-lyrics",
+         "title": "Epica - Kingdom of Heaven Lyrics | Genius"},
+        {"link": "https://www.youtube.com/watch?v=omega",
+         "title": "Epica - Omega (full album)"}]}
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        SearchPlanner.close()
+
+        for target, name, kwargs in (
+                (search_planner, "search_page", {"return_value": self.ALBUM}),
+                (SearchPlanner, "path",
+                 {"new": Path(self.tmp.name) / "search.sqlite"})):
+            patcher = mock.patch.object(target, name, **kwargs)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+        self.search = self.search_page
+
+    def tearDown(self):
+        SearchPlanner.close()
+        self.tmp.cleanup()
+
+    def test_album(self):
+        songs = ["Abyss of Time", "Kingdom of Heaven", "The Skeleton Key"]
+
+        with ThreadPoolExecutor(3) as executor:
+            results = list(executor.map(
+                lambda s: SearchPlanner.candidates("Epica", "Omega", s,
+                                                   "key")[1], songs))
+
+        self.assertEqual(self.search.call_count, 1)
+        self.assertEqual(SearchPlanner.used(), 1)
+        self.assertIn(self.ALBUM["items"][0], results[0])
+        self.assertIn(self.ALBUM["items"][1], results[1])
+        self.assertNotIn(self.ALBUM["items"][1], results[0])
+        self.assertNotIn(self.ALBUM["items"][2], results[2])
+        self.assertEqual(SearchPlanner._pending, {})
+
+    def test_reserve(self):
+        self.search.return_value = {"items": []}
+
+        with mock.patch.object(SearchPlanner, "quota",
+                               SearchPlanner.reserve + 1):
+            SearchPlanner.candidates("Epica", "Omega", "Omega", "key")
+            query, results = SearchPlanner.candidates("Epica", "Omega",
+                                                      "Rivers", "key")
+
+        # album query was sent, song query was left for the reserve
+        self.assertEqual(self.search.call_count, 1)
+        self.assertEqual(results,
+                         utils.generate_url("Epica", "Omega", "Rivers"))
+
+    def test_exhausted(self):
+        self.search.return_value = {"error": {
+            "code": 429, "message": "Quota exceeded",
+            "errors": [{"reason": "rateLimitExceeded"}]}}
+
+        SearchPlanner.candidates("Epica", "", "Rivers", "key")
+        SearchPlanner.candidates("Epica", "", "Aventine", "key")
+
+        self.assertEqual(self.search.call_count, 1)
+        self.assertEqual(SearchPlanner.remaining(), 0)
+
+    def test_quota_day(self):
+        # in summer the quota day starts at 07:00 UTC, not 08:00 UTC
+        now = datetime(2021, 7, 2, 7, 30, tzinfo=timezone.utc)
+
+        with mock.patch.object(search_planner, "datetime") as clock:
+            clock.now.side_effect = lambda tz: now.astimezone(tz)
+            self.assertEqual(SearchPlanner._today(), "2021-07-02")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import socket
+import sys
+import unittest
+from threading import Thread
+from unittest import mock
+
+from wiki_music import app_client
+from wiki_music.app_server import WikiMusicServer
+
+
+class TestServer(unittest.TestCase):
+    """Test job protocol of server and client on ephemeral port."""
+
+    def setUp(self):
+        self.server = WikiMusicServer(("127.0.0.1", 0))
+        self.port = self.server.server_address[1]
+
+        thread = Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def submit(self, line: bytes) -> list:
+        """Send raw job line to server and read all reply messages."""
+        with socket.create_connection(("127.0.0.1", self.port)) as sock, \
+                sock.makefile("rwb") as stream:
+            stream.write(line)
+            stream.flush()
+
+            return [json.loads(reply) for reply in stream]
+
+    def test_round_trip(self):
+        jobs = []
+
+        def run_job(job):
+            jobs.append(job)
+            print("first line\nsecond", end="")
+
+        def output(text, file=None):
+            if not file:
+                printed.append(text)
+
+        printed = []
+        argv = ["wiki-music-client", "-a", "Album", "-b", "Band", "-p",
+                str(self.port)]
+
+        with mock.patch.object(WikiMusicServer, "run_job",
+                               staticmethod(run_job)), \
+                mock.patch.object(sys, "argv", argv), \
+                mock.patch.object(app_client, "print", output, create=True):
+            app_client.main()
+
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(jobs[0]["job"], "album")
+        self.assertEqual((jobs[0]["album"], jobs[0]["band"]),
+                         ("Album", "Band"))
+        self.assertEqual(printed, ["first line", "second"])
+
+    def test_malformed_job(self):
+        with self.assertLogs("wiki_music.app_server", "ERROR"):
+            cases = {"not json": b"{job: album\n",
+                     "unknown job": b'{"job": "unknown"}\n'}
+
+            for case, line in cases.items():
+                with self.subTest(case=case):
+                    replies = self.submit(line)
+
+                    self.assertEqual(replies[-1]["type"], "done")
+                    self.assertTrue(replies[-1]["error"])
+
+    def test_failed_job(self):
+        stdout = sys.stdout
+
+        def run_job(job):
+            print("working")
+            raise RuntimeError("job failed")
+
+        with mock.patch.object(WikiMusicServer, "run_job",
+                               staticmethod(run_job)), \
+                self.assertLogs("wiki_music.app_server", "ERROR"):
+            replies = self.submit(b'{"job": "album"}\n')
+
+        self.assertIs(sys.stdout, stdout)
+        self.assertIn({"type": "output", "text": "working"}, replies)
+        self.assertEqual(replies[-1], {"type": "done", "error": "job failed"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,23 @@
+import os
+import shutil
 import unittest
+from itertools import product
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from mutagen.id3 import COMM, ID3
 
 from wiki_music.constants.tags import TAGS, EXTENDED_TAGS
+from wiki_music.library.index import LibraryIndex
+from wiki_music.library.tags_handler import CoverArt, File, TagCache
+from wiki_music.library.tags_handler.fast_scan import scan
 from wiki_music.library.tags_handler.flac import TagFlac
 from wiki_music.library.tags_handler.m4a import TagM4a
 from wiki_music.library.tags_handler.mp3 import TagMp3
 from wiki_music.library.parser.base import ParserBase
+from wiki_music.library.tags_io import read_tags, write_tags
+from wiki_music.utilities import ImageStore, exit_cleaner, image_store
 
 
 class TestTagConsistency(unittest.TestCase):
@@ -26,5 +39,226 @@ class TestTagConsistency(unittest.TestCase):
                 self.assertTrue(getattr(ParserBase, tag, None))
 
 
+class TestCoverArt(unittest.TestCase):
+    """Test that cover art is read as handle and loaded on demand."""
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        for f in ("Aventine.mp3", "Aventine.flac"):
+            shutil.copy(Path(__file__).parent / "test_music" / f, self.dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_handle(self):
+        cover = File(self.dir / "Aventine.flac").tags["COVERART"]
+
+        self.assertIsInstance(cover, CoverArt)
+        self.assertEqual(len(cover.data), cover.size)
+        self.assertEqual(cover, cover.data)
+
+    def test_write_handle(self):
+        cover = File(self.dir / "Aventine.flac").tags["COVERART"]
+
+        song = File(self.dir / "Aventine.mp3")
+        self.assertNotEqual(song.tags["COVERART"], cover)
+        song.tags["COVERART"] = cover
+        song.save()
+
+        self.assertEqual(File(self.dir / "Aventine.mp3").tags["COVERART"],
+                         cover)
+
+    def test_store(self):
+        data = (self.dir / "Aventine.flac").read_bytes()[:1000]
+        covers = [CoverArt.stored(bytes(data)) for _ in range(30)]
+
+        self.assertEqual(len(set(covers)), 1)
+        self.assertIs(covers[0].data, covers[-1].data)
+        self.assertTrue(ImageStore.contains(covers[0].digest))
+
+    def test_spill(self):
+        images = [bytes([i]) * 100 for i in range(2)]
+        store = self.dir / "images"
+        # images spilled by other running instance
+        other = store / "1"
+        other.mkdir(parents=True)
+        (other / "digest").write_bytes(images[1])
+
+        with mock.patch.object(image_store, "IMAGE_STORE_DIR", store), \
+                mock.patch.object(image_store, "IMAGE_STORE_MEMORY", 150):
+            ImageStore.clear()
+            digests = [ImageStore.put(i) for i in images]
+
+            # least recently used image is moved to disk
+            self.assertTrue((store / str(os.getpid()) / digests[0]).is_file())
+            self.assertEqual(ImageStore.get(digests[0]), images[0])
+
+            exit_cleaner()
+            self.assertEqual(list(store.iterdir()), [other])
+            self.assertTrue((other / "digest").is_file())
+            self.assertIsNone(ImageStore.get(digests[0]))
+
+
+class TestNoOpWrite(unittest.TestCase):
+    """Test that writing unchanged tags does not touch files."""
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        for f in ("Aventine.mp3", "Aventine.flac", "Aventine.m4a"):
+            shutil.copy(Path(__file__).parent / "test_music" / f, self.dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, path: Path):
+        data = read_tags(path)
+        data.update(FILE=path, TYPE="", LYRICS="new lyrics")
+        write_tags(data)
+
+    def test_second_write(self):
+        for path in sorted(self.dir.iterdir()):
+            with self.subTest(path=path.name):
+                self._write(path)
+                mtime = path.stat().st_mtime_ns
+                self._write(path)
+                self.assertEqual(path.stat().st_mtime_ns, mtime)
+                self.assertEqual(read_tags(path)["LYRICS"], "new lyrics")
+
+    def test_padding(self):
+        for path in sorted(self.dir.iterdir()):
+            with self.subTest(path=path.name):
+                for lyrics in ("a" * 20000, "b" * 21000):
+                    song = File(path)
+                    song.tags["LYRICS"] = lyrics
+                    song.save()
+
+                # second edit fits to padding reserved by the first one
+                self.assertLess(song.bytes_rewritten, path.stat().st_size / 2)
+                self.assertEqual(read_tags(path)["LYRICS"], "b" * 21000)
+
+
+class TestTagCache(unittest.TestCase):
+    """Test that parsed handlers are reused and keep pictures intact."""
+
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        for f in ("Aventine.mp3", "Aventine.flac", "Aventine.m4a"):
+            shutil.copy(Path(__file__).parent / "test_music" / f, self.dir)
+
+    def tearDown(self):
+        TagCache.clear()
+        self.tmp.cleanup()
+
+    def test_reuse(self):
+        for path in sorted(self.dir.iterdir()):
+            with self.subTest(path=path.name):
+                song = File(path)
+                cover = song.tags["COVERART"]
+                self.assertIs(File(path), song)
+
+                song.tags["TITLE"] = "changed"
+                song.save()
+                self.assertIs(File(path), song)
+
+                tags = File(path, cached=False).tags
+                self.assertEqual(tags["TITLE"], "changed")
+                self.assertEqual(tags["COVERART"], cover)
+
+    def test_changed(self):
+        path = self.dir / "Aventine.flac"
+        song = File(path)
+        path.write_bytes(path.read_bytes())
+        self.assertIsNot(File(path), song)
+
+    def test_read_write(self):
+        LibraryIndex.close()
+        self.addCleanup(setattr, LibraryIndex, "_path", LibraryIndex._path)
+        self.addCleanup(LibraryIndex.close)
+        LibraryIndex._path = self.dir / "index.sqlite"
+
+        parsed = []
+
+        def counting(_open):
+            def wrapper(handler, filename):
+                parsed.append(filename)
+                return _open(handler, filename)
+            return wrapper
+
+        for handler in (TagFlac, TagM4a, TagMp3):
+            patcher = mock.patch.object(handler, "_open",
+                                        counting(handler._open))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        files, records = LibraryIndex.read_stream(
+            iter(sorted(self.dir.glob("Aventine.*"))), multi_threaded=False)
+        self.assertCountEqual(parsed, files)
+
+        for path, record in zip(files, records):
+            record.update(FILE=path, TYPE="", LYRICS="new lyrics")
+            self.assertTrue(write_tags(record))
+
+        # handlers parsed by read are reused by write
+        self.assertCountEqual(parsed, files)
+        for path in files:
+            self.assertEqual(File(path, cached=False).tags["LYRICS"],
+                             "new lyrics")
+
+    def test_failed_write(self):
+        path = self.dir / "Aventine.mp3"
+        song = File(path)
+        data = read_tags(path)
+        data.update(FILE=path, TYPE="", ARTIST=None)
+
+        self.assertIsNone(write_tags(data))
+        self.assertIsNot(File(path), song)
+
+
+class TestFastScan(unittest.TestCase):
+    """Test that fast scanner reads the same tags as mutagen."""
+
+    def test_parity(self):
+        for f in ("Aventine.mp3", "Aventine.flac", "Aventine.m4a"):
+            with self.subTest(file=f):
+                path = Path(__file__).parent / "test_music" / f
+                tags = read_tags(path, duration=True)
+                scanned = scan(path)
+
+                self.assertIsNotNone(scanned)
+                self.assertEqual(list(tags), list(scanned))
+                for tag, value in tags.items():
+                    self.assertEqual(value, scanned[tag], tag)
+
+    def test_comment_encodings(self):
+        source = Path(__file__).parent / "test_music" / "Aventine.mp3"
+
+        with TemporaryDirectory() as tmp:
+            for version, encoding in product((3, 4), range(4)):
+                with self.subTest(version=version, encoding=encoding):
+                    path = Path(tmp) / f"v{version}_{encoding}.mp3"
+                    shutil.copy(source, path)
+
+                    id3 = ID3(path)
+                    id3.delall("COMM")
+                    id3.add(COMM(encoding=encoding, lang="eng",
+                                 desc="iTunNORM", text="0000 0000"))
+                    id3.add(COMM(encoding=encoding, lang="eng", desc="",
+                                 text="comment café"))
+                    id3.save(v2_version=version)
+
+                    self.assertEqual(scan(path)["COMMENT"],
+                                     read_tags(path)["COMMENT"])
+                    self.assertIn("comment", scan(path)["COMMENT"])
+
+    def test_fallback(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "Aventine.mp3"
+            path.write_bytes(b"not a music file")
+            self.assertIsNone(scan(path))
+
+
 if __name__ == '__main__':
     unittest.main()
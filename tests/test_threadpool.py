@@ -0,0 +1,88 @@
+import threading
+import time
+import unittest
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from wiki_music.utilities.parser_utils import (DeviceThreadPool, ProcessPool,
+                                               ThreadPool)
+
+
+class TestThreadPool(unittest.TestCase):
+    """Test that bounded thread pool keeps order and limits threads."""
+
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def square(self, x):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.01)
+        with self.lock:
+            self.running -= 1
+        return x * x
+
+    def test_bounded_ordered(self):
+        progress = []
+        t = ThreadPool(self.square, [(i, ) for i in range(40)], max_workers=4,
+                       progress=lambda a, m: progress.append((a, m)))
+        t.run()
+
+        self.assertEqual(t.results(), [i * i for i in range(40)])
+        self.assertLessEqual(self.peak, 4)
+        self.assertEqual(sorted(progress), [(i, 40) for i in range(1, 41)])
+
+    def test_run_async(self):
+        t = ThreadPool(self.square, [(i, ) for i in range(10)], max_workers=3)
+
+        self.assertEqual(sorted(t.run_async()), [i * i for i in range(10)])
+
+    def test_serial_exception(self):
+        t = ThreadPool(lambda x: 1 // x, [(1, ), (0, )])
+        t.run(serial=True)
+
+        with self.assertRaises(ZeroDivisionError):
+            t.results()
+
+    def test_device_limit(self):
+        progress = []
+
+        def report(actual, maximum, description):
+            progress.append(description)
+
+        with TemporaryDirectory() as tmp:
+            paths = [Path(tmp) / f"{i:02d}.mp3" for i in range(20)]
+
+            with mock.patch("wiki_music.utilities.parser_utils.device_kind",
+                            return_value=(1, "hdd")):
+                t = DeviceThreadPool(self.square, [(i, ) for i in range(20)],
+                                     paths=paths[::-1], progress=report)
+                t.run()
+
+                self.assertEqual(t.results(), [i * i for i in range(20)])
+
+        # hdd is written by one thread in order of paths
+        self.assertEqual(self.peak, 1)
+        self.assertEqual(progress, [f"Done: {p.name}" for p in paths])
+
+
+class TestProcessPool(unittest.TestCase):
+    """Test that chunked process pool returns results in order."""
+
+    def test_chunked(self):
+        progress = []
+        t = ProcessPool(pow, [(i, 2) for i in range(25)], max_workers=2,
+                        chunksize=4, progress=lambda a, m: progress.append(a))
+        t.run()
+
+        self.assertEqual(t.results(timeout=60), [i * i for i in range(25)])
+        self.assertEqual(max(progress), 25)
+
+
+if __name__ == '__main__':
+    unittest.main()
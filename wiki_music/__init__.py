@@ -5,7 +5,7 @@ package __version__
 """
 
 import logging
-from sys import argv
+from sys import argv, platform
 
 from lazy_import import lazy_module
 
@@ -31,7 +31,6 @@ lazy_module("queue")
 lazy_module("ctypes")
 lazy_module("pickle")
 lazy_module("urllib")
-lazy_module("winreg")
 lazy_module("mutagen")
 lazy_module("operator")
 lazy_module("requests")
@@ -46,6 +45,9 @@ lazy_module("collections")
 lazy_module("configparser")
 lazy_module("PIL.Image")
 lazy_module("PIL.ImageFile")
+# module exists only on windows, lazy loaded stub breaks inspect elsewhere
+if platform.startswith("win32"):
+    lazy_module("winreg")
 # TODO cannot be lazy loaded
 # lazy_module("rapidfuzz.fuzz")
 # lazy_module("rapidfuzz.process")
@@ -2,9 +2,10 @@
 
 import logging
 from atexit import register
+from multiprocessing import freeze_support
 
 from wiki_music.constants.colors import GREEN, RESET
-from wiki_music.library import WikipediaRunner
+from wiki_music.library import BatchRunner, WikipediaRunner
 from wiki_music.utilities import (input_parser, set_log_handles,
                                   set_signal_handler, exit_cleaner)
 
@@ -29,6 +30,17 @@ def main():
     # remove keys that won't be used to init WikipediaRunner
     args.pop("debug")
     lyrics_only = args.pop("lyrics_only")
+    batch = args.pop("batch")
+    journal = args.pop("journal")
+
+    # run over whole library tree without asking any questions
+    if batch:
+        BatchRunner(args["work_dir"], journal=journal,
+                    offline_debug=args["offline_debug"],
+                    write_json=args["write_json"],
+                    with_log=args["with_log"],
+                    lyrics_only=lyrics_only).run()
+        return
 
     # get input if it was not specified on command line
     if not lyrics_only:
@@ -53,4 +65,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # process pool workers of frozen app must not start the app again
+    freeze_support()
     main()
@@ -0,0 +1,75 @@
+"""wiki_music thin client which submits jobs to running server.
+
+Client imports only standard library modules so it starts instantly, all
+the heavy lifting is done by :mod:`wiki_music.app_server`.
+"""
+
+import argparse
+import json
+import socket
+import sys
+from pathlib import Path
+
+from wiki_music.constants.paths import SERVER_ADDRESS
+
+
+def main():
+    """Client entry point."""
+    parser = argparse.ArgumentParser(description="Submit job to wiki_music "
+                                     "server and print its progress")
+    parser.add_argument("-a", "--album", default="", type=str,
+                        help="Album name")
+    parser.add_argument("-b", "--band", default="", type=str,
+                        help="Band name")
+    parser.add_argument("-w", "--work_dir", default=".", type=str,
+                        help="working directory")
+    parser.add_argument("-l", "--lyrics_only", default=False,
+                        action="store_true", help="download only lyrics")
+    parser.add_argument("-B", "--batch", default=False, action="store_true",
+                        help="process whole library tree under work_dir")
+    parser.add_argument("-jr", "--journal", default=None, type=str,
+                        help="journal file used to resume runs")
+    parser.add_argument("-p", "--port", default=SERVER_ADDRESS[1], type=int,
+                        help="server port")
+    args = parser.parse_args()
+
+    if args.batch:
+        kind = "batch"
+    elif args.lyrics_only:
+        kind = "lyrics"
+    else:
+        kind = "album"
+
+    job = {"job": kind, "album": args.album, "band": args.band,
+           "work_dir": str(Path(args.work_dir).resolve()),
+           "journal": args.journal}
+
+    try:
+        sock = socket.create_connection((SERVER_ADDRESS[0], args.port))
+    except ConnectionRefusedError:
+        sys.exit("wiki_music server is not running, start it with: "
+                 "wiki-music-server")
+
+    with sock, sock.makefile("rwb") as stream:
+        stream.write((json.dumps(job) + "\n").encode())
+        stream.flush()
+
+        for line in stream:
+            message = json.loads(line)
+
+            if message["type"] == "output":
+                print(message["text"])
+            elif message["type"] == "progress":
+                print(f"{message['description']} "
+                      f"[{message['actual']}/{message['max']}]",
+                      file=sys.stderr)
+            elif message["type"] == "error":
+                print(message["text"], file=sys.stderr)
+            elif message["type"] == "done":
+                if message["error"]:
+                    sys.exit(message["error"])
+                break
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@
 import logging
 import sys
 from atexit import register
+from multiprocessing import freeze_support
 from threading import current_thread
 
 from wiki_music.gui_lib.main_window import Window
@@ -36,4 +37,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # process pool workers of frozen app must not start the app again
+    freeze_support()
     main()
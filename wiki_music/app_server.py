@@ -0,0 +1,277 @@
+"""wiki_music server entry point.
+
+Server keeps running in background with all heavy libraries imported,
+NLTK models loaded and caches warm. Jobs are submitted by
+:mod:`wiki_music.app_client` over local socket using simple json protocol.
+Each request is one json line describing the job, server responds with
+stream of json lines, each has a `type` key which is one of:
+
+* `output` - text the job printed out, under `text` key
+* `progress` - progress message, under `description`, `actual` and `max`
+* `error` - exception or warning message, under `text` key
+* `done` - job has finished, `error` key holds error message or None
+
+Jobs are run one after another because parser reports its progress through
+class level queues shared by the whole process.
+"""
+
+import argparse  # lazy loaded
+import io  # lazy loaded
+import json  # lazy loaded
+import logging
+from atexit import register
+from contextlib import redirect_stdout
+from multiprocessing import freeze_support
+from pathlib import Path
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+from threading import Event, Lock, Thread
+from time import sleep
+from typing import Any, Dict
+
+from wiki_music.constants import SERVER_ADDRESS
+from wiki_music.library import BatchRunner, WikipediaRunner
+from wiki_music.utilities import (NLTK, Control, Journal, Progress,
+                                  ThreadPoolProgress, exit_cleaner,
+                                  set_log_handles, set_signal_handler)
+
+log = logging.getLogger(__name__)
+
+
+class _SocketWriter(io.TextIOBase):
+    """File-like object that sends each written line to client as json.
+
+    Parameters
+    ----------
+    handler: JobHandler
+        handler of the client connection
+    """
+
+    def __init__(self, handler: "JobHandler") -> None:
+        super().__init__()
+        self._handler = handler
+        self._buffer = ""
+
+    def write(self, text: str) -> int:
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            self._handler.send(type="output", text=line)
+
+        return len(text)
+
+    def flush(self):
+        if self._buffer:
+            self._handler.send(type="output", text=self._buffer)
+            self._buffer = ""
+
+
+class JobHandler(StreamRequestHandler):
+    """Reads one job from client, runs it and streams the progress back."""
+
+    server: "WikiMusicServer"
+
+    def setup(self):
+        super().setup()
+        self._send_lock = Lock()
+
+    def send(self, **message: Any):
+        """Send one json line to client, ignore disconnected clients.
+
+        Parameters
+        ----------
+        message: Any
+            json serializable message items
+        """
+        with self._send_lock:
+            try:
+                self.wfile.write((json.dumps(message) + "\n").encode())
+                self.wfile.flush()
+            except OSError:
+                log.debug("client disconnected")
+
+    def handle(self):
+        try:
+            job = json.loads(self.rfile.readline())
+        except ValueError as e:
+            self.send(type="done", error=f"Invalid job: {e}")
+            return
+
+        log.info(f"received job: {job}")
+
+        with self.server.job_lock:
+            finished = Event()
+            pump = Thread(target=self._pump_progress, args=(finished, ),
+                          name="ProgressPump", daemon=True)
+            pump.start()
+
+            error = None
+            writer = _SocketWriter(self)
+            try:
+                with redirect_stdout(writer):
+                    self.server.run_job(job)
+            except Exception as e:
+                log.exception(e)
+                error = str(e)
+            finally:
+                writer.flush()
+                finished.set()
+                pump.join()
+
+        self.send(type="done", error=error)
+
+    def _pump_progress(self, finished: Event):
+        """Forward parser progress and exception queues to client.
+
+        The queues must be drained even when nobody listens, otherwise they
+        would grow for the whole server lifetime.
+
+        Parameters
+        ----------
+        finished: Event
+            is set when job has finished
+        """
+        while True:
+            done = finished.is_set()
+
+            for queue in (Progress, ThreadPoolProgress):
+                while True:
+                    p = queue.get_nowait()
+                    if not p:
+                        break
+                    self.send(type="progress", description=p.description,
+                              actual=p.actual, max=p.max)
+
+            while True:
+                c = Control.get_nowait()
+                if not c:
+                    break
+                if c.switch in ("exception", "warning"):
+                    self.send(type="error", text=c.message)
+
+            if done:
+                return
+
+            sleep(0.1)
+
+
+class WikiMusicServer(ThreadingTCPServer):
+    """Local server which runs wiki_music jobs in warm process.
+
+    Parameters
+    ----------
+    address: Tuple[str, int]
+        host and port to listen on
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address=SERVER_ADDRESS) -> None:
+        super().__init__(address, JobHandler)
+        self.job_lock = Lock()
+
+    @staticmethod
+    def warm_up():
+        """Import heavy libraries and load NLTK models before first job."""
+        log.info("warming up")
+
+        import bs4  # lazy loaded
+        import mutagen  # lazy loaded
+        import requests  # lazy loaded
+        import wikipedia  # lazy loaded
+        from PIL import Image  # lazy loaded
+        from wiki_music.external_libraries import lyricsfinder  # lazy loaded
+
+        # attribute access forces lazy loaded modules to import
+        bs4.BeautifulSoup("<p></p>", features="lxml")
+        for attr in (mutagen.File, requests.Session, wikipedia.page,
+                     Image.open, lyricsfinder.LyricsManager):
+            log.debug(f"loaded {attr}")
+
+        NLTK.run_import(GUI=False, delay=0)
+
+        # wait for nltk import running in background thread
+        for _ in range(600):
+            try:
+                nltk = NLTK.nltk
+            except AttributeError:
+                sleep(0.1)
+            else:
+                break
+        else:
+            log.warning("nltk import timed out")
+            return
+
+        # first use loads pickled models from disk, do it now
+        try:
+            sentence = nltk.pos_tag(nltk.word_tokenize("John plays guitar."))
+            nltk.ne_chunk(sentence)
+        except LookupError as e:
+            log.warning(f"NLTK data are not available: {e}")
+
+        log.info("warm up done")
+
+    @staticmethod
+    def run_job(job: Dict[str, Any]):
+        """Run submitted job non-interactively.
+
+        Parameters
+        ----------
+        job: Dict[str, Any]
+            job description with `job` key which is one of `album`, `lyrics`
+            or `batch` and keys coresponding to command line arguments
+        """
+        kind = job.get("job", "album")
+        work_dir = job.get("work_dir", ".")
+
+        if kind == "batch":
+            BatchRunner(work_dir, journal=job.get("journal"),
+                        offline_debug=job.get("offline_debug", False),
+                        write_json=job.get("write_json", False)).run()
+        elif kind == "album":
+            if job.get("journal"):
+                journal = Journal(Path(job["journal"]))
+            else:
+                journal = Journal.for_directory(Path(work_dir).resolve())
+            parser = WikipediaRunner(album=job.get("album", ""),
+                                     band=job.get("band", ""),
+                                     work_dir=work_dir, GUI=False,
+                                     offline_debug=job.get("offline_debug",
+                                                           False),
+                                     write_json=job.get("write_json", False))
+            parser.run_batch(journal)
+        elif kind == "lyrics":
+            WikipediaRunner(work_dir=work_dir, GUI=False).run_lyrics()
+        else:
+            raise ValueError(f"Unknown job type: {kind}")
+
+
+def main():
+    """Server entry point."""
+    set_signal_handler()
+    register(exit_cleaner)
+
+    parser = argparse.ArgumentParser(description="Run wiki_music server")
+    parser.add_argument("-p", "--port", default=SERVER_ADDRESS[1], type=int,
+                        help="port to listen on")
+    parser.add_argument("-d", "--debug", default=False, action="store_true",
+                        help="Run in debugging mode")
+    args = parser.parse_args()
+
+    if args.debug:
+        set_log_handles(logging.DEBUG)
+    else:
+        set_log_handles(logging.INFO)
+
+    WikiMusicServer.warm_up()
+
+    with WikiMusicServer((SERVER_ADDRESS[0], args.port)) as server:
+        print(f"wiki_music server listening on "
+              f"{SERVER_ADDRESS[0]}:{args.port}")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    # process pool workers of frozen app must not start the app again
+    freeze_support()
+    main()
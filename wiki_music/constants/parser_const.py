@@ -1,11 +1,21 @@
 """Holds constants that are used in parser."""
 
+import os  # lazy loaded
 import re  # lazy loaded
 from typing import Tuple, Pattern, Dict
 
 __all__ = ["CONTENTS_IDS", "DEF_TYPES", "DELIMITERS", "COMPOSER_HEADER",
            "TO_DELETE", "UNWANTED", "NO_LYRIS", "ORDER_NUMBER", "WIKI_GENRES",
-           "TIME", "PERSONNEL_SECTIONS"]
+           "TIME", "PERSONNEL_SECTIONS", "MAX_WORKERS",
+           "PROCESS_POOL_MIN_FILES", "IMAGE_STORE_MEMORY", "DEVICE_WORKERS",
+           "NETWORK_FILESYSTEMS", "FILE_NUMBER", "DISC_DIR",
+           "FILE_MATCH_THRESHOLD", "FILE_MATCH_CUES", "DURATION_TOLERANCE",
+           "LYRICS_MISS_TTL", "HTTP_TIMEOUT", "HTTP_RETRIES",
+           "HTTP_POOL_HOSTS", "HTTP_POOL_SIZE", "LYRICS_WORKERS",
+           "LYRICS_CONCURRENCY", "LYRICS_PER_HOST", "LYRICS_TIMEOUT",
+           "LYRICS_DUPLICATE_SCORE", "LYRICS_VARIANT", "SAME_LYRICS_TYPES",
+           "SEARCH_DAILY_QUOTA", "SEARCH_QUOTA_RESERVE", "SEARCH_CACHE_TTL",
+           "ALBUM_LYRICS_HOSTS", "LYRICS_ALBUM_WORKERS"]
 
 #: defines possible types of tracks that parser is able to extract
 DEF_TYPES: Tuple[str, ...] = ("Instrumental", "Acoustic", "Orchestral", "Live",
@@ -29,8 +39,9 @@ ORDER_NUMBER: Pattern = re.compile(r"^ *\d+\.? *")
 PERSONNEL_SECTIONS: Tuple[str, ...] = ("personnel", "credits", "guests")
 #: regex expression that matches wikipedia genres
 WIKI_GENRES: Pattern = re.compile(r"/wiki/(?!Music_genre)", flags=re.I)
-#: regex expression that matches time format e.g. (12:45)
-TIME: Pattern = re.compile(r"\( *\d+\:\d+ *\)")
+#: regex expression that matches time format e.g. (12:45) or (1:02:15),
+#: groups capture hours, minutes and seconds
+TIME: Pattern = re.compile(r"\( *(?:(\d+):)?(\d+):(\d+) *\)")
 #: strings that are are used to extract composer name
 DELIMITERS: Tuple[str, ...] = ("written by", "composed by", "lyrics by",
                                "music by", "arrangements by", "vocal lines by",
@@ -41,3 +52,79 @@ CONTENTS_IDS: Tuple[str, ...] = ("Track_listing", "Personnel", "Credits",
 #: table headers that are used to assign personnel to composers or to artists
 #: list
 COMPOSER_HEADER: Tuple[str, ...] = ("lyrics", "text", "music", "compose")
+#: default maximum number of worker threads run by
+#: :class:`wiki_music.utilities.parser_utils.ThreadPool`
+MAX_WORKERS: int = min(32, (os.cpu_count() or 1) + 4)
+#: minimal number of files for which tags are read in process pool, smaller
+#: directories are read in threads because process startup would dominate
+PROCESS_POOL_MIN_FILES: int = 256
+#: maximal size of images in bytes held in memory by
+#: :class:`wiki_music.utilities.image_store.ImageStore`
+IMAGE_STORE_MEMORY: int = 64 * 2 ** 20
+#: number of files written at once on one storage device by
+#: :class:`wiki_music.utilities.parser_utils.DeviceThreadPool`, depending on
+#: the device kind returned by :func:`wiki_music.utilities.utils.device_kind`
+DEVICE_WORKERS: Dict[str, int] = {"ssd": 8, "hdd": 1, "network": 2,
+                                  "unknown": 4}
+#: filesystem types which are treated as network storage
+NETWORK_FILESYSTEMS: Tuple[str, ...] = ("nfs", "nfs4", "cifs", "smb3",
+                                        "smbfs", "fuse.sshfs", "9p", "afs",
+                                        "ceph", "glusterfs", "davfs")
+#: regex expression that matches track number at the start of file name,
+#: optionally preceded by disc number e.g. 05 - Title or 2-05 Title
+FILE_NUMBER: Pattern = re.compile(r"^\s*(?:(\d{1,2})\s*-\s*)?(\d{1,3})(?!\d)")
+#: regex expression that matches disc number in directory name e.g. CD 2
+DISC_DIR: Pattern = re.compile(r"(?<![a-z])(?:cd|dis[ck])[\s_.-]*(\d+)",
+                               flags=re.I)
+#: minimal score of track and file name match, tracks with lower scores are
+#: left without file
+FILE_MATCH_THRESHOLD: int = 50
+#: score added to track and file name match when track number or disc number
+#: extracted from file path agrees with tracklist, disc number is subtracted
+#: when it disagrees, duration score decreases linearly with the difference
+#: of track and file lengths
+FILE_MATCH_CUES: Dict[str, int] = {"number": 15, "disc": 10, "duration": 10}
+#: maximal difference in seconds between track length from tracklist and
+#: file length for the file to be considered as a match for the track
+DURATION_TOLERANCE: float = 4.0
+#: seconds after which songs whose lyrics were not found are searched again
+LYRICS_MISS_TTL: float = 7 * 24 * 3600
+#: connect and read timeout in seconds of requests sent by
+#: :class:`wiki_music.utilities.http_client.HttpClient`
+HTTP_TIMEOUT: Tuple[float, float] = (5.0, 30.0)
+#: number of times failed idempotent http request is retried
+HTTP_RETRIES: int = 3
+#: number of hosts for which http connection pools are kept
+HTTP_POOL_HOSTS: int = 16
+#: maximal number of kept alive connections to one host
+HTTP_POOL_SIZE: int = MAX_WORKERS
+#: number of threads which run blocking web requests of
+#: :class:`wiki_music.library.lyrics_engine.LyricsEngine`
+LYRICS_WORKERS: int = 8
+#: maximal number of songs whose lyrics are searched at once
+LYRICS_CONCURRENCY: int = 32
+#: maximal number of concurrent lyrics requests to one host
+LYRICS_PER_HOST: int = 4
+#: seconds after which lyrics search of one song is cancelled
+LYRICS_TIMEOUT: float = 60.0
+#: minimal similarity score of track names which are considered to have
+#: the same lyrics
+LYRICS_DUPLICATE_SCORE: int = 90
+#: version annotations stripped from track names before duplicates are found
+LYRICS_VARIANT: Pattern = re.compile(
+    r"\s*(?:[\(\[][^\)\]]*\b(?:live|acoustic|demo|remaster(?:ed)?|version|"
+    r"edit|mix)\b[^\)\]]*[\)\]]|\s-\s*(?:\d{4}\s+)?(?:live|acoustic|demo|"
+    r"remaster(?:ed)?|[\w ]*(?:version|edit|mix))\b.*)$", flags=re.I)
+#: track types which have the same lyrics as the plain track
+SAME_LYRICS_TYPES: Tuple[str, ...] = ("Acoustic", "Live", "Piano")
+#: number of free google custom search queries per day
+SEARCH_DAILY_QUOTA: int = 100
+#: queries of the daily quota kept for album level searches, single song
+#: searches switch to generated urls when only this many are left
+SEARCH_QUOTA_RESERVE: int = 20
+#: seconds after which cached custom search responses are refreshed
+SEARCH_CACHE_TTL: float = 30 * 24 * 3600
+#: lyrics sites which have lyrics of the whole album on one page
+ALBUM_LYRICS_HOSTS: Tuple[str, ...] = ("darklyrics.com", )
+#: number of albums processed at once when lyrics are filled in library tree
+LYRICS_ALBUM_WORKERS: int = 4
@@ -2,12 +2,15 @@
 
 import sys
 from pathlib import Path
+from typing import Tuple
 
 from appdirs import user_data_dir, user_log_dir
 
 __all__ = ["ROOT_DIR", "LOG_DIR", "OUTPUT_FOLDER", "OFFLINE_DEBUG_IMAGES",
            "FILES_DIR", "GOOGLE_API_URL", "API_KEY_FILE", "module_path",
-           "SETTINGS_INI"]
+           "SETTINGS_INI", "JOURNAL_DIR", "SERVER_ADDRESS",
+           "IMAGE_STORE_DIR", "LIBRARY_INDEX", "LYRICS_CACHE", "LYRICS_STATS",
+           "SEARCH_CACHE"]
 
 
 def _dir_writable(dir_name: Path) -> bool:
@@ -87,3 +90,17 @@ GOOGLE_API_URL: str = ("https://console.developers.google.com/projectselector/"
                        "apis/library/customsearch.googleapis.com")
 #: dictionary with package settings
 SETTINGS_INI: Path = Path(ROOT_DIR, "files", "settings.ini")
+#: directory holding checkpoint journals of batch runs
+JOURNAL_DIR: Path = Path(LOG_DIR, "journals")
+#: SQLite database holding index of music files tags
+LIBRARY_INDEX: Path = Path(ROOT_DIR, "files", "library_index.sqlite")
+#: SQLite database holding downloaded lyrics
+LYRICS_CACHE: Path = Path(ROOT_DIR, "files", "lyrics_cache.sqlite")
+#: success rates and latencies of lyrics sources
+LYRICS_STATS: Path = Path(ROOT_DIR, "files", "lyrics_stats.json")
+#: SQLite database holding google custom search responses and quota use
+SEARCH_CACHE: Path = Path(ROOT_DIR, "files", "search_cache.sqlite")
+#: directory to which images are spilled when image store memory is full
+IMAGE_STORE_DIR: Path = Path(LOG_DIR, "images")
+#: local address on which wiki_music server listens for jobs
+SERVER_ADDRESS: Tuple[str, int] = ("127.0.0.1", 45654)
@@ -1,7 +1,8 @@
 """Constants used by whole :mod:`wiki_music` module."""
 from typing import Tuple
 
-__all__ = ["TAGS", "EXTENDED_TAGS", "STR_TAGS", "LIST_TAGS"]
+__all__ = ["TAGS", "EXTENDED_TAGS", "STR_TAGS", "LIST_TAGS", "TAG_PADDING",
+           "TAG_CACHE_SIZE"]
 
 #: enumeration of tags that we are able to read and write to music files
 TAGS: Tuple[str, ...] = ("ALBUM", "ALBUMARTIST", "ARTIST", "COMPOSER",
@@ -15,3 +16,8 @@ EXTENDED_TAGS: Tuple[str, ...] = TAGS + ("FILE", "TYPE")
 STR_TAGS: Tuple[str, ...] = ("GENRE", "ALBUM", "ALBUMARTIST", "DATE")
 #: marks tags that consist of list of values for each entry
 LIST_TAGS: Tuple[str, ...] = ("ARTIST", "COMPOSER")
+#: padding in bytes reserved after tags when file has to be rewritten, so the
+#: next changes of tags can be saved in place without rewriting whole file
+TAG_PADDING: int = 64 * 2 ** 10
+#: maximum number of parsed tag handlers kept for reuse during session
+TAG_CACHE_SIZE: int = 512
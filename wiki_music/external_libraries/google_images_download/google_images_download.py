@@ -9,11 +9,12 @@ import re
 from ssl import CertificateError
 from typing import TYPE_CHECKING, Tuple
 from urllib.parse import quote
-from urllib.request import HTTPError, Request, URLError, urlopen
 
 from bs4 import BeautifulSoup
+from requests.exceptions import ConnectionError, HTTPError
 
 from wiki_music.utilities.gui_utils import get_sizes
+from wiki_music.utilities.http_client import HttpClient
 
 if TYPE_CHECKING:
     from typing_extensions import TypedDict
@@ -150,9 +151,9 @@ class GoogleImagesDownload:
     def download_page(self, url):
         """Downloading entire Web Document (Raw Page Content)."""
         try:
-            req = Request(url, headers=self.HEADERS)
-            with urlopen(req) as resp:
-                return str(resp.read())
+            resp = HttpClient.get(url, headers=self.HEADERS)
+            resp.raise_for_status()
+            return str(resp.content)
         except Exception as e:
             log.exception(e)
             print(f"Could not open URL. Please check your internet "
@@ -242,7 +243,6 @@ class GoogleImagesDownload:
         """Download Images."""
         wiki_music_thumb = None
         download_status = False
-        req = Request(image_url, headers=self.HEADERS)
 
         # timeout time to download an image
         if self.args('socket_timeout'):
@@ -251,8 +251,10 @@ class GoogleImagesDownload:
             timeout = 10
 
         try:
-            with urlopen(req, None, timeout) as response:
-                wiki_music_thumb = response.read()
+            response = HttpClient.get(image_url, headers=self.HEADERS,
+                                      timeout=timeout)
+            response.raise_for_status()
+            wiki_music_thumb = response.content
 
             download_status = True
             download_message = (f"Completed Image Thumbnail ====> "
@@ -262,8 +264,8 @@ class GoogleImagesDownload:
             download_message = self.ERROR.format("UnicodeEncodeError", e)
         except HTTPError as e:
             download_message = self.ERROR.format("HTTPError", e)
-        except URLError as e:
-            download_message = self.ERROR.format("URLError", e)
+        except ConnectionError as e:
+            download_message = self.ERROR.format("ConnectionError", e)
         except CertificateError as e:
             download_message = self.ERROR.format("CertificateError", e)
         except IOError as e:
@@ -2,8 +2,11 @@
 
 import logging
 
+from .hedge import Hedge
 from .lyrics import LyricsManager
 from .models import *
+from .search_planner import SearchPlanner
+from .stats import ExtractorStats
 
 logging.getLogger(__name__)
 
@@ -3,7 +3,7 @@
 import logging
 import re
 
-import requests
+from wiki_music.utilities.http_client import HttpClient
 
 from ..extractor import LyricsExtractor
 from ..models import exceptions
@@ -47,8 +47,8 @@ class Animelyrics(LyricsExtractor):
                     lyrics += p.span.text
             lyrics = lyrics.strip()
         else:
-            raw = requests.get(re.sub(r"\.html?", ".txt", url_data.url),
-                               allow_redirects=False)
+            raw = HttpClient.get(re.sub(r"\.html?", ".txt", url_data.url),
+                                 allow_redirects=False)
             content = raw.text.strip()
             match = re.search(r"-{10,}(.+?)-{10,}", content, flags=re.DOTALL)
             if match:
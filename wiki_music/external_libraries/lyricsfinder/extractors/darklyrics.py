@@ -21,13 +21,42 @@ class Darklyrics(LyricsExtractor):
     @classmethod
     def extract_lyrics(cls, url_data, song, artist):
         """Extract lyrics."""
+        track_list, release_date, lyrics = url_data.memo(cls.name,
+                                                         cls.split_album)
+
+        if not track_list:
+            raise exceptions.NoLyrics
+
+        # find the desired song
+        song_number = None
+        for key, value in track_list.items():
+
+            if song.lower() in value.lower():
+                song_number = key
+                title = value
+
+        lyric = lyrics.get(song_number, "")
+
+        if not lyric.strip():
+            raise exceptions.NoLyrics
+
+        return Lyrics(title, lyric, artist=artist.title(),
+                      release_date=release_date)
+
+    @classmethod
+    def split_album(cls, url_data):
+        """Split album page to lyrics of all songs in one pass.
+
+        Album page is the same for all its songs, so the result is shared
+        through :meth:`UrlData.memo` and the page is processed only once.
+        """
         bs = url_data.bs
 
         # get list of album tracks
         track_list = bs.find('div', class_='albumlyrics')
 
         if not track_list:
-            raise exceptions.NoLyrics
+            return {}, None, {}
 
         # get table header
         header = track_list.find("h2").text
@@ -41,7 +70,7 @@ class Darklyrics(LyricsExtractor):
             track_list[i] = re.split(r"\.|:", t)
 
         # remove whitespaces
-        track_list = {t[0]: t[1].strip() for t in track_list}
+        track_list = {int(t[0]): t[1].strip() for t in track_list}
 
         # find release date
         for string in re.findall(r'\(.*?\)', header):
@@ -54,26 +83,18 @@ class Darklyrics(LyricsExtractor):
 
         release_date = datetime.strptime(date_str, "%Y")
 
-        # find the desired song
-        for key, value in track_list.items():
-
-            if song.lower() in value.lower():
-                song_number = int(key)
-                title = track_list[key]
-
+        lyrics = {}
         try:
             lyrics_div = bs.find('div', class_='lyrics')
             # split into separate lyrics
-            lyrics = lyrics_div.prettify().split('</h3>')
-            lyric = cls.process_lyric(lyrics[song_number])
+            split = lyrics_div.prettify().split('</h3>')
+            for song_number in track_list:
+                if song_number < len(split):
+                    lyrics[song_number] = cls.process_lyric(split[song_number])
         except Exception as e:
             log.exception(e)
 
-        if not lyric.strip():
-            raise exceptions.NoLyrics
-
-        return Lyrics(title, lyric, artist=artist.title(),
-                      release_date=release_date)
+        return track_list, release_date, lyrics
 
     @classmethod
     def process_lyric(cls, lyric):
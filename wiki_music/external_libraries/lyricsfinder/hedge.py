@@ -0,0 +1,90 @@
+"""Policy for racing slow lyrics extractions of candidate urls."""
+
+import logging
+from typing import Any, Callable, Iterable, Optional, Set
+
+log = logging.getLogger(__name__)
+
+
+class Hedge:
+    """Decides when the next candidate url is tried in parallel.
+
+    Urls are started in order. When no running extraction finishes within
+    `delay` seconds, next url is started, up to `limit` of them at once. At
+    least one url is kept running until all of them were tried. Policy does
+    not wait for the extractions itself, so it serves both threads and
+    asyncio tasks.
+
+    Parameters
+    ----------
+    urls: Iterable[str]
+        candidate urls in order they should be tried
+    start: Callable[[str], Any]
+        starts extraction from url and returns its future or task
+    delay: float
+        seconds to wait for running extractions before the next url is
+        started
+    limit: int
+        maximal number of extractions running at once
+
+    Attributes
+    ----------
+    pending: Set[Any]
+        futures or tasks of running extractions
+    exhausted: bool
+        True when all urls have been started
+    """
+
+    def __init__(self, urls: Iterable[str], start: Callable[[str], Any],
+                 delay: float, limit: int) -> None:
+
+        self._candidates = iter(urls)
+        self._start = start
+        self.delay = delay
+        self.limit = limit
+        self.pending: Set[Any] = set()
+        self.exhausted = False
+
+        self.launch()
+
+    def launch(self):
+        """Start extraction of the next url if there is any left."""
+        url = next(self._candidates, None)
+        if url is None:
+            self.exhausted = True
+        else:
+            self.pending.add(self._start(url))
+
+    @property
+    def timeout(self) -> Optional[float]:
+        """Time to wait for pending extractions before calling :meth:`update`.
+
+        None means wait until some of them finishes.
+        """
+        if self.exhausted or len(self.pending) >= self.limit:
+            return None
+        return self.delay
+
+    def update(self, done: Set[Any]):
+        """Remove finished extractions and start next url if needed.
+
+        Parameters
+        ----------
+        done: Set[Any]
+            extractions which finished while waiting, if empty, the wait
+            timed out and the next url is raced against the slow ones
+        """
+        self.pending -= done
+
+        if self.exhausted:
+            return
+        if not done:
+            log.debug("hedging slow extraction with next url")
+            self.launch()
+        elif not self.pending:
+            self.launch()
+
+    def cancel(self):
+        """Cancel extractions which are still running."""
+        for extraction in self.pending:
+            extraction.cancel()
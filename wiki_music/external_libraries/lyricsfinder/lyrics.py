@@ -1,7 +1,12 @@
 """Fancy lyrics managment."""
 
 import logging
-from typing import TYPE_CHECKING, Iterator, List
+import time
+from concurrent.futures import (FIRST_COMPLETED, Future, ThreadPoolExecutor,
+                                wait)
+from threading import BoundedSemaphore, Lock
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
 
 from . import extractors
 from .extractor import LyricsExtractor
@@ -12,8 +17,11 @@ from .extractors.genius import Genius
 from .extractors.lyrical_nonsense import LyricalNonsense
 from .extractors.lyricsmode import Lyricsmode
 from .extractors.musixmatch import MusixMatch
+from .hedge import Hedge
 from .models import Lyrics, LyricsOrigin, exceptions
-from .utils import UrlData, generate_url, search
+from .stats import ExtractorStats
+from .search_planner import SearchPlanner
+from .utils import UrlData
 
 log = logging.getLogger(__name__)
 
@@ -25,6 +33,21 @@ class LyricsManager:
 
     google_api_key = None
 
+    # seconds to wait for candidate url before the next one is tried in
+    # parallel
+    hedge_delay: float = 2.0
+    # maximal number of candidate urls of one song tried at once
+    hedge_candidates: int = 3
+    # maximal number of concurrent extractions from one host
+    hedge_per_host: int = 4
+    hedge_workers: int = 16
+
+    _lock = Lock()
+    _executor: Optional[ThreadPoolExecutor] = None
+    _host_limits: Dict[str, BoundedSemaphore] = {}
+    # extractors which can handle each host
+    _dispatch: Dict[str, List[LyricsExtractor]] = {}
+
     @classmethod
     def setup(cls):
         """Initialize class."""
@@ -35,55 +58,170 @@ class LyricsManager:
         cls.extractors = LyricsExtractor.extractors
         log.info("loaded {} extractors".format(len(cls.extractors)))
 
+    @classmethod
+    def extractors_for(cls, url: str) -> List[LyricsExtractor]:
+        """Get extractors that can handle url, looked up by url host."""
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+
+        with cls._lock:
+            if host not in cls._dispatch:
+                url_data = UrlData(f"{parsed.scheme}://{host}/")
+                cls._dispatch[host] = [e for e in cls.extractors
+                                       if e.can_handle(url_data)]
+            return cls._dispatch[host]
+
+    @classmethod
+    def rank_urls(cls, urls: List[str]) -> List[str]:
+        """Order urls so historically fast and reliable sources go first.
+
+        Urls which no extractor can handle or whose extractors are skipped
+        by circuit breaker are left out. Order of urls with equally rated
+        sources is kept.
+        """
+        scores = {}
+        for url in urls:
+            names = [e.name for e in cls.extractors_for(url)
+                     if ExtractorStats.available(e.name)]
+            if names:
+                scores[url] = max(ExtractorStats.score(n) for n in names)
+            else:
+                log.debug(f"skipping lyrics candidate {url}")
+
+        return sorted(scores, key=scores.get, reverse=True)
+
     @classmethod
     def extract_lyrics(cls, url: str, song: str, artist: str) -> Lyrics:
         """Extract lyrics from url."""
         log.info("extracting lyrics from url \"{}\"".format(url))
         url_data = UrlData(url)
-        for extractor in cls.extractors:
+        missing = False
+        for extractor in cls.extractors_for(url):
 
-            if not extractor.can_handle(url_data):
+            if not ExtractorStats.available(extractor.name):
+                log.debug(f"{extractor} is temporarily skipped")
                 continue
 
             log.debug("using {} for {}".format(extractor, url_data))
 
+            start = time.perf_counter()
             try:
                 lyrics = extractor.extract_lyrics(url_data, song, artist)
             except exceptions.NoLyrics:
                 log.warning(f"{extractor} didn't find any lyrics at {url}")
+                missing = missing or url_data.downloaded
+                ExtractorStats.record(extractor.name, False,
+                                      time.perf_counter() - start)
                 continue
             except exceptions.NotAllowedError:
                 log.warning(f"{extractor} couldn't access lyrics at {url}")
+                ExtractorStats.record(extractor.name, False,
+                                      time.perf_counter() - start,
+                                      blocked=True)
                 continue
             except Exception:
                 log.exception(f"Something went wrong when {extractor} "
                               f"handled {url}")
+                ExtractorStats.record(extractor.name, False,
+                                      time.perf_counter() - start,
+                                      failed=True)
                 continue
             else:
+                ExtractorStats.record(extractor.name, True,
+                                      time.perf_counter() - start)
                 lyrics.origin = LyricsOrigin(url, extractor.name,
                                              extractor.url)
                 log.debug(f"extracted lyrics {lyrics}")
                 return lyrics
-        raise exceptions.NoExtractorError(url)
+        raise exceptions.NoExtractorError(url, missing=missing)
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        """Get executor shared by all hedged searches."""
+        with cls._lock:
+            if not cls._executor:
+                cls._executor = ThreadPoolExecutor(
+                    cls.hedge_workers, thread_name_prefix="LyricsHedge")
+            return cls._executor
+
+    @classmethod
+    def _host_limit(cls, url: str) -> BoundedSemaphore:
+        """Get semaphore limiting concurrent extractions from url host."""
+        host = urlparse(url).netloc.lower()
+        with cls._lock:
+            if host not in cls._host_limits:
+                cls._host_limits[host] = BoundedSemaphore(cls.hedge_per_host)
+            return cls._host_limits[host]
+
+    @classmethod
+    def _try_extract(cls, url: str, song: str, artist: str
+                     ) -> Optional[Lyrics]:
+        """Extract lyrics from url, return None if it is not possible."""
+        with cls._host_limit(url):
+            try:
+                return cls.extract_lyrics(url, song, artist)
+            except exceptions.NoExtractorError:
+                log.warning("No extractor for url {}".format(url))
+            except Exception:
+                log.exception(f"Extraction from {url} failed")
+        return None
+
+    @classmethod
+    def _hedged_extract(cls, urls: List[str], song: str, artist: str
+                        ) -> Iterator[Lyrics]:
+        """Extract lyrics from candidate urls, racing the slow ones.
+
+        Urls are tried in order. When the extraction takes longer than
+        `hedge_delay`, next url is tried in parallel, up to
+        `hedge_candidates` at once, see :class:`.hedge.Hedge`. Lyrics are
+        yielded in order of completion, extractions which did not start are
+        cancelled when the iterator is closed.
+        """
+        executor = cls._get_executor()
+
+        def start(url: str) -> Future:
+            return executor.submit(cls._try_extract, url, song, artist)
+
+        hedge = Hedge(urls, start, cls.hedge_delay, cls.hedge_candidates)
+
+        try:
+            while hedge.pending:
+                done, _ = wait(hedge.pending, timeout=hedge.timeout,
+                               return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    lyrics = future.result()
+                    if lyrics:
+                        yield lyrics
+
+                hedge.update(done)
+        finally:
+            hedge.cancel()
 
     @classmethod
     def search_lyrics(cls, song: str, album: str, artist: str, *,
-                      google_api_key: str) -> Iterator[Lyrics]:
-        """Search the net for lyrics."""
-        query = artist + " " + song
-        results = search(query, google_api_key)
-
-        log.debug("got {} results fom google search".format(len(results)))
-
-        # google search does not return any results after daily limit
-        # of 100 searches is exceeded
-        if not results:
-            log.warning("Google custom search returned no results! "
-                        "---> Switching to url generation")
-            results = generate_url(artist, album, song)
-
-        for result in results:
-            url = result["link"]
+                      google_api_key: str, hedge: bool = True
+                      ) -> Iterator[Lyrics]:
+        """Search the net for lyrics.
+
+        With `hedge` slow candidate urls do not hold up the search, see
+        :meth:`_hedged_extract`.
+        """
+        query, results = SearchPlanner.candidates(artist, album, song,
+                                                  google_api_key)
+
+        log.debug("got {} candidate urls".format(len(results)))
+
+        urls = cls.rank_urls([result["link"] for result in results])
+
+        if hedge:
+            for lyrics in cls._hedged_extract(urls, song, artist):
+                lyrics.origin.query = query
+                yield lyrics
+            log.warning("No lyrics found for query \"{}\"".format(query))
+            return
+
+        for url in urls:
 
             try:
                 lyrics = cls.extract_lyrics(url, song, artist)
@@ -6,8 +6,13 @@ NotAllowedError = type("NotAllowedError", (LyricsException,), {})
 
 
 class NoExtractorError(LyricsException):
-    """When there's no extractor for a url."""
+    """When there's no extractor for a url.
 
-    def __init__(self, url):
+    `missing` is True if some extractor parsed the downloaded page and did
+    not find the lyrics there, as opposed to a transient failure.
+    """
+
+    def __init__(self, url, missing=False):
         """Create new."""
         super().__init__("No extractor found for {}".format(url))
+        self.missing = missing
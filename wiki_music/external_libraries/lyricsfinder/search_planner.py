@@ -0,0 +1,254 @@
+"""Google custom search with persistent cache and daily quota planning."""
+
+import json
+import logging
+import re
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from threading import Lock, RLock
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from zoneinfo import ZoneInfo
+
+from wiki_music.constants import (ALBUM_LYRICS_HOSTS, SEARCH_CACHE,
+                                  SEARCH_CACHE_TTL, SEARCH_DAILY_QUOTA,
+                                  SEARCH_QUOTA_RESERVE)
+from wiki_music.utilities import caseless_contains, normalize_caseless
+
+from .utils import generate_url, search_page
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    query TEXT PRIMARY KEY,
+    items TEXT NOT NULL,
+    fetched REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quota (
+    day TEXT PRIMARY KEY,
+    used INTEGER NOT NULL
+);
+"""
+
+#: error reasons google returns when daily limit is exceeded
+_QUOTA_ERRORS = ("dailyLimitExceeded", "rateLimitExceeded", "quotaExceeded")
+
+
+class SearchPlanner:
+    """Decides how to find candidate lyrics urls for each song.
+
+    Google custom search allows only
+    :const:`wiki_music.constants.parser_const.SEARCH_DAILY_QUOTA` free
+    queries a day. Planner caches responses on disk, counts queries sent
+    each day and spends them in this order:
+
+    1. one album level query shared by all songs of an album, its results
+       which are album lyrics pages or mention the song are used directly
+    2. single song query while more than
+       :const:`wiki_music.constants.parser_const.SEARCH_QUOTA_RESERVE`
+       queries are left
+    3. urls generated from artist, album and song names
+
+    When google reports exceeded limit the quota is marked as spent for the
+    rest of the day, so no more doomed queries are sent. Quota is reset at
+    midnight Pacific time, same as google does.
+    """
+
+    path: Path = SEARCH_CACHE
+    quota: int = SEARCH_DAILY_QUOTA
+    reserve: int = SEARCH_QUOTA_RESERVE
+
+    _lock: RLock = RLock()
+    _connection: Optional[sqlite3.Connection] = None
+    _pending: Dict[str, Tuple[Lock, int]] = {}
+
+    @classmethod
+    def _connect(cls) -> sqlite3.Connection:
+        if not cls._connection:
+            cls.path.parent.mkdir(parents=True, exist_ok=True)
+            cls._connection = sqlite3.connect(str(cls.path),
+                                              check_same_thread=False)
+            cls._connection.executescript(_SCHEMA)
+        return cls._connection
+
+    @classmethod
+    def close(cls):
+        """Close database connection."""
+        with cls._lock:
+            if cls._connection:
+                cls._connection.close()
+                cls._connection = None
+
+    @staticmethod
+    def _today() -> str:
+        # google quota day ends at midnight Pacific time
+        return datetime.now(ZoneInfo("America/Los_Angeles")).strftime(
+            "%Y-%m-%d")
+
+    @classmethod
+    def used(cls) -> int:
+        """Number of queries sent today."""
+        with cls._lock:
+            row = cls._connect().execute(
+                "SELECT used FROM quota WHERE day = ?",
+                (cls._today(), )).fetchone()
+        return row[0] if row else 0
+
+    @classmethod
+    def remaining(cls) -> int:
+        """Number of queries left for today."""
+        return max(cls.quota - cls.used(), 0)
+
+    @classmethod
+    def _spend(cls, exhausted: bool = False):
+        with cls._lock:
+            connection = cls._connect()
+            used = cls.quota if exhausted else cls.used() + 1
+            connection.execute("INSERT OR REPLACE INTO quota VALUES (?, ?)",
+                               (cls._today(), used))
+            connection.commit()
+
+    @classmethod
+    def _cached(cls, key: str) -> Optional[List[dict]]:
+        with cls._lock:
+            row = cls._connect().execute(
+                "SELECT items, fetched FROM responses WHERE query = ?",
+                (key, )).fetchone()
+
+        if row and time.time() - row[1] < SEARCH_CACHE_TTL:
+            return json.loads(row[0])
+        return None
+
+    @classmethod
+    def query(cls, query: str, api_key: Optional[str], keep: int = 0
+              ) -> Optional[List[dict]]:
+        """Get custom search results from cache or from google.
+
+        Concurrent calls with the same query wait for one request.
+
+        Parameters
+        ----------
+        query: str
+            searched string
+        api_key: Optional[str]
+            google API key, without it only cache is used
+        keep: int
+            number of queries that must be left in quota for request to be
+            sent
+
+        Returns
+        -------
+        Optional[List[dict]]
+            search results, None if query was not cached and could not be
+            sent
+        """
+        key = re.sub(r"\s+", " ", normalize_caseless(query)).strip()
+
+        # count waiting threads so the lock is dropped with the last one
+        with cls._lock:
+            pending, waiting = cls._pending.get(key, (Lock(), 0))
+            cls._pending[key] = (pending, waiting + 1)
+
+        try:
+            with pending:
+                return cls._query(key, query, api_key, keep)
+        finally:
+            with cls._lock:
+                pending, waiting = cls._pending[key]
+                if waiting > 1:
+                    cls._pending[key] = (pending, waiting - 1)
+                else:
+                    del cls._pending[key]
+
+    @classmethod
+    def _query(cls, key: str, query: str, api_key: Optional[str], keep: int
+               ) -> Optional[List[dict]]:
+        items = cls._cached(key)
+        if items is not None:
+            log.debug(f"search cache hit for: {query}")
+            return items
+
+        with cls._lock:
+            if not api_key or cls.remaining() <= keep:
+                return None
+            cls._spend()
+
+        try:
+            response = search_page(query, api_key)
+        except Exception as e:
+            log.warning(f"google custom search failed: {e}")
+            return None
+
+        error = response.get("error")
+        if error:
+            reasons = [e.get("reason") for e in error.get("errors", [])]
+            if error.get("code") == 429 or any(r in _QUOTA_ERRORS
+                                               for r in reasons):
+                log.warning("Google custom search quota exhausted! "
+                            "---> Switching to url generation")
+                cls._spend(exhausted=True)
+            else:
+                log.warning(f"google custom search error: "
+                            f"{error.get('message')}")
+            return None
+
+        items = response.get("items", [])
+        with cls._lock:
+            connection = cls._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (key, json.dumps(items), time.time()))
+            connection.commit()
+
+        return items
+
+    @staticmethod
+    def _covers(item: dict, song: str) -> bool:
+        """Check that album query result can contain song lyrics."""
+        host = urlparse(item.get("link", "")).netloc.lower()
+        if any(host == h or host.endswith("." + h)
+               for h in ALBUM_LYRICS_HOSTS):
+            return True
+        return caseless_contains(song, item.get("title", ""))
+
+    @classmethod
+    def candidates(cls, artist: str, album: str, song: str,
+                   api_key: Optional[str]) -> Tuple[str, List[dict]]:
+        """Get candidate urls for song lyrics, spending least quota possible.
+
+        Parameters
+        ----------
+        artist: str
+            artist name
+        album: str
+            album name
+        song: str
+            song name
+        api_key: Optional[str]
+            google API key
+
+        Returns
+        -------
+        str
+            query which produced the results
+        List[dict]
+            search results, each has at least `link` key
+        """
+        if album:
+            query = f"{artist} {album} lyrics"
+            items = cls.query(query, api_key)
+            covering = [i for i in items or [] if cls._covers(i, song)]
+            if covering:
+                log.debug(f"album search covers: {artist} - {song}")
+                return query, covering + generate_url(artist, album, song)
+
+        query = f"{artist} {song}"
+        items = cls.query(query, api_key, keep=cls.reserve if album else 0)
+        if items:
+            return query, items
+
+        log.info(f"Using generated urls for: {artist} - {song}")
+        return query, generate_url(artist, album, song)
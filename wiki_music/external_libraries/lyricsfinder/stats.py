@@ -0,0 +1,145 @@
+"""Health statistics of lyrics extractors persisted between runs."""
+
+import json
+import logging
+import time
+from pathlib import Path
+from threading import RLock
+from typing import Dict, Optional
+
+from wiki_music.constants import LYRICS_STATS
+
+log = logging.getLogger(__name__)
+
+
+class ExtractorStats:
+    """Success rate, latency and failures of each extractor.
+
+    Statistics are used to try sources that are historically fast and
+    reliable first. Circuit breaker skips sources that failed
+    `failure_threshold` times in a row or refused access, until `cooldown`
+    seconds pass. Song simply missing on the site is not counted as failure.
+    """
+
+    path: Path = LYRICS_STATS
+
+    # number of recent latencies kept for each extractor
+    window: int = 50
+    # consecutive failures after which extractor is skipped
+    failure_threshold: int = 3
+    # seconds for which failing extractor is skipped
+    cooldown: float = 15 * 60
+    # minimal seconds between saves to disk
+    save_interval: float = 30
+
+    _lock = RLock()
+    _records: Optional[Dict[str, dict]] = None
+    _last_save: float = 0.0
+
+    @classmethod
+    def _get_records(cls) -> Dict[str, dict]:
+        """Get statistics, load them from disk on first access."""
+        with cls._lock:
+            if cls._records is None:
+                try:
+                    cls._records = json.loads(cls.path.read_text())
+                except (OSError, ValueError):
+                    cls._records = {}
+                else:
+                    log.debug(f"loaded extractor statistics from {cls.path}")
+            return cls._records
+
+    @classmethod
+    def _get(cls, name: str) -> dict:
+        records = cls._get_records()
+        if name not in records:
+            records[name] = {"attempts": 0, "successes": 0, "latencies": [],
+                             "failures": 0, "blocked_until": 0.0}
+        return records[name]
+
+    @classmethod
+    def record(cls, name: str, success: bool, latency: float,
+               failed: bool = False, blocked: bool = False):
+        """Record outcome of one extraction.
+
+        Parameters
+        ----------
+        name: str
+            extractor name
+        success: bool
+            whether lyrics were extracted
+        latency: float
+            extraction time in seconds
+        failed: bool
+            extraction raised error, counts towards circuit breaking
+        blocked: bool
+            site refused access, extractor is skipped immediately
+        """
+        with cls._lock:
+            stats = cls._get(name)
+            stats["attempts"] += 1
+            stats["successes"] += int(success)
+            stats["latencies"] = (stats["latencies"] +
+                                  [round(latency, 3)])[-cls.window:]
+
+            if success or not (failed or blocked):
+                stats["failures"] = 0
+            else:
+                stats["failures"] += 1
+
+            if blocked or stats["failures"] >= cls.failure_threshold:
+                log.warning(f"skipping lyrics source {name} for "
+                            f"{cls.cooldown:.0f}s after repeated failures")
+                stats["blocked_until"] = time.time() + cls.cooldown
+                stats["failures"] = 0
+
+            if time.time() - cls._last_save > cls.save_interval:
+                cls.save()
+
+    @classmethod
+    def available(cls, name: str) -> bool:
+        """Check that extractor is not skipped by circuit breaker."""
+        with cls._lock:
+            return cls._get(name)["blocked_until"] <= time.time()
+
+    @classmethod
+    def summary(cls, name: str) -> Dict[str, float]:
+        """Get success ratio, median and 95th percentile latency.
+
+        Success ratio is smoothed so sources without history are rated 0.5.
+        """
+        with cls._lock:
+            stats = cls._get(name)
+            latencies = sorted(stats["latencies"])
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1,
+                                 int(p * len(latencies)))]
+
+        return {"ratio": (stats["successes"] + 1) / (stats["attempts"] + 2),
+                "p50": percentile(0.5), "p95": percentile(0.95),
+                "failures": stats["failures"]}
+
+    @classmethod
+    def score(cls, name: str) -> float:
+        """Rate extractor, reliable and fast sources have higher score.
+
+        Sources without history are assumed to respond in one second.
+        """
+        summary = cls.summary(name)
+        return summary["ratio"] / (1 + (summary["p50"] or 1.0))
+
+    @classmethod
+    def save(cls):
+        """Write statistics to disk."""
+        with cls._lock:
+            if cls._records is None:
+                return
+            try:
+                cls.path.parent.mkdir(parents=True, exist_ok=True)
+                cls.path.write_text(json.dumps(cls._records))
+            except OSError as e:
+                log.warning(f"could not save extractor statistics: {e}")
+            cls._last_save = time.time()
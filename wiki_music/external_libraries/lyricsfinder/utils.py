@@ -1,19 +1,100 @@
 """Utitlities."""
 
 import re
-from typing import List, Tuple, Optional
+from collections import OrderedDict
+from threading import Lock, RLock
+from typing import Any, Callable, Dict, List, Tuple, Optional
 
-import requests
 from bs4 import BeautifulSoup
 from requests import Response
 
+from wiki_music.utilities.http_client import HttpClient
+
+
+#: number of downloaded pages kept by :class:`_Page`
+PAGE_CACHE_SIZE = 32
+
+
+class _Page:
+    """Downloaded page shared by all :class:`UrlData` with the same url.
+
+    Concurrent requests for the same url wait for one download and share the
+    parsed document. Recently used pages are kept so repeated requests, e.g.
+    for different songs on one album page, are not downloaded again.
+    """
+
+    _lock: Lock = Lock()
+    _pages: "OrderedDict[Tuple[str, tuple], _Page]" = OrderedDict()
+
+    def __init__(self, url: str, headers: dict):
+        self.url = url
+        self.headers = headers
+        self.lock = RLock()
+        self.resp: Optional[Response] = None
+        self.html: Optional[str] = None
+        self.bs: Dict[str, BeautifulSoup] = {}
+        self.memo: Dict[str, Any] = {}
+
+    @classmethod
+    def get(cls, url: str, headers: dict) -> "_Page":
+        """Get shared page for url and request headers."""
+        key = (url, tuple(sorted(headers.items())))
+
+        with cls._lock:
+            page = cls._pages.get(key)
+            if page is None:
+                page = cls._pages[key] = cls(url, headers)
+            cls._pages.move_to_end(key)
+
+            while len(cls._pages) > PAGE_CACHE_SIZE:
+                cls._pages.popitem(last=False)
+
+        return page
+
+    @classmethod
+    def clear(cls):
+        """Forget all downloaded pages."""
+        with cls._lock:
+            cls._pages.clear()
+
+    def response(self) -> Response:
+        with self.lock:
+            if self.resp:
+                return self.resp
+
+            resp = HttpClient.get(self.url, headers=self.headers)
+            # server errors are transient, do not keep them for others
+            if resp.status_code < 500:
+                self.resp = resp
+            return resp
+
+    def text(self) -> str:
+        with self.lock:
+            if self.html:
+                return self.html
+
+            html = self.response().text
+            if self.resp:
+                self.html = html
+            return html
+
+    def soup(self, parser: str) -> BeautifulSoup:
+        with self.lock:
+            if parser in self.bs:
+                return self.bs[parser]
+
+            bs = BeautifulSoup(self.text(), parser)
+            if self.html:
+                self.bs[parser] = bs
+            return bs
+
 
 class UrlData:
-    """Url stuff."""
+    """Url stuff.
 
-    _resp: Optional[Response]
-    _html: Optional[str]
-    _bs: Optional[BeautifulSoup]
+    Downloaded and parsed pages are shared by all instances with the same
+    url and headers, so the page is fetched only once.
+    """
 
     def __init__(self, url: str):
         """Build url."""
@@ -22,34 +103,47 @@ class UrlData:
         self.html_parser: str = "lxml"
 
         self._url = url
-        self._resp = None
-        self._html = None
-        self._bs = None
 
     def __str__(self):
         """Return string rep."""
         return "<{}>".format(self.url)
 
+    @property
+    def _page(self) -> _Page:
+        return _Page.get(self.url, self.headers)
+
     @property
     def resp(self) -> Response:
         """Get the requests response object."""
-        if not self._resp:
-            self._resp = requests.get(self.url, headers=self.headers)
-        return self._resp
+        return self._page.response()
+
+    @property
+    def downloaded(self) -> bool:
+        """Check that page was already downloaded without an error."""
+        resp = self._page.resp
+        return resp is not None and resp.ok
 
     @property
     def html(self) -> str:
         """Get the html for this url."""
-        if not self._html:
-            self._html = self.resp.text
-        return self._html
+        return self._page.text()
 
     @property
     def bs(self) -> BeautifulSoup:
         """Get the BeautifulSoup object."""
-        if not self._bs:
-            self._bs = BeautifulSoup(self.html, self.html_parser)
-        return self._bs
+        return self._page.soup(self.html_parser)
+
+    def memo(self, key: str, factory: Callable[["UrlData"], Any]) -> Any:
+        """Get value computed from page, computed only once for each page.
+
+        Lets extractors process page which contains lyrics of many songs,
+        e.g. whole album, only once and then serve all songs from result.
+        """
+        page = self._page
+        with page.lock:
+            if key not in page.memo:
+                page.memo[key] = factory(self)
+            return page.memo[key]
 
     @property
     def url(self):
@@ -58,13 +152,10 @@ class UrlData:
     @url.setter
     def url(self, value: str):
         self._url = value
-        self._resp = None
-        self._html = None
-        self._bs = None
 
 
-def search(query: str, api_key: str) -> List:
-    """Return search results."""
+def search_page(query: str, api_key: str) -> dict:
+    """Return whole google custom search response, including errors."""
 
     # ! to edit head to: https://cse.google.com/cse/all
 
@@ -75,11 +166,14 @@ def search(query: str, api_key: str) -> List:
         #"cx": "002017775112634544492:7y5bpl2sn78", # original without darklyrics
         "q": query
     }
-    resp = requests.get("https://www.googleapis.com/customsearch/v1",
-                        params=params)
-    data = resp.json()
-    items = data.get("items", [])
-    return items
+    resp = HttpClient.get("https://www.googleapis.com/customsearch/v1",
+                          params=params)
+    return resp.json()
+
+
+def search(query: str, api_key: str) -> List:
+    """Return search results."""
+    return search_page(query, api_key).get("items", [])
 
 
 def generate_url(artist: str, album: str, song: str) -> List[dict]:
@@ -133,6 +133,8 @@ class ProgressBar:
         if progress:
             self._progress_dialog.setValue(progress.actual)
             self._progress_dialog.setMaximum(progress.max)
+            if progress.description:
+                self._progress_dialog.setLabelText(progress.description)
 
             if progress.actual == progress.max or progress.finished:
                 self._progress_dialog.cancel()
@@ -17,7 +17,7 @@ from wiki_music.gui_lib.qt_importer import (QAbstractItemView, QImage, QLabel,
                                             QMessageBox, QPixmap,
                                             QStandardItemModel, QTimer)
 from wiki_music.library.parser import WikipediaRunner
-from wiki_music.utilities import exception
+from wiki_music.utilities import IniSettings, exception
 
 if TYPE_CHECKING:
     from wiki_music.gui_lib.qt_importer import QModelIndex
@@ -42,7 +42,9 @@ class ParserInteract(BaseGui):
 
     def __init__(self) -> None:
 
-        self._parser = WikipediaRunner(GUI=True)
+        self._parser = WikipediaRunner(
+            GUI=True,
+            lyrics_prefetch=IniSettings.read("lyrics_prefetch", False, bool))
         super().__init__()
 
         # TODO needs QThreads to work
@@ -436,10 +438,12 @@ class DataModel(ParserInteract):
         if image:
             self.COVERART = image
 
+        # cover art read from file is only a handle, load image data now
         if self.cover_art:
-            self.cover_art.update_pixmap(self.COVERART)
+            self.cover_art.update_pixmap(bytes(self.COVERART))
         else:
-            self.cover_art = ResizablePixmap(self.COVERART, stretch=True)
+            self.cover_art = ResizablePixmap(bytes(self.COVERART),
+                                             stretch=True)
             self.picture_layout.addWidget(self.cover_art)
 
     @exception(log)
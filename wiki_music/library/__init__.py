@@ -3,10 +3,16 @@ Wikipedia page, search and download lyrics, read and write music tags """
 
 import logging
 
-from .lyrics import save_lyrics
+from .batch import BatchRunner
+from .index import LibraryIndex
+from .lyrics import LyricsPrefetch, save_lyrics
+from .lyrics_cache import LyricsCache
+from .lyrics_engine import LyricsEngine
 from .parser import WikipediaRunner
 from .tags_io import read_tags, write_tags
 
-__all__ = ["WikipediaRunner", "write_tags", "read_tags", "save_lyrics"]
+__all__ = ["WikipediaRunner", "BatchRunner", "write_tags", "read_tags",
+           "save_lyrics", "LibraryIndex", "LyricsCache", "LyricsEngine",
+           "LyricsPrefetch"]
 
 logging.getLogger(__name__)
@@ -0,0 +1,144 @@
+"""Run wikipedia search over whole music library tree."""
+
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import DefaultDict, Generator, List, Optional, Tuple, Union
+
+from wiki_music.constants import GREEN, LYRICS_ALBUM_WORKERS, RESET
+from wiki_music.utilities import Journal, exception, iter_files
+
+from .parser import WikipediaRunner
+from .tags_io import read_tags
+
+log = logging.getLogger(__name__)
+
+__all__ = ["BatchRunner"]
+
+
+class BatchRunner:
+    """Runs non-interactive wikipedia search for each album in library.
+
+    Every directory that directly contains music files is considered to be
+    one album. Album and band names are read from tags of the first file in
+    the directory, if they are missing, directory name and its parent
+    directory name are used instead.
+
+    Progress is recorded to append-only journal so interrupted run can be
+    restarted and will skip already completed albums and stages.
+
+    In lyrics only mode, lyrics are searched just for tracks which do not
+    have them in tags, for several albums at once. Such run needs no journal
+    because completed albums have nothing left to search.
+
+    See also
+    --------
+    :class:`wiki_music.utilities.journal.Journal`
+        checkpoint journal
+    :meth:`wiki_music.library.parser.WikipediaRunner.run_batch`
+        method that processes one album
+
+    Parameters
+    ----------
+    library_dir: Union[str, Path]
+        root of the music library tree
+    journal: Optional[Union[str, Path]]
+        path to journal file, if not specified journal is kept in
+        :const:`wiki_music.constants.paths.JOURNAL_DIR` under name unique for
+        each library directory
+    offline_debug: bool
+        use offline pickle files instead of web pages
+    write_json: bool
+        write json tracklist file for each album
+    multi_threaded: bool
+        whether to run some parts of code in threads
+    with_log: bool
+        if parser should output its progress to logger
+    lyrics_only: bool
+        only fill in missing lyrics
+    """
+
+    def __init__(self, library_dir: Union[str, Path],
+                 journal: Optional[Union[str, Path]] = None,
+                 offline_debug: bool = False, write_json: bool = False,
+                 multi_threaded: bool = True, with_log: bool = False,
+                 lyrics_only: bool = False) -> None:
+
+        self.library_dir = Path(library_dir).resolve()
+
+        if journal:
+            self.journal = Journal(Path(journal))
+        else:
+            self.journal = Journal.for_directory(self.library_dir)
+        self.offline_debug = offline_debug
+        self.write_json = write_json
+        self.multi_threaded = multi_threaded
+        self.with_log = with_log
+        self.lyrics_only = lyrics_only
+
+    def albums(self) -> Generator[Tuple[Path, str, str], None, None]:
+        """Find album directories in library tree.
+
+        Yields
+        ------
+        Path
+            album directory
+        str
+            album name
+        str
+            band name
+        """
+        directories: DefaultDict[Path, List[Path]] = defaultdict(list)
+        for f in iter_files(self.library_dir):
+            directories[f.parent].append(f)
+
+        for work_dir in sorted(directories):
+            files = sorted(directories[work_dir])
+
+            tags = read_tags(files[0], cover_art=False) or dict()
+            album = tags.get("ALBUM") or work_dir.name
+            band = tags.get("ALBUMARTIST") or work_dir.parent.name
+
+            yield work_dir, album, band
+
+    @exception(log)
+    def run(self):
+        """Process all albums in library one after another."""
+        if self.lyrics_only:
+            self._run_lyrics()
+            return
+
+        print(GREEN + "Using journal: " + RESET + str(self.journal.path))
+
+        for work_dir, album, band in self.albums():
+
+            print(GREEN + f"\nProcessing album: {RESET}{album} by {band}")
+            parser = WikipediaRunner(album=album, band=band,
+                                     work_dir=work_dir, GUI=False,
+                                     with_log=self.with_log,
+                                     offline_debug=self.offline_debug,
+                                     write_json=self.write_json,
+                                     multi_threaded=self.multi_threaded)
+            parser.run_batch(self.journal)
+
+    def _run_lyrics(self):
+        """Fill missing lyrics of all albums in library.
+
+        Number of albums processed at once is limited by
+        :const:`wiki_music.constants.parser_const.LYRICS_ALBUM_WORKERS`,
+        songs of all of them share the lyrics engine limits. Failure of one
+        album is logged and does not stop the others.
+        """
+        @exception(log)
+        def fill(work_dir: Path, album: str, band: str):
+            print(GREEN + f"\nFilling lyrics of: {RESET}{album} by {band}")
+            WikipediaRunner(work_dir=work_dir, GUI=False,
+                            with_log=self.with_log,
+                            multi_threaded=self.multi_threaded).run_lyrics()
+
+        workers = LYRICS_ALBUM_WORKERS if self.multi_threaded else 1
+        with ThreadPoolExecutor(workers,
+                                thread_name_prefix="BatchLyrics") as executor:
+            for future in [executor.submit(fill, *a) for a in self.albums()]:
+                future.result()
@@ -0,0 +1,471 @@
+"""Persistent index of music files tags backed by SQLite database."""
+
+import json  # lazy loaded
+import logging
+import os
+import re
+import sqlite3
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from threading import RLock
+from typing import (Any, Callable, Dict, Iterable, List, Optional, Sequence,
+                    Tuple, Union)
+
+from wiki_music.constants import (LIBRARY_INDEX, MAX_WORKERS,
+                                  PROCESS_POOL_MIN_FILES, TAGS)
+from wiki_music.utilities import ProcessPool, ThreadPool, ThreadPoolProgress
+
+from .tags_handler import CoverArt
+from .tags_io import read_tags
+
+log = logging.getLogger(__name__)
+
+__all__ = ["LibraryIndex"]
+
+#: increase when the table layout or stored tags change
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    format TEXT NOT NULL,
+    duration REAL NOT NULL,
+    tags TEXT NOT NULL,
+    cover_digest TEXT,
+    cover_size INTEGER,
+    cover_mime TEXT
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files (dir);
+"""
+
+
+def _report_progress(actual: int, maximum: int):
+    ThreadPoolProgress(actual=actual, maximum=maximum)
+
+
+def _read_record(song_file: Path, fast: bool = True) -> Dict:
+    """Read tags with track duration, used by worker threads or processes.
+
+    Parameters
+    ----------
+    song_file: Path
+        path to song on disk
+    fast: bool
+        if True file is read by fast scanner, which does not decode whole
+        tags, otherwise file is parsed and its tag handler is kept in
+        :class:`wiki_music.library.tags_handler.cache.TagCache`, so writing
+        the tags later in the same process does not parse the file again
+
+    Returns
+    -------
+    Dict
+        tags dictionary extended with `DURATION` key, empty if file could not
+        be read
+    """
+    return read_tags(song_file, duration=True, fast=fast) or dict()
+
+
+class LibraryIndex:
+    """Caches tags of music files so unchanged files are not read again.
+
+    For each file, its size, modification time, format, duration and tags
+    are stored, cover art is stored only as digest. File record is valid
+    while the file size and modification time stay the same, any other file
+    is read from disk again and its record updated. All methods are thread
+    safe.
+
+    See also
+    --------
+    :const:`wiki_music.constants.paths.LIBRARY_INDEX`
+        database location
+
+    Attributes
+    ----------
+    _connection: Optional[sqlite3.Connection]
+        connection to index database shared by all threads
+    """
+
+    _lock: RLock = RLock()
+    _connection: Optional[sqlite3.Connection] = None
+    _path: Path = LIBRARY_INDEX
+
+    @classmethod
+    def _connect(cls) -> sqlite3.Connection:
+        """Open database and create tables if the connection is not open.
+
+        Returns
+        -------
+        sqlite3.Connection
+            database connection
+        """
+        if not cls._connection:
+            cls._path.parent.mkdir(parents=True, exist_ok=True)
+            cls._connection = sqlite3.connect(str(cls._path),
+                                              check_same_thread=False)
+
+            version = cls._connection.execute("PRAGMA user_version")
+            if version.fetchone()[0] != _SCHEMA_VERSION:
+                log.info("creating new library index")
+                cls._connection.execute("DROP TABLE IF EXISTS files")
+                cls._connection.execute(f"PRAGMA user_version = "
+                                        f"{_SCHEMA_VERSION}")
+
+            cls._connection.executescript(_SCHEMA)
+
+        return cls._connection
+
+    @classmethod
+    def close(cls):
+        """Close database connection."""
+        with cls._lock:
+            if cls._connection:
+                cls._connection.close()
+                cls._connection = None
+
+    @staticmethod
+    def _stat(song_file: Optional[Path]) -> Optional[Tuple[int, int]]:
+        if not song_file:
+            return None
+
+        try:
+            stat = song_file.stat()
+        except OSError:
+            return None
+        else:
+            return stat.st_size, stat.st_mtime_ns
+
+    @classmethod
+    def lookup(cls, files: Sequence[Path]) -> List[Optional[Dict]]:
+        """Get tags for files that have not changed since they were indexed.
+
+        Parameters
+        ----------
+        files: Sequence[Path]
+            music files
+
+        Returns
+        -------
+        List[Optional[Dict]]
+            tags dictionary extended with `DURATION` key for each file or
+            None if the file is not indexed or has changed
+        """
+        records: List[Optional[Dict]] = []
+
+        with cls._lock:
+            connection = cls._connect()
+
+            for f in files:
+                row = connection.execute(
+                    "SELECT size, mtime, duration, tags, cover_digest, "
+                    "cover_size, cover_mime FROM files WHERE path = ?",
+                    (str(f), )).fetchone()
+
+                if not row or cls._stat(f) != tuple(row[:2]):
+                    records.append(None)
+                    continue
+
+                tags = json.loads(row[3])
+                tags["DURATION"] = row[2]
+                if row[4]:
+                    tags["COVERART"] = CoverArt(f, row[5], row[6], row[4])
+                else:
+                    tags["COVERART"] = bytes()
+
+                records.append(tags)
+
+        return records
+
+    @classmethod
+    def store(cls, song_file: Path, tags: Dict):
+        """Add or update file record.
+
+        Parameters
+        ----------
+        song_file: Path
+            music file
+        tags: Dict
+            tags read from file with `DURATION` key
+        """
+        cls.store_many([(song_file, tags)])
+
+    @classmethod
+    def store_many(cls, records: Iterable[Tuple[Path, Dict]]):
+        """Add or update records of many files in one transaction.
+
+        Parameters
+        ----------
+        records: Iterable[Tuple[Path, Dict]]
+            music files and tags read from them with `DURATION` key, files
+            whose tags could not be read are skipped
+        """
+        rows = []
+        for song_file, tags in records:
+            stat = cls._stat(song_file)
+            if not stat or not tags:
+                continue
+
+            cover = tags.get("COVERART")
+            if isinstance(cover, CoverArt):
+                cover_info = (cover.digest, cover.size, cover.mime)
+            else:
+                cover_info = (None, None, None)
+
+            text_tags = {t: tags[t] for t in tags
+                         if t in TAGS + ("COMMENT", ) and t != "COVERART"}
+
+            rows.append((str(song_file), str(song_file.parent), *stat,
+                         song_file.suffix.lstrip("."),
+                         tags.get("DURATION", 0.0), json.dumps(text_tags),
+                         *cover_info))
+
+        if not rows:
+            return
+
+        with cls._lock:
+            connection = cls._connect()
+            connection.executemany(
+                "INSERT OR REPLACE INTO files VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            connection.commit()
+
+    @classmethod
+    def prune(cls, directory: Path, files: Iterable[Path]):
+        """Delete records of files in directory tree which no longer exist.
+
+        Parameters
+        ----------
+        directory: Path
+            root of the scanned directory tree
+        files: Iterable[Path]
+            all music files found in the tree
+        """
+        root = str(directory)
+        # subdirectories, LIKE wildcards in path are escaped
+        pattern = re.sub(r"([\\%_])", r"\\\1", os.path.join(root, "")) + "%"
+        keep = {str(f) for f in files}
+
+        with cls._lock:
+            connection = cls._connect()
+            rows = connection.execute(
+                "SELECT path FROM files WHERE dir = ? OR dir LIKE ? "
+                "ESCAPE '\\'", (root, pattern)).fetchall()
+
+            stale = [(r[0], ) for r in rows if r[0] not in keep]
+            if stale:
+                log.debug(f"removing {len(stale)} missing files from index")
+                connection.executemany("DELETE FROM files WHERE path = ?",
+                                       stale)
+                connection.commit()
+
+    @classmethod
+    def read_tags(cls, files: Sequence[Path], multi_threaded: bool = True,
+                  progress: Optional[Callable[[int, int], Any]] = None
+                  ) -> List[Dict]:
+        """Get tags of files, only changed or new files are read from disk.
+
+        Parameters
+        ----------
+        files: Sequence[Path]
+            music files
+        multi_threaded: bool
+            read files in parallel
+        progress: Optional[Callable[[int, int], Any]]
+            called with number of finished and total number of files, files
+            served from index count as finished at once, by default
+            progress is reported to GUI through
+            :class:`wiki_music.utilities.sync.ThreadPoolProgress`
+
+        See also
+        --------
+        :func:`wiki_music.library.tags_io.read_tags`
+            function that reads files which are not in index
+
+        Returns
+        -------
+        List[Dict]
+            tags dictionary extended with `DURATION` key for each file
+        """
+        records = cls.lookup(files)
+        missing = [i for i, r in enumerate(records) if r is None]
+
+        hits = len(files) - len(missing)
+        log.debug(f"library index hits: {hits}, misses: {len(missing)}")
+
+        report = progress if progress else _report_progress
+        report(hits, len(files))
+
+        if not missing:
+            return records  # type: ignore
+
+        def pool_progress(actual: int, maximum: int):
+            report(hits + actual, len(files))
+
+        args = [(files[i], ) for i in missing]
+        if len(missing) >= PROCESS_POOL_MIN_FILES:
+            t = ProcessPool(_read_record, args, progress=pool_progress)
+        else:
+            t = ThreadPool(_read_record, args, progress=pool_progress)
+
+        if multi_threaded:
+            t.run()
+        else:
+            t.run_serial()
+
+        for i, tags in zip(missing, t.results()):
+            records[i] = tags
+        cls.store_many((files[i], records[i]) for i in missing)
+
+        return records  # type: ignore
+
+    @classmethod
+    def read_stream(cls, files: Iterable[Path], multi_threaded: bool = True,
+                    directory: Optional[Path] = None,
+                    progress: Optional[Callable[[int, int], Any]] = None
+                    ) -> Tuple[List[Path], List[Dict]]:
+        """Get tags of files which are still being discovered.
+
+        Reading of files that are not indexed starts as soon as they are
+        received, while the rest of the files is still being searched for.
+        When more than
+        :const:`wiki_music.constants.parser_const.PROCESS_POOL_MIN_FILES`
+        files are not indexed, the rest of them is read in process pool
+        after the search finishes. Files read in threads are fully parsed
+        and their tag handlers are cached, so the following tag write does
+        not parse them again.
+
+        Parameters
+        ----------
+        files: Iterable[Path]
+            music files, usually generator walking the directory tree
+        multi_threaded: bool
+            read files in parallel
+        directory: Optional[Path]
+            root of the tree in which files were searched, if passed, records
+            of files from the tree which were not found are deleted
+        progress: Optional[Callable[[int, int], Any]]
+            progress callback, see :meth:`read_tags`, total number of files
+            is known only after the search finishes, so the progress is
+            reported from then on
+
+        See also
+        --------
+        :func:`wiki_music.utilities.utils.iter_files`
+            directory walker which supplies files
+
+        Returns
+        -------
+        List[Path]
+            received files in sorted order, files whose tags could not be
+            read are left out
+        List[Dict]
+            tags dictionary extended with `DURATION` key for each file
+        """
+        found: List[Path] = []
+        records: List[Union[None, Dict, "Future[Dict]"]] = []
+        # files left for process pool in large directories
+        overflow: List[int] = []
+
+        with ThreadPoolExecutor(MAX_WORKERS if multi_threaded else 1,
+                                thread_name_prefix="IndexReader") as executor:
+            submitted = 0
+            for f in files:
+                record = cls.lookup([f])[0]
+                found.append(f)
+                if record is not None:
+                    records.append(record)
+                elif submitted < PROCESS_POOL_MIN_FILES:
+                    # handlers parsed in this process are reused for writing
+                    records.append(executor.submit(_read_record, f, False))
+                    submitted += 1
+                else:
+                    records.append(None)
+                    overflow.append(len(found) - 1)
+
+            report = progress if progress else _report_progress
+            lock = RLock()
+            finished = 0
+
+            def tick(n_files: int = 1):
+                nonlocal finished
+                with lock:
+                    finished += n_files
+                    report(finished, len(found))
+
+            # index hits are done, callbacks of finished reads run at once
+            tick(len(found) - submitted - len(overflow))
+            for record in records:
+                if isinstance(record, Future):
+                    record.add_done_callback(lambda _: tick())
+
+            if overflow:
+                pool_finished = 0
+
+                def pool_progress(actual: int, maximum: int):
+                    nonlocal pool_finished
+                    with lock:
+                        tick(actual - pool_finished)
+                        pool_finished = actual
+
+                t = ProcessPool(_read_record,
+                                [(found[i], ) for i in overflow],
+                                progress=pool_progress)
+                if multi_threaded:
+                    t.run()
+                else:
+                    t.run_serial()
+
+                for i, tags in zip(overflow, t.results()):
+                    records[i] = tags
+
+        read = overflow
+        for i, record in enumerate(records):
+            if isinstance(record, Future):
+                records[i] = record.result()
+                read.append(i)
+
+        cls.store_many((found[i], records[i]) for i in read)  # type: ignore
+
+        if directory is not None:
+            cls.prune(directory, found)
+
+        misses = len(read)
+        log.debug(f"library index hits: {len(found) - misses}, "
+                  f"misses: {misses}")
+
+        # files which could not be read would leave tag lists out of step
+        failed = [i for i in read if not records[i]]
+        if failed:
+            log.warning(f"could not read tags of {len(failed)} files")
+            found = [f for i, f in enumerate(found) if i not in failed]
+            records = [r for i, r in enumerate(records) if i not in failed]
+
+        if not found:
+            return [], []
+
+        found, records = zip(*sorted(zip(found, records),  # type: ignore
+                                     key=lambda x: x[0]))
+        return list(found), list(records)  # type: ignore
+
+    @classmethod
+    def durations(cls, files: Sequence[Path]) -> List[float]:
+        """Get track lengths of files, reading the changed ones from disk.
+
+        Parameters
+        ----------
+        files: Sequence[Path]
+            music files
+
+        Returns
+        -------
+        List[float]
+            track lengths in seconds, 0 if unknown
+        """
+        # lengths are read during file assignment with no progress bar open
+        def progress(actual: int, maximum: int):
+            pass
+
+        return [r.get("DURATION", 0.0)
+                for r in cls.read_tags(files, progress=progress)]
@@ -5,47 +5,250 @@ Lyrical Nonsense, Musixmatch, darklyrics
 """
 
 import logging
-from typing import TYPE_CHECKING, Dict, List, Optional, Union, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
 
-import rapidfuzz.fuzz as fuzz  # lazy loaded
+import numpy as np
 
-from wiki_music.constants import GREEN, NO_LYRIS, RESET
+from wiki_music.constants import (GREEN, LYRICS_DUPLICATE_SCORE,
+                                  LYRICS_VARIANT, NO_LYRIS, RESET,
+                                  SAME_LYRICS_TYPES)
 from wiki_music.external_libraries import lyricsfinder  # lazy loaded
-from wiki_music.utilities import (GoogleApiKey, ThreadPool, caseless_equal,
-                                  exception, normalize)
+from wiki_music.utilities import (GoogleApiKey, ThreadPoolProgress,
+                                  caseless_equal, normalize_caseless,
+                                  score_matrix)
+
+from .lyrics_cache import LyricsCache
+from .lyrics_engine import LyricsEngine
 
 if TYPE_CHECKING:
-    from wiki_music.external_libraries.lyricsfinder import LyricsManager
-    from typing_extensions import TypedDict
+    from concurrent.futures import Future
 
-    LyrData = TypedDict("LyrData", {"track": List[int], "lyrics": str,
-                                    "source_url": str})
-    LyrDict = Dict[str, LyrData]
     from wiki_music.external_libraries.lyricsfinder.models.lyrics import (
         LyricsDict)
 
 log = logging.getLogger(__name__)
 log.debug("lyrics imports done")
 
-__all__ = ["save_lyrics"]
+__all__ = ["save_lyrics", "LyricsPrefetch"]
+
+
+def _no_progress(actual: int, maximum: int):
+    """Ignore progress of prefetch, GUI progress bar is not open yet."""
+
+
+def _lyrics_family(track_type: str) -> str:
+    """Get group of track types which share lyrics.
+
+    Plain tracks and their variants listed in
+    :const:`wiki_music.constants.parser_const.SAME_LYRICS_TYPES` belong to
+    one group, other types only share lyrics with tracks of the same type.
+    """
+    for tp in SAME_LYRICS_TYPES:
+        if caseless_equal(tp, track_type):
+            return ""
+    return normalize_caseless(track_type)
+
+
+def _find_duplicates(tracks: List[str], types: List[str]
+                     ) -> List[List[int]]:
+    """Group tracks which have the same lyrics.
+
+    Version annotations like *(live)* or *- demo version* are stripped from
+    track names and all names are compared at once. Tracks are merged in
+    order of decreasing similarity, only if every pair of the resulting
+    group scores at least
+    :const:`wiki_music.constants.parser_const.LYRICS_DUPLICATE_SCORE` and
+    their types share lyrics. So grouping does not depend on track order
+    and does not chain unrelated tracks through a common one.
+
+    Parameters
+    ----------
+    tracks: List[str]
+        names of tracks to group
+    types: List[str]
+        type of each track
+
+    Returns
+    -------
+    List[List[int]]
+        indices of tracks in each group, groups are sorted by their first
+        track
+    """
+    names = [LYRICS_VARIANT.sub("", t) or t for t in tracks]
+    families = np.array([_lyrics_family(tp) for tp in types])
+
+    scores = score_matrix(names, names,
+                          mask=families[:, None] == families[None, :])
+    scores[np.tril_indices(len(tracks))] = 0
+
+    groups = [[i] for i in range(len(tracks))]
+    label = list(range(len(tracks)))
+
+    # ties are resolved by names, so result does not depend on track order
+    pairs = sorted(zip(*np.nonzero(scores >= LYRICS_DUPLICATE_SCORE)),
+                   key=lambda p: (-scores[p], sorted((names[p[0]],
+                                                      names[p[1]]))))
+    for i, j in pairs:
+        a, b = label[i], label[j]
+        if a == b:
+            continue
+
+        linkage = np.maximum(scores[np.ix_(groups[a], groups[b])],
+                             scores[np.ix_(groups[b], groups[a])].T)
+        if linkage.min() < LYRICS_DUPLICATE_SCORE:
+            continue
+
+        a, b = min(a, b), max(a, b)
+        groups[a] = sorted(groups[a] + groups[b])
+        for k in groups[b]:
+            label[k] = a
+        groups[b] = []
+
+    return [g for g in groups if g]
+
+
+def _prepare_search(tracks: List[str], types: List[str], band: str,
+                    album: str) -> Tuple[List[str], List[List[int]],
+                                         List[Tuple[str, str, str]]]:
+    """Find tracks without lyrics and group the rest by shared lyrics.
+
+    Returns
+    -------
+    List[str]
+        lyrics of each track, filled only for tracks without lyrics
+    List[List[int]]
+        groups of track indices which share lyrics
+    List[Tuple[str, str, str]]
+        artist, album and song name to search for each group
+    """
+    lyrics: List[str] = []
+    for tp in types:
+        for nl in NO_LYRIS:
+            if caseless_equal(nl, tp):
+                lyrics.append(nl)
+                break
+        else:
+            lyrics.append("")
+
+    log.info("Initialize duplicates")
+
+    # only tracks which can have lyrics are searched
+    searched = [i for i, lyr in enumerate(lyrics) if not lyr]
+    duplicates = [[searched[i] for i in group] for group in
+                  _find_duplicates([tracks[i] for i in searched],
+                                   [types[i] for i in searched])]
+
+    songs = [(band, album, LYRICS_VARIANT.sub("", tracks[group[0]]) or
+              tracks[group[0]]) for group in duplicates]
+
+    return lyrics, duplicates, songs
+
+
+class LyricsPrefetch:
+    """Lyrics search started before user decides whether to save lyrics.
+
+    Search runs in the background in
+    :class:`wiki_music.library.lyrics_engine.LyricsEngine` while parser does
+    other work and user answers questions. Results are held in staging list
+    and are written to :class:`wiki_music.library.lyrics_cache.LyricsCache`
+    only after they are used by :func:`save_lyrics`. Prefetch is started
+    only when google API key is available without asking user for it.
+
+    Parameters
+    ----------
+    tracks: List[str]
+        list of album tracks
+    types: List[str]
+        list of album types
+    band: str
+        album artist name
+    album: str
+        album name
+    GUI: bool
+        whether app is running in GUI mode
+    multi_threaded: bool
+        whether to download lyrics in parallel of in orderely fasion
+    """
+
+    def __init__(self, tracks: List[str], types: List[str], band: str,
+                 album: str, GUI: bool, multi_threaded: bool) -> None:
+
+        self._request = (list(tracks), list(types), band, album)
+        self._staging: List[Tuple[str, str, str, "LyricsDict"]] = []
+        self._future: Optional["Future[List[LyricsDict]]"] = None
+
+        google_api_key = GoogleApiKey.value(GUI, prompt=False)
+        if google_api_key:
+            log.info("Prefetching lyrics")
+            _, _, songs = _prepare_search(tracks, types, band, album)
+            # GUI progress is reported only when results are used
+            self._future = LyricsEngine.submit(
+                songs, google_api_key,
+                concurrency=None if multi_threaded else 1,
+                staging=self._staging, progress=_no_progress)
+        else:
+            log.info("Lyrics are not prefetched, google API key is missing")
+
+    def matches(self, tracks: List[str], types: List[str], band: str,
+                album: str) -> bool:
+        """Check that prefetch was started for the same album tracks.
+
+        Returns
+        -------
+        bool
+            True if prefetched results can be used
+        """
+        return (self._future is not None and not self._future.cancelled()
+                and self._request == (tracks, types, band, album))
+
+    def result(self) -> List["LyricsDict"]:
+        """Wait for prefetch to finish and store its results in cache.
+
+        Returns
+        -------
+        List[LyricsDict]
+            search result of each group of tracks
+
+        Raises
+        ------
+        Exception
+            any exception raised by the search, staged results are dropped
+        """
+        try:
+            raw_lyrics = self._future.result()  # type: ignore
+        except Exception:
+            self._staging.clear()
+            raise
+
+        for artist, album, song, response in self._staging:
+            LyricsCache.store(artist, album, song, response)
+        self._staging.clear()
+
+        return raw_lyrics
+
+    def cancel(self):
+        """Stop prefetch and drop its results."""
+        if self._future:
+            self._future.cancel()
+        self._staging.clear()
 
 
 def save_lyrics(tracks: List[str], types: List[str], band: str, album: str,
-                GUI: bool, multi_threaded: bool
+                GUI: bool, multi_threaded: bool,
+                prefetch: Optional[LyricsPrefetch] = None
                 ) -> Tuple[List[str], List[Union[str, None]]]:
     """Searches and downloads lyrics for each track.
 
     Does some preprocessing before it starts the lyricsfinder
     module and downloads the lyrics. In preproces, tracks which will have same
     lyrics are identified so the same lyrics are not downloaded twice. The
-    lyrics are then downloaded asynchronously each in separate thread for
-    speed.
+    lyrics are then downloaded asynchronously by lyrics engine.
 
     See also
     --------
     :mod:`wiki_music.external_libraries.lyricsfinder`
          module used to download lyrics
-    :class:`wiki_music.utilities.parser_utils.ThreadPool`
+    :class:`wiki_music.library.lyrics_engine.LyricsEngine`
         async download
 
     Parameters
@@ -64,6 +267,9 @@ def save_lyrics(tracks: List[str], types: List[str], band: str, album: str,
         whether app is running in GUI mode
     multi_threaded: bool
         whether to download lyrics in parallel of in orderely fasion
+    prefetch: Optional[LyricsPrefetch]
+        search started in advance, its results are used if it was started
+        for the same tracks, otherwise it is cancelled
 
     Returns
     -------
@@ -74,61 +280,40 @@ def save_lyrics(tracks: List[str], types: List[str], band: str, album: str,
     """
     log.info("starting save lyrics")
 
-    GOOGLE_API_KEY = GoogleApiKey.value(GUI)
-
     lyrics: List[str]
     sources: List[Union[str, None]]
-    tracks_dict: "LyrDict"
-    raw_lyrics: List["LyricsDict"]
+    duplicates: List[List[int]]
+    raw_lyrics: Optional[List["LyricsDict"]]
 
-    lyrics = []
-    sources = []
-    for i, tp in enumerate(types):
-        sources.append(None)
-        for nl in NO_LYRIS:
-            if caseless_equal(nl, tp):
-                lyrics.append(nl)
-                break
-        else:
-            lyrics.append("")
-
-    log.info("Initialize duplicates")
-
-    tracks_dict = dict()
-
-    for i, (tr, lyr) in enumerate(zip(tracks, lyrics)):
-
-        # TODO might be able to use defaultdict here with custom factory
-        # defaultdict(lambda x: something...)
-        if not lyr:
-            for tr_k in tracks_dict.keys():
-                if fuzz.token_set_ratio(tr, tr_k, score_cutoff=90):
-                    tracks_dict[tr_k]["track"].append(i)
-                    break
-            else:
-                tracks_dict[tr] = {"track": [i], "lyrics": "",
-                                   "source_url": ""}
+    lyrics, duplicates, songs = _prepare_search(tracks, types, band, album)
+    sources = [None] * len(tracks)
 
     log.info("Download lyrics")
 
-    # manager must be initialized in main thread
-    manager = lyricsfinder.LyricsManager()
+    raw_lyrics = None
+    if prefetch and prefetch.matches(tracks, types, band, album):
+        log.info("Using prefetched lyrics")
+        try:
+            raw_lyrics = prefetch.result()
+            ThreadPoolProgress(actual=len(songs), maximum=len(songs))
+        except Exception as e:
+            log.warning(f"Lyrics prefetch failed, searching again: {e}")
+    elif prefetch:
+        prefetch.cancel()
 
-    # run search
-    t = ThreadPool(target=_get_lyrics,
-                   args=[(manager, band, album, t, GOOGLE_API_KEY)
-                         for t in tracks_dict.keys()])
-    if multi_threaded:
-        t.run()
-    else:
-        t.run_serial()
+    if raw_lyrics is None:
+        # run search, one song at a time if multi_threaded is off
+        raw_lyrics = LyricsEngine.search(
+            songs, GoogleApiKey.value(GUI),
+            concurrency=None if multi_threaded else 1)
 
-    raw_lyrics = t.results()
+    # keep lyrics sources statistics for the next run
+    lyricsfinder.ExtractorStats.save()
 
-    log.info("Assign lyrics to tracks_dict")
+    log.info("Assign lyrics to tracks")
 
     # report results
-    for i, l in enumerate(raw_lyrics):
+    for group, l in zip(duplicates, raw_lyrics):
         if l["lyrics"]:
             print(GREEN + "Saved lyrics for:" + RESET,
                   f"{l['artist']} - {l['title']} " + GREEN +
@@ -137,57 +322,8 @@ def save_lyrics(tracks: List[str], types: List[str], band: str, album: str,
             print(GREEN + "Couldn't find lyrics for:" + RESET,
                   f"{l['artist']} - {l['title']}")
 
-        tracks_dict[l["title"]]["lyrics"] = l["lyrics"]
-        tracks_dict[l["title"]]["source_url"] = l["origin"]["source_url"]
-
-    for track in tracks_dict.values():
-        for i in track["track"]:
-            lyrics[i] = track["lyrics"]
-
-        sources[i] = track["source_url"]
+        for i in group:
+            lyrics[i] = l["lyrics"]
+            sources[i] = l["origin"]["source_url"] or None
 
     return lyrics, sources
-
-
-@exception(log)
-def _get_lyrics(manager: 'LyricsManager', artist: str, album: str, song: str,
-                GOOGLE_API_KEY: str
-                ) -> "LyricsDict":
-    """Find and download lyrics for specified song.
-
-    See also
-    --------
-    :meth:`wiki_music.external_libraries.lyricsfinder.LyricsManager`
-        low level lyricsfinding implementation
-
-    Parameters
-    ----------
-    manager: lyricsfinder.LyricsManager
-        instance of LyricsManager which encapsulates the lyrics finding and
-        downloading methods
-    artist: str
-        artist name
-    album: str
-        album name
-    song: str
-        song name
-
-    Returns
-    -------
-    dict
-        dictionary with lyrics and information where it was downloaded from
-    """
-    lyrics = next(manager.search_lyrics(song, album, artist,
-                                        google_api_key=GOOGLE_API_KEY), None)
-
-    if not lyrics:
-        log.info(f"Couldn't find lyrics for: {artist} - {song}")
-        return {"lyrics": "", "artist": artist, "title": song,
-                "release_date": None, "origin": {"source_name": "",
-                                                 "query": "", "url": "",
-                                                 "source_url": ""}}
-    else:
-        log.info(f"Saved lyrics for: {artist} - {song}")
-        response = lyrics.to_dict()
-        response["title"] = song
-        return response
@@ -0,0 +1,192 @@
+"""Persistent cache of downloaded lyrics backed by SQLite database."""
+
+import logging
+import re  # lazy loaded
+import sqlite3
+import time  # lazy loaded
+from pathlib import Path
+from threading import RLock
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from wiki_music.constants import LYRICS_CACHE, LYRICS_MISS_TTL
+from wiki_music.utilities import normalize_caseless
+
+if TYPE_CHECKING:
+    from wiki_music.external_libraries.lyricsfinder.models.lyrics import (
+        LyricsDict)
+
+log = logging.getLogger(__name__)
+
+__all__ = ["LyricsCache"]
+
+#: increase when the table layout changes
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lyrics (
+    artist TEXT NOT NULL,
+    album TEXT NOT NULL,
+    title TEXT NOT NULL,
+    lyrics TEXT NOT NULL,
+    source_name TEXT NOT NULL,
+    source_url TEXT NOT NULL,
+    url TEXT NOT NULL,
+    query TEXT,
+    fetched REAL NOT NULL,
+    PRIMARY KEY (artist, album, title)
+);
+"""
+
+
+class LyricsCache:
+    """Stores downloaded lyrics so they are not searched for again.
+
+    Records are keyed by caseless normalized artist, album and song title.
+    Found lyrics are kept indefinitely together with the source they were
+    extracted from. Songs for which no lyrics were found are stored as
+    negative records, which expire after
+    :const:`wiki_music.constants.parser_const.LYRICS_MISS_TTL` seconds so the
+    search is eventually retried. All methods are thread safe.
+
+    See also
+    --------
+    :const:`wiki_music.constants.paths.LYRICS_CACHE`
+        database location
+
+    Attributes
+    ----------
+    _connection: Optional[sqlite3.Connection]
+        connection to cache database shared by all threads
+    """
+
+    _lock: RLock = RLock()
+    _connection: Optional[sqlite3.Connection] = None
+    _path: Path = LYRICS_CACHE
+
+    @classmethod
+    def _connect(cls) -> sqlite3.Connection:
+        """Open database and create tables if the connection is not open.
+
+        Returns
+        -------
+        sqlite3.Connection
+            database connection
+        """
+        if not cls._connection:
+            cls._path.parent.mkdir(parents=True, exist_ok=True)
+            cls._connection = sqlite3.connect(str(cls._path),
+                                              check_same_thread=False)
+
+            version = cls._connection.execute("PRAGMA user_version")
+            if version.fetchone()[0] != _SCHEMA_VERSION:
+                log.info("creating new lyrics cache")
+                cls._connection.execute("DROP TABLE IF EXISTS lyrics")
+                cls._connection.execute(f"PRAGMA user_version = "
+                                        f"{_SCHEMA_VERSION}")
+
+            cls._connection.executescript(_SCHEMA)
+
+        return cls._connection
+
+    @classmethod
+    def close(cls):
+        """Close database connection."""
+        with cls._lock:
+            if cls._connection:
+                cls._connection.close()
+                cls._connection = None
+
+    @staticmethod
+    def _key(artist: str, album: str, song: str) -> Tuple[str, str, str]:
+        return tuple(re.sub(r"\s+", " ", normalize_caseless(k or "")).strip()
+                     for k in (artist, album, song))  # type: ignore
+
+    @classmethod
+    def get(cls, artist: str, album: str, song: str
+            ) -> Optional["LyricsDict"]:
+        """Get cached lyrics, negative records are returned with no lyrics.
+
+        Parameters
+        ----------
+        artist: str
+            artist name
+        album: str
+            album name
+        song: str
+            song name
+
+        Returns
+        -------
+        Optional[LyricsDict]
+            dictionary with lyrics and information where they were downloaded
+            from, None if song is not cached or its negative record has
+            expired
+        """
+        with cls._lock:
+            row = cls._connect().execute(
+                "SELECT lyrics, source_name, source_url, url, query, fetched "
+                "FROM lyrics WHERE artist = ? AND album = ? AND title = ?",
+                cls._key(artist, album, song)).fetchone()
+
+        if not row:
+            return None
+
+        lyrics, source_name, source_url, url, query, fetched = row
+        if not lyrics and time.time() - fetched > LYRICS_MISS_TTL:
+            log.debug(f"negative lyrics record expired for: {artist} - "
+                      f"{song}")
+            return None
+
+        return {"lyrics": lyrics, "artist": artist, "title": song,
+                "release_date": None,
+                "origin": {"source_name": source_name, "query": query,
+                           "url": url, "source_url": source_url}}
+
+    @classmethod
+    def store(cls, artist: str, album: str, song: str,
+              response: "LyricsDict"):
+        """Add or update song record, empty lyrics create negative record.
+
+        Parameters
+        ----------
+        artist: str
+            artist name
+        album: str
+            album name
+        song: str
+            song name
+        response: LyricsDict
+            dictionary with lyrics and its origin returned by lyrics search
+        """
+        origin = response["origin"]
+
+        with cls._lock:
+            connection = cls._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO lyrics VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (*cls._key(artist, album, song),
+                 response["lyrics"] or "", origin["source_name"] or "",
+                 origin["source_url"] or "", origin["url"] or "",
+                 origin["query"], time.time()))
+            connection.commit()
+
+    @classmethod
+    def discard(cls, artist: str, album: str, song: str):
+        """Remove song record so its lyrics are searched for again.
+
+        Parameters
+        ----------
+        artist: str
+            artist name
+        album: str
+            album name
+        song: str
+            song name
+        """
+        with cls._lock:
+            connection = cls._connect()
+            connection.execute(
+                "DELETE FROM lyrics WHERE artist = ? AND album = ? AND "
+                "title = ?", cls._key(artist, album, song))
+            connection.commit()
@@ -0,0 +1,358 @@
+"""Asyncio engine which downloads lyrics for many songs at once."""
+
+import asyncio
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import RLock, Thread
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from wiki_music.constants import (LYRICS_CONCURRENCY, LYRICS_PER_HOST,
+                                  LYRICS_TIMEOUT, LYRICS_WORKERS)
+from wiki_music.external_libraries import lyricsfinder  # lazy loaded
+from wiki_music.utilities import ThreadPoolProgress
+
+from .lyrics_cache import LyricsCache
+
+if TYPE_CHECKING:
+    from wiki_music.external_libraries.lyricsfinder.models.lyrics import (
+        Lyrics, LyricsDict)
+
+    Song = Tuple[str, str, str]
+
+log = logging.getLogger(__name__)
+
+__all__ = ["LyricsEngine"]
+
+_SEARCH_HOST = "www.googleapis.com"
+
+
+class _Unavailable(Exception):
+    """No candidate page could be checked, e.g. network is down."""
+
+
+def _report_progress(actual: int, maximum: int):
+    ThreadPoolProgress(actual=actual, maximum=maximum)
+
+
+def _no_lyrics(artist: str, song: str) -> "LyricsDict":
+    """Create search response for song whose lyrics were not found.
+
+    Parameters
+    ----------
+    artist: str
+        artist name
+    song: str
+        song name
+
+    Returns
+    -------
+    LyricsDict
+        response with empty lyrics and origin
+    """
+    return {"lyrics": "", "artist": artist, "title": song,
+            "release_date": None, "origin": {"source_name": "", "query": "",
+                                             "url": "", "source_url": ""}}
+
+
+class LyricsEngine:
+    """Searches and downloads lyrics of songs as asyncio tasks.
+
+    All songs requested from any thread are processed by one event loop
+    running in background thread. Blocking web requests are run in small
+    thread pool of :const:`wiki_music.constants.parser_const.LYRICS_WORKERS`
+    threads, so thousands of songs can be searched without spawning thread
+    for each of them. Number of songs processed at once is limited by
+    :const:`wiki_music.constants.parser_const.LYRICS_CONCURRENCY`, number of
+    concurrent requests to one host by
+    :const:`wiki_music.constants.parser_const.LYRICS_PER_HOST`. Song search
+    which takes longer than
+    :const:`wiki_music.constants.parser_const.LYRICS_TIMEOUT` is cancelled.
+
+    Search results are stored in
+    :class:`wiki_music.library.lyrics_cache.LyricsCache` which is checked
+    before any web request is made. Candidate urls of each song are raced
+    by the same policy as in lyricsfinder search, see
+    :class:`wiki_music.external_libraries.lyricsfinder.hedge.Hedge`.
+
+    Warnings
+    --------
+    Cancelled request cannot be interrupted in its worker thread, it is
+    only abandoned and its result discarded.
+    """
+
+    _lock: RLock = RLock()
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _executor: Optional[ThreadPoolExecutor] = None
+    _songs_limit: Optional[asyncio.Semaphore] = None
+    _host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    @classmethod
+    def _start(cls) -> asyncio.AbstractEventLoop:
+        """Start event loop in background thread if it is not running.
+
+        Returns
+        -------
+        asyncio.AbstractEventLoop
+            running event loop
+        """
+        with cls._lock:
+            if not cls._loop:
+                loop = asyncio.new_event_loop()
+                cls._executor = ThreadPoolExecutor(
+                    LYRICS_WORKERS, thread_name_prefix="LyricsEngine")
+                loop.set_default_executor(cls._executor)
+
+                Thread(target=loop.run_forever, name="LyricsEngineLoop",
+                       daemon=True).start()
+                cls._loop = loop
+
+            return cls._loop
+
+    @classmethod
+    def stop(cls):
+        """Stop event loop and its worker threads."""
+        with cls._lock:
+            if cls._loop:
+                loop = cls._loop
+                cls._loop = None
+                cls._songs_limit = None
+                cls._host_limits = {}
+
+                loop.call_soon_threadsafe(loop.stop)
+                cls._executor.shutdown(wait=False,  # type: ignore
+                                       cancel_futures=True)
+                cls._executor = None
+
+    @classmethod
+    def search(cls, songs: List["Song"], google_api_key: str,
+               concurrency: Optional[int] = None,
+               progress: Optional[Callable[[int, int], Any]] = None
+               ) -> List["LyricsDict"]:
+        """Find lyrics of songs, blocks until all of them are done.
+
+        Parameters
+        ----------
+        songs: List[Tuple[str, str, str]]
+            artist, album and song name for each song, songs may come from
+            different albums
+        google_api_key: str
+            key for google custom search
+        concurrency: Optional[int]
+            maximal number of songs from this call processed at once, in
+            addition to the global limit
+        progress: Optional[Callable[[int, int], Any]]
+            called with number of finished and total number of songs each
+            time a song is finished, including cache hits and failed
+            searches, by default progress is reported to GUI through
+            :class:`wiki_music.utilities.sync.ThreadPoolProgress`
+
+        Returns
+        -------
+        List[LyricsDict]
+            dictionary with lyrics and information where they were
+            downloaded from, for each song in the same order
+        """
+        future = cls.submit(songs, google_api_key, concurrency,
+                            progress=progress)
+
+        try:
+            return future.result()
+        except BaseException:
+            # e.g. KeyboardInterrupt, do not leave songs running in loop
+            future.cancel()
+            raise
+
+    @classmethod
+    def submit(cls, songs: List["Song"], google_api_key: str,
+               concurrency: Optional[int] = None,
+               staging: Optional[List[Tuple[str, str, str, "LyricsDict"]]]
+               = None,
+               progress: Optional[Callable[[int, int], Any]] = None
+               ) -> "Future[List[LyricsDict]]":
+        """Start search of songs lyrics and return immediately.
+
+        Parameters
+        ----------
+        songs: List[Tuple[str, str, str]]
+            artist, album and song name for each song
+        google_api_key: str
+            key for google custom search
+        concurrency: Optional[int]
+            maximal number of songs from this call processed at once
+        staging: Optional[List[Tuple[str, str, str, LyricsDict]]]
+            if passed, found results are appended to this list instead of
+            being stored in lyrics cache, so the caller can decide later
+            whether to keep them
+        progress: Optional[Callable[[int, int], Any]]
+            progress callback, see :meth:`search`
+
+        Returns
+        -------
+        concurrent.futures.Future
+            future with the same result as :meth:`search`, cancelling it
+            cancels the search
+        """
+        return asyncio.run_coroutine_threadsafe(
+            cls._search_all(songs, google_api_key, concurrency, staging,
+                            progress if progress else _report_progress),
+            cls._start())
+
+    @classmethod
+    async def _search_all(cls, songs: List["Song"], google_api_key: str,
+                          concurrency: Optional[int],
+                          staging: Optional[list] = None,
+                          progress: Callable[[int, int], Any] = (
+                              _report_progress)) -> List["LyricsDict"]:
+        limit = asyncio.Semaphore(concurrency) if concurrency else None
+        finished = 0
+
+        async def limited(artist: str, album: str, song: str
+                          ) -> "LyricsDict":
+            nonlocal finished
+            try:
+                if not limit:
+                    return await cls._search_song(artist, album, song,
+                                                  google_api_key, staging)
+                async with limit:
+                    return await cls._search_song(artist, album, song,
+                                                  google_api_key, staging)
+            finally:
+                # runs in event loop thread, so no lock is needed
+                finished += 1
+                progress(finished, len(songs))
+
+        if not songs:
+            progress(0, 0)
+
+        return await asyncio.gather(*(limited(*s) for s in songs))
+
+    @classmethod
+    async def _search_song(cls, artist: str, album: str, song: str,
+                           google_api_key: str,
+                           staging: Optional[list] = None) -> "LyricsDict":
+        """Find lyrics of one song, check and update cache.
+
+        Returns
+        -------
+        LyricsDict
+            dictionary with lyrics and information where they were
+            downloaded from
+        """
+        cached = LyricsCache.get(artist, album, song)
+        if cached:
+            log.info(f"Lyrics cache hit for: {artist} - {song}")
+            return cached
+
+        if not cls._songs_limit:
+            cls._songs_limit = asyncio.Semaphore(LYRICS_CONCURRENCY)
+
+        async with cls._songs_limit:
+            try:
+                lyrics = await asyncio.wait_for(
+                    cls._find(artist, album, song, google_api_key),
+                    LYRICS_TIMEOUT)
+            except asyncio.TimeoutError:
+                log.warning(f"Lyrics search timed out for: {artist} - "
+                            f"{song}")
+                return _no_lyrics(artist, song)
+            except _Unavailable:
+                log.warning(f"Lyrics sources are unavailable for: {artist} - "
+                            f"{song}")
+                return _no_lyrics(artist, song)
+            except Exception as e:
+                log.exception(f"Lyrics search failed for: {artist} - "
+                              f"{song}: {e}")
+                return _no_lyrics(artist, song)
+
+        if not lyrics:
+            log.info(f"Couldn't find lyrics for: {artist} - {song}")
+            response = _no_lyrics(artist, song)
+        else:
+            log.info(f"Saved lyrics for: {artist} - {song}")
+            response = lyrics.to_dict()
+            response["title"] = song
+
+        if staging is None:
+            LyricsCache.store(artist, album, song, response)
+        else:
+            staging.append((artist, album, song, response))
+        return response
+
+    @classmethod
+    async def _in_thread(cls, host: str, function: Callable[..., Any],
+                         *args: Any) -> Any:
+        """Run blocking web request in worker thread, limited per host."""
+        if host not in cls._host_limits:
+            cls._host_limits[host] = asyncio.Semaphore(LYRICS_PER_HOST)
+
+        async with cls._host_limits[host]:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, function, *args)
+
+    @classmethod
+    async def _find(cls, artist: str, album: str, song: str,
+                    google_api_key: str) -> Optional["Lyrics"]:
+        """Search for candidate urls and extract lyrics from them."""
+        query, results = await cls._in_thread(
+            _SEARCH_HOST, lyricsfinder.SearchPlanner.candidates, artist,
+            album, song, google_api_key)
+
+        manager = lyricsfinder.LyricsManager
+        urls = manager.rank_urls([r["link"] for r in results])
+
+        lyrics = await cls._race(urls, song, artist)
+        if lyrics:
+            lyrics.origin.query = query
+        return lyrics
+
+    @classmethod
+    async def _extract(cls, url: str, song: str, artist: str
+                       ) -> "Lyrics":
+        return await cls._in_thread(
+            urlparse(url).netloc.lower(),
+            lyricsfinder.LyricsManager.extract_lyrics, url, song, artist)
+
+    @classmethod
+    async def _race(cls, urls: List[str], song: str, artist: str
+                    ) -> Optional["Lyrics"]:
+        """Extract lyrics from candidate urls, racing the slow ones.
+
+        When extraction takes longer than hedge delay of
+        :class:`wiki_music.external_libraries.lyricsfinder.LyricsManager`,
+        next url is tried in parallel, as decided by
+        :class:`wiki_music.external_libraries.lyricsfinder.hedge.Hedge`.
+        First extracted lyrics are returned and remaining extractions are
+        cancelled.
+        """
+        manager = lyricsfinder.LyricsManager
+
+        def start(url: str) -> "asyncio.Task":
+            return asyncio.ensure_future(cls._extract(url, song, artist))
+
+        hedge = lyricsfinder.Hedge(urls, start, manager.hedge_delay,
+                                   manager.hedge_candidates)
+
+        missing = False
+        try:
+            while hedge.pending:
+                done, _ = await asyncio.wait(
+                    hedge.pending, timeout=hedge.timeout,
+                    return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    try:
+                        return task.result()
+                    except lyricsfinder.exceptions.NoExtractorError as e:
+                        log.debug(f"No lyrics extracted: {e}")
+                        missing = missing or e.missing
+
+                hedge.update(done)
+        finally:
+            hedge.cancel()
+
+        # only pages which were downloaded and checked prove lyrics are
+        # missing, failed requests must not be cached as misses
+        if not missing:
+            raise _Unavailable(f"no lyrics source available for {song}")
+        return None
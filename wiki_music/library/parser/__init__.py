@@ -3,11 +3,14 @@
 import logging
 from pathlib import Path
 from time import sleep
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
 from wiki_music.constants.colors import CYAN, GREEN, RESET
-from wiki_music.utilities import (Action, exception, flatten_set, to_bool,
-                                  we_are_frozen)
+from wiki_music.utilities import (Action, exception, flatten_set, lrange,
+                                  to_bool, we_are_frozen)
+
+if TYPE_CHECKING:
+    from wiki_music.utilities import Journal
 
 from .process_page import WikipediaParser
 
@@ -43,13 +46,16 @@ class WikipediaRunner(WikipediaParser):
         whether to initialize protected variables or not
     multi_threaded: bool
         whether to run some parts of code in threads
+    lyrics_prefetch: bool
+        whether to start lyrics search as soon as tracklist is known
     """
 
     def __init__(self, album: str = "", band: str = "",
                  work_dir: Union[str, Path] = "", with_log: bool = False,
                  GUI: bool = True, protected_vars: bool = True,
                  offline_debug: bool = False, write_json: bool = False,
-                 multi_threaded: bool = True) -> None:
+                 multi_threaded: bool = True,
+                 lyrics_prefetch: bool = False) -> None:
 
         log.debug("init parser runner")
 
@@ -63,6 +69,7 @@ class WikipediaRunner(WikipediaParser):
         self.offline_debug = offline_debug
         self.write_json = write_json
         self.multi_threaded = multi_threaded
+        self.lyrics_prefetch = lyrics_prefetch
 
         log.debug("init parser runner done")
 
@@ -108,6 +115,9 @@ class WikipediaRunner(WikipediaParser):
         self._log.info("Extracting tracks")
         self.get_tracks()
 
+        # lyrics are searched while user answers the questions
+        self.prefetch_lyrics()
+
         # extract personel names
         self._log.info("Extracting additional personnel")
         self.get_personnel()
@@ -191,6 +201,9 @@ class WikipediaRunner(WikipediaParser):
         # extract track list
         self.get_tracks()
 
+        # lyrics are searched while user answers the questions
+        self.prefetch_lyrics()
+
         # extract personel names
         self._log_print(msg_GREEN="Found aditional personel")
         self.get_personnel()
@@ -244,7 +257,7 @@ class WikipediaRunner(WikipediaParser):
 
         print(CYAN + "Write data to ID3 tags? ([y]/n): " + RESET, end="")
         if to_bool(input()):
-            if not self.write_tags():
+            if not self.write_tags(list(lrange(self))):
                 self._log_print(
                     msg_WHITE="Cannot write tags because there are no "
                     "coresponding files")
@@ -263,7 +276,8 @@ class WikipediaRunner(WikipediaParser):
         """Runs only lyrics search with specifics of the GUI mode."""
         self._log.info("Searching for lyrics")
 
-        self.save_lyrics(find=True)
+        # tracks which already have lyrics are skipped
+        self.fill_lyrics()
         Action("load", load=True)
 
         self._log.info("Done")
@@ -272,15 +286,100 @@ class WikipediaRunner(WikipediaParser):
         """Runs only lyrics search with specifics of the CLI mode."""
         self.read_files()
 
-        # find lyrics
+        # find lyrics only for tracks whose tags do not have them
         self._log_print(msg_GREEN="Searching for lyrics")
 
-        self.save_lyrics()
+        filled = self.fill_lyrics()
+
+        # write back only files which got new lyrics
+        if not filled:
+            self._log_print(msg_WHITE="No new lyrics to write")
+        elif not self.write_tags(filled):
+            self._log_print(msg_WHITE="Cannot write tags because there are no "
+                            "coresponding files")
+        else:
+            self._log_print(msg_GREEN="Done")
+
+    @exception(log)
+    def run_batch(self, journal: "Journal"):
+        """Runs the whole wikipedia search non-interactively with checkpoints.
+
+        Each completed stage is recorded to journal. Stages that were already
+        completed in previous run are skipped and their results are restored
+        from journal. Tags are written again only if the album files have
+        changed since they were last written. Downloaded page and cover art
+        are kept in album artifacts directory of the journal.
+
+        Questions that are asked in CLI mode are answered with defaults:
+        first found genre is selected, artists are not copied to composers,
+        lyrics are searched and tags are written.
+
+        Parameters
+        ----------
+        journal: :class:`wiki_music.utilities.journal.Journal`
+            checkpoint journal shared by the whole batch run
+        """
+        key = str(self.work_dir.resolve())
+        self.debug_folder = journal.artifacts(key)
+
+        if journal.done(key, "tags"):
+            self._log_print(msg_GREEN="Skipping already tagged album:",
+                            msg_WHITE=key)
+            return
+
+        if journal.done(key, "parsed"):
+            self._log_print(msg_GREEN="Restoring parsed album:",
+                            msg_WHITE=key)
+            self.from_checkpoint(journal.data(key, "parsed"))
+            cover = self.debug_folder / "cover.jpg"
+            if cover.is_file():
+                self.COVERART = cover.read_bytes()
+        else:
+            # page has been downloaded before, use the pickled version
+            if journal.done(key, "page"):
+                self.offline_debug = True
+
+            self._log_print(msg_GREEN="Searching for:",
+                            msg_WHITE=f"{self.ALBUM} by {self.ALBUMARTIST}")
+            error_msg = self.get_wiki()
+            if error_msg and self.offline_debug:
+                self.offline_debug = False
+                error_msg = self.get_wiki()
+            if error_msg:
+                self._log_print(msg_GREEN=error_msg)
+                return
+
+            self.basic_out()
+            journal.record(key, "page")
+
+            self.get_release_date()
+            self.get_genres()
+            self.get_contents()
+            self.get_cover_art(in_thread=False)
+            self.get_tracks()
+            self.get_personnel()
+            self.get_composers()
+
+            if not self.GENRE and self.genres:
+                self.GENRE = self.genres[0]
+
+            (self.debug_folder / "cover.jpg").write_bytes(
+                bytes(self.COVERART))
+            journal.record(key, "parsed", data=self.to_checkpoint())
+
+        if journal.done(key, "lyrics"):
+            self._lyrics, self._lyric_sources = journal.data(key, "lyrics")
+        else:
+            self._log_print(msg_GREEN="Searching for lyrics")
+            self.save_lyrics()
+            journal.record(key, "lyrics",
+                           data=(self._lyrics, self._lyric_sources))
 
-        if not self.write_tags():
+        if not self.write_tags(list(lrange(self))):
             self._log_print(msg_WHITE="Cannot write tags because there are no "
                             "coresponding files")
         else:
+            journal.record(key, "tags", files=self.files)
             self._log_print(msg_GREEN="Done")
 
     def _log_print(self, msg_GREEN: str = "", msg_WHITE: str = "",
@@ -2,10 +2,12 @@
 
 import logging
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
 
 from wiki_music.utilities import MultiLog
 
+from ..tags_handler import CoverArt
+
 __all__ = ["ParserBase"]
 
 log = logging.getLogger(__name__)
@@ -17,6 +19,7 @@ if TYPE_CHECKING:
 SList = List[str]  # list of strings
 PList = List[Path]  # list of strings
 IList = List[int]  # list of ints
+FList = List[float]  # list of floats
 NSList = List[SList]  # nested list
 NIList = List[IList]  # nested list
 
@@ -44,6 +47,8 @@ class ParserBase:
         determines if tracklist in  format will be output
     multi_threaded: bool
         whether to run parts of the code in parallel
+    lyrics_prefetch: bool
+        whether to start lyrics search as soon as tracklist is known
     _contents: List[str]
         stores the wikipedia page contents
     _disk_sep: List[int]
@@ -52,6 +57,8 @@ class ParserBase:
         of zero first index
     _disks: List[list]
         holds album disks titles
+    _durations: List[float]
+        track lengths in seconds from tracklist, 0 if not listed
     genres: List[str]
         list of genres found in wikipedia page
     _header: List[str]
@@ -93,6 +100,7 @@ class ParserBase:
         self._tracks: SList = []
         self._types: SList = []
         self._disc_num: IList = []
+        self._durations: FList = []
         self._disk_sep: IList = []
         self._disks: List[list] = []
         self.genres: SList = []
@@ -112,7 +120,7 @@ class ParserBase:
         self._subtracks: NSList = []
 
         # bytes
-        self._cover_art: bytes = bytes()
+        self._cover_art: Union[bytes, CoverArt] = bytes()
 
         # strings
         self._release_date: str = ""
@@ -126,6 +134,7 @@ class ParserBase:
             self.offline_debug = False
             self.write_json = False
             self.multi_threaded = True
+            self.lyrics_prefetch = False
             self.work_dir: Path = Path("")
             self._log: MultiLog = MultiLog(log)
             self._GUI = False
@@ -197,15 +206,21 @@ class ParserBase:
         self._composers = value
 
     @property
-    def COVERART(self) -> bytes:
-        """Holds cover art read into memory as a bytes object.
+    def COVERART(self) -> Union[bytes, CoverArt]:
+        """Holds handle to cover art which loads the image on demand.
+
+        Assigned bytes are moved to
+        :class:`wiki_music.utilities.image_store.ImageStore` and replaced by
+        handle. Empty bytes mean there is no cover art.
 
-        :type: bytes
+        :type: Union[bytes, CoverArt]
         """
         return self._cover_art
 
     @COVERART.setter
-    def COVERART(self, value: bytes):
+    def COVERART(self, value: Union[bytes, CoverArt]):
+        if isinstance(value, (bytes, bytearray)) and value:
+            value = CoverArt.stored(value)
         self._cover_art = value
 
     @property
@@ -205,6 +205,30 @@ class DataExtractors:
 
         return tracks[0], tracks[1:len(tracks)]
 
+    @staticmethod
+    def _get_duration(cell: str) -> float:
+        """Convert track length from tracklist table cell to seconds.
+
+        Parameters
+        ----------
+        cell: str
+            table cell with track length e.g. 4:35 or (4:35)
+
+        Returns
+        -------
+        float
+            track length in seconds, 0 if the cell does not contain length
+        """
+        # table cells may have the length without brackets
+        length = TIME.fullmatch(f"({cell.strip().strip('()')})")
+
+        if not length:
+            return 0.0
+
+        hours, minutes, seconds = length.groups()
+        return float(int(hours or 0) * 3600 + int(minutes) * 60 +
+                     int(seconds))
+
     @staticmethod
     def _get_artist(cell: str) -> List[str]:
         """Splits list of artists in tracklist table cell separated by , or &.
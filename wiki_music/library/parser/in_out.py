@@ -3,22 +3,24 @@
 import logging
 import pickle  # lazy loaded
 from abc import abstractmethod
-from collections import UserList
-from itertools import combinations, filterfalse, product  # lazy loaded
+from itertools import filterfalse, product  # lazy loaded
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict, Generator, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
-import rapidfuzz.fuzz as fuzz  # lazy loaded
-import rapidfuzz.process as process  # lazy loaded
+import numpy as np
 
-from wiki_music.constants import (EXTENDED_TAGS, GREEN, LBLUE, LGREEN,
-                                  OUTPUT_FOLDER, RESET, YELLOW)
+from wiki_music.constants import (DISC_DIR, DURATION_TOLERANCE,
+                                  EXTENDED_TAGS, FILE_MATCH_CUES,
+                                  FILE_MATCH_THRESHOLD, FILE_NUMBER, GREEN,
+                                  LBLUE, LGREEN, OUTPUT_FOLDER, RESET, YELLOW)
 from wiki_music.utilities import (
-    ThreadPool, bracket, count_spaces, exception, json_dump, list_files,
-    lrange, win_naming_convetion, write_roman)
+    DeviceThreadPool, bracket, count_spaces, exception, iter_files, json_dump,
+    linear_assignment, list_files, lrange, score_matrix, win_naming_convetion,
+    write_roman)
 
-from ..lyrics import save_lyrics
-from ..tags_io import read_tags, write_tags
+from ..index import LibraryIndex
+from ..lyrics import LyricsPrefetch, save_lyrics
+from ..tags_io import write_tags
 from .base import ParserBase
 
 log = logging.getLogger(__name__)
@@ -62,6 +64,7 @@ class ParserInOut(ParserBase):
         super().__init__(protected_vars=protected_vars)
 
         self._debug_folder: "Path" = ""
+        self._prefetched_lyrics: Optional[LyricsPrefetch] = None
 
     @abstractmethod
     def _info_tracks(self):
@@ -107,80 +110,150 @@ class ParserInOut(ParserBase):
     def debug_folder(self) -> "Path":
         """Path to debugging folder.
 
-        :type: str
+        Unless set explicitly, folder is named after the album in
+        :const:`wiki_music.constants.paths.OUTPUT_FOLDER`.
+
+        :type: Path
         """
-        if not self._debug_folder:
+        if self._debug_folder:
+            folder = self._debug_folder
+        else:
             _win_name = win_naming_convetion(self._album, dir_name=True)
-            self._debug_folder = OUTPUT_FOLDER / _win_name
-            self._debug_folder.mkdir(parents=True, exist_ok=True)
+            folder = OUTPUT_FOLDER / _win_name
+
+        folder.mkdir(parents=True, exist_ok=True)
+        return folder
+
+    @debug_folder.setter
+    def debug_folder(self, folder: "Path"):
+        self._debug_folder = folder
+
+    def _file_cues(self, disk_files: List[Path]
+                   ) -> Tuple[List[str], List[Optional[int]],
+                              List[Optional[int]]]:
+        """Split file names to title and track and disc numbers.
+
+        Parameters
+        ----------
+        disk_files: List[Path]
+            music files found in working directory
+
+        Returns
+        -------
+        List[str]
+            file names stripped of track numbers
+        List[Optional[int]]
+            track numbers from the start of file names
+        List[Optional[int]]
+            disc numbers from file names or parent directories
+        """
+        names: List[str] = []
+        numbers: List[Optional[int]] = []
+        discs: List[Optional[int]] = []
+
+        for df in disk_files:
+            number = FILE_NUMBER.match(df.stem)
+            if number:
+                names.append(df.stem[number.end():])
+                numbers.append(int(number.group(2)))
+            else:
+                names.append(df.stem)
+                numbers.append(None)
+
+            if number and number.group(1):
+                discs.append(int(number.group(1)))
+            else:
+                disc = DISC_DIR.search(df.parent.name)
+                discs.append(int(disc.group(1)) if disc else None)
+
+        return names, numbers, discs
+
+    def _track_cues(self) -> Tuple[List[Optional[int]], List[Optional[int]]]:
+        """Get track and disc numbers from tracklist if they are known.
+
+        Returns
+        -------
+        List[Optional[int]]
+            track numbers
+        List[Optional[int]]
+            disc numbers
+        """
+        numbers: List[Optional[int]] = [None] * len(self._tracks)
+        discs: List[Optional[int]] = [None] * len(self._tracks)
 
-        return self._debug_folder
+        if len(self._numbers) == len(self._tracks):
+            numbers = [int(n) if str(n).isdigit() else None
+                       for n in self._numbers]
+        if len(self._disc_num) == len(self._tracks):
+            discs = list(self._disc_num)
+
+        return numbers, discs
+
+    def _duration_filter(self, disk_files: List[Path]
+                         ) -> Tuple[Optional["np.ndarray"], "np.ndarray"]:
+        """Compare track lengths from tracklist with lengths of files.
+
+        Tracks or files with unknown length are compatible with everything.
+
+        Parameters
+        ----------
+        disk_files: List[Path]
+            music files found in working directory
+
+        Returns
+        -------
+        Optional[np.ndarray]
+            boolean matrix of track and file pairs whose lengths differ at
+            most by tolerance, None if no track length is known
+        np.ndarray
+            closeness of track and file lengths from 1 for equal lengths to
+            0 for lengths that differ by tolerance or are unknown
+        """
+        shape = (len(self._tracks), len(disk_files))
+
+        if (len(self._durations) != len(self._tracks) or
+                not any(self._durations) or not disk_files):
+            return None, np.zeros(shape)
+
+        tracks = np.array(self._durations, dtype=float)[:, None]
+        files = np.array(LibraryIndex.durations(disk_files),
+                         dtype=float)[None, :]
+
+        known = (tracks > 0) & (files > 0)
+        difference = np.abs(tracks - files)
+
+        candidates = ~known | (difference <= DURATION_TOLERANCE)
+        closeness = np.where(known & candidates,
+                             1 - difference / DURATION_TOLERANCE, 0)
+
+        log.debug(f"duration filter kept {candidates.sum()} of "
+                  f"{candidates.size} track and file pairs")
+
+        return candidates, closeness
 
     @exception(log)
     def _reassign_files(self):
-        """Search current working directory and assign files to tracks."""
-        class FifoList(UserList):
-
-            class FirstEntry:
-
-                def __init__(self, index: int,
-                             list_reference: List[dict]) -> None:
-                    self.index: int = index
-                    self.file: Path = list_reference[0]["file"]
-                    self.score: int = list_reference[0]["score"]
-                    self._list_reference = list_reference
-
-                def popleft(self) -> None:
-                    self._list_reference.pop(0)
-
-            class FilesList(UserList):
-
-                def get(self, key: str) -> Union[str, int]:
-                    """Always return the first element."""
-                    return self.data[0][key]
-
-            def __init__(self, base_dir: Path) -> None:
-                super().__init__()
-                self.base_dir = base_dir
-
-            def iter_pair_combinations(self) -> Generator[Tuple["FirstEntry",
-                                                                "FirstEntry"],
-                                                          None, None]:
-                for i, j in combinations(lrange(self), 2):
-                    try:
-                        print(self.data)
-                        yield (self.FirstEntry(i, self.data),
-                               self.FirstEntry(j, self.data))
-                    except StopIteration:
-                        return
-
-            def put(self, scored_files: List[Tuple[str, int]]):
-                """Convert list of tuples to list of dicts and append."""
-                self.data.append(
-                    self.FilesList([{"file": self.base_dir / s[0],
-                                     "score": s[1]} for s in scored_files]))
-
-            def cut_to_lenght(self, entries_to_cut: int):
-                # sort indices based on first file score
-                indices = file_map._indices_sorted_by_score
-
-                # keep only number of best indices coresponding
-                # to number of tracks
-                indices = indices[:entries_to_cut]
-
-                # keep the best matching files, reassign the rest to None
-                for i in lrange(self.data):
-                    if i not in indices:
-                        self.data[i] = {"file": None, "score": 0}
-
-            @property
-            def _indices_sorted_by_score(self):
-                indices = [i for i in lrange(file_map)]
-
-                return [i for i, _ in sorted(zip(indices, self),
-                                             key=lambda x: x[1].get("score"),
-                                             reverse=True)]
-            
+        """Search current working directory and assign files to tracks.
+
+        When tracklist contains track lengths, only files with length within
+        :const:`wiki_music.constants.parser_const.DURATION_TOLERANCE` are
+        considered for each track. Track names are scored against all the
+        remaining file names at once, track and disc numbers found in file
+        paths and length differences adjust the scores. Files are then
+        assigned to tracks so the sum of scores is maximal. Each track can
+        also stay without file, which is preferred to any match with score
+        lower than
+        :const:`wiki_music.constants.parser_const.FILE_MATCH_THRESHOLD`.
+
+        See also
+        --------
+        :func:`wiki_music.utilities.parser_utils.score_matrix`
+            computes track and file name similarity
+        :func:`wiki_music.utilities.parser_utils.linear_assignment`
+            finds optimal assignment
+        :meth:`wiki_music.library.index.LibraryIndex.durations`
+            supplies file lengths
+        """
         disk_files = list_files(self.work_dir)
 
         if not self._tracks:
@@ -190,80 +263,58 @@ class ParserInOut(ParserBase):
         # max() argument must have len >= 1
         max_length = len(max(self._tracks, key=len))
 
-        files = []
-
         print(GREEN + "\nFound files:")
         for df in disk_files:
             print(df.resolve())
         print(GREEN + "\nAssigning files to tracks:")
 
-        # TODO untested !!!!
-        # new file assignment
-        file_map = FifoList(self.work_dir)
-        limit = int(len(disk_files) / 2) + 1
-        for tr, tp in zip(self._tracks, self._types):
-            # for each track select best matching files
-            file_map.put(process.extractBests(
-                wnc(f"{tr} {tp}"),
-                [str(f.relative_to(self.work_dir).resolve())
-                 for f in disk_files],
-                scorer=fuzz.token_set_ratio,
-                limit=limit))
-
-        # if there are more tracks than files
-        len_diff = len(disk_files) - len(self._tracks)
-        if len_diff < 0:
-            indices = [i for i in lrange(file_map)]
-
-            # sort indices based on first file score
-            indices = [i for i, _ in sorted(zip(indices, file_map),
-                                            key=lambda x: x[1].get("score"),
-                                            reverse=True)]
-
-            # keep only number of best indices coresponding
-            # to number of tracks
-            indices = indices[:len_diff]
-
-            # keep the best matching files, reassign the rest to None
-            for i in lrange(file_map):
-                if i not in indices:
-                    file_map[i] = {"file": None, "score": 0}
-
-        # if lengths are equal but two tacks have same files
-        for i, j in combinations(lrange(file_map), 2):
-
-            # if None file is assigned skip iteration
-            if not file_map[i].get("file") or not file_map[j].get("file"):
-                continue
-
-            # if files are equal, keep one with the higher score,
-            # and reassign the one with lower score to next in its
-            # respective list
-            elif file_map[i].get("file") == file_map[j].get("file"):
-                if file_map[i].get("score") > file_map[j].get("score"):
-                    file_map[j].pop(0)
-                elif file_map[i].get("score") < file_map[j].get("score"):
-                    file_map[i].pop(0)
-                else:
-                    log.debug(f"i: {i}, j:{j}")
-                    log.debug(wnc(f"{self._tracks[j]} {self._types[j]}"))
-                    f = lambda x: f"{str(x['file']):100}:{x['score']:3}"
-                    for f1, f2 in zip(file_map[i], file_map[j]):
-                        print(f"{f(f1)} | {f(f2)}")
-                    raise Exception(f"File mapping to tracks is "
-                                    f"ambiguous! Cannot load files")
+        names, file_numbers, file_discs = self._file_cues(disk_files)
+        track_numbers, track_discs = self._track_cues()
+
+        candidates, closeness = self._duration_filter(disk_files)
+        scores = score_matrix([f"{tr} {tp}" for tr, tp in
+                               zip(self._tracks, self._types)], names,
+                              mask=candidates)
+        scores += FILE_MATCH_CUES["duration"] * closeness
+
+        file_numbers = np.array([-1 if n is None else n for n in file_numbers])
+        file_discs = np.array([-1 if d is None else d for d in file_discs])
+
+        for i, (number, disc) in enumerate(zip(track_numbers, track_discs)):
+            if disc is not None:
+                known = file_discs >= 0
+                scores[i, known & (file_discs == disc)] += \
+                    FILE_MATCH_CUES["disc"]
+                scores[i, known & (file_discs != disc)] -= \
+                    FILE_MATCH_CUES["disc"]
+            if number is not None:
+                scores[i, file_numbers == number] += FILE_MATCH_CUES["number"]
+
+        if candidates is not None:
+            scores[~candidates] = 0
+
+        # each track has its own dummy column scored by threshold, assigning
+        # track to it means the track has no file
+        n_tracks = len(self._tracks)
+        no_file = np.full((n_tracks, n_tracks), -np.inf)
+        np.fill_diagonal(no_file, FILE_MATCH_THRESHOLD)
+        scores = np.hstack((scores, no_file))
+        scores[np.isinf(scores)] = -2 * scores.max() - 1
+
+        files: List[Optional[Path]] = [None] * n_tracks
+        for i, j in zip(*linear_assignment(-scores)):
+            if j < len(disk_files):
+                files[i] = disk_files[j]
 
         # print out file assignments
-        for tr, f in zip(self._tracks, file_map):
+        for tr, f in zip(self._tracks, files):
 
-            if f.get("file"):
+            if f:
                 print(LBLUE + tr + RESET,
-                      "-" * (1 + max_length - len(tr)) + ">", f.get("file"))
-                files.append(f.get("file"))
+                      "-" * (1 + max_length - len(tr)) + ">", f)
             else:
                 print(YELLOW + tr + RESET, "." * (2 + max_length - len(tr)),
                       "Does not have a matching file!")
-                files.append(None)
 
         self.files = files
 
@@ -443,6 +494,51 @@ class ParserInOut(ParserBase):
 
         return dict_data
 
+    def to_checkpoint(self) -> Dict[str, Union[str, list]]:
+        """Convert extracted tracklist data to json serializable dictionary.
+
+        Cover art and files are left out, cover art is too big to be
+        serialized and files are reassigned on each run.
+
+        See also
+        --------
+        :meth:`from_checkpoint`
+            restores parser state from the dictionary
+        :class:`wiki_music.utilities.journal.Journal`
+            stores the dictionary between batch runs
+
+        Returns
+        -------
+        Dict[str, Union[str, list]]
+            tag names mapped to parser values, raw track types and track
+            lengths
+        """
+        data: Dict[str, Union[str, list]] = {
+            t: getattr(self, t) for t in EXTENDED_TAGS
+            if t not in ("COVERART", "FILE", "TYPE")}
+        data["TYPES"] = self._types
+        data["DURATIONS"] = self._durations
+
+        return data
+
+    def from_checkpoint(self, data: Dict[str, Union[str, list]]):
+        """Restore extracted tracklist data saved by :meth:`to_checkpoint`.
+
+        Parameters
+        ----------
+        data: Dict[str, Union[str, list]]
+            tag names mapped to parser values, raw track types and track
+            lengths
+        """
+        data = dict(data)
+        self._types = data.pop("TYPES")
+        # checkpoints written by older versions have no track lengths
+        self._durations = data.pop("DURATIONS", [])  # type: ignore
+        self._bracketed_types = []
+
+        for tag, value in data.items():
+            setattr(self, tag, value)
+
     def write_tags(self, indices: List[int]) -> bool:
         """Write tags to coresponding files. Writing is done in a parallel.
 
@@ -457,8 +553,9 @@ class ParserInOut(ParserBase):
             function that handles tag writing
         :meth:`data_to_dict`
             this method prepares tags data in suitable format for writing
-        :func:`wiki_music.utilities.parser_utils.ThreadPool`
-            class that handles paralelism
+        :func:`wiki_music.utilities.parser_utils.DeviceThreadPool`
+            class that handles paralelism, files are written with
+            concurrency limited for each disk
 
         Returns
         -------
@@ -468,13 +565,20 @@ class ParserInOut(ParserBase):
         if not any(self.files):
             return False
         else:
-            t = ThreadPool(target=write_tags,
-                           args=[(d, ) for d in self.data_to_dict(indices)])
+            data = self.data_to_dict(indices)
+            t = DeviceThreadPool(target=write_tags,
+                                 args=[(d, ) for d in data],
+                                 paths=[Path(d["FILE"]) if d["FILE"] else None
+                                        for d in data])
             if self.multi_threaded:
                 t.run()
             else:
                 t.run_serial()
 
+            # wait until all files are written, callers rely on tags
+            # being on disk when this method returns
+            t.results()
+
             return True
 
     def save_lyrics(self, find: bool = True):
@@ -483,22 +587,92 @@ class ParserInOut(ParserBase):
         Parameters
         ----------
         find: bool
-            if False lyrics list is initialized only with empty strings
+            if False lyrics list is initialized only with empty strings and
+            prefetched lyrics are dropped
 
         See also
         --------
         :func:`wiki_music.library.lyrics.save_lyrics`
             function that handles lyrics finding and saving
         """
+        prefetch, self._prefetched_lyrics = self._prefetched_lyrics, None
+
         if find:
             self._lyrics, self._lyric_sources = save_lyrics(
                 self._tracks, self._types, self._band, self._album, self._GUI,
-                self.multi_threaded
+                self.multi_threaded, prefetch=prefetch
             )
         else:
+            if prefetch:
+                prefetch.cancel()
             self._lyrics = [""] * len(self)
             self._lyric_sources = [None] * len(self)  # TODO lyric sources
 
+    def fill_lyrics(self) -> List[int]:
+        """Search lyrics only for tracks which do not have them yet.
+
+        Lyrics read from tags are kept, so repeated runs over mostly complete
+        library cost only the missing tracks.
+
+        See also
+        --------
+        :func:`wiki_music.library.lyrics.save_lyrics`
+            function that handles lyrics finding and saving
+
+        Returns
+        -------
+        List[int]
+            indices of tracks that got new lyrics
+        """
+        n_tracks = len(self._tracks)
+        lyrics = list(self._lyrics) + [""] * (n_tracks - len(self._lyrics))
+        sources = list(getattr(self, "_lyric_sources", None) or [])
+        sources += [None] * (n_tracks - len(sources))
+
+        missing = [i for i, lyr in enumerate(lyrics) if not lyr.strip()]
+        self._log.info(f"{len(missing)} of {n_tracks} tracks are missing "
+                       f"lyrics")
+
+        filled = []
+        if missing:
+            found, found_sources = save_lyrics(
+                [self._tracks[i] for i in missing],
+                [self._types[i] for i in missing], self._band, self._album,
+                self._GUI, self.multi_threaded)
+
+            for i, lyr, source in zip(missing, found, found_sources):
+                if lyr:
+                    lyrics[i] = lyr
+                    sources[i] = source
+                    filled.append(i)
+
+        self._lyrics = lyrics
+        self._lyric_sources = sources
+
+        return filled
+
+    def prefetch_lyrics(self):
+        """Start lyrics search in background before user asks for lyrics.
+
+        Results are used by next call to :meth:`save_lyrics` if tracks do not
+        change in the meantime and are dropped if user does not want lyrics.
+        Does nothing unless :attr:`lyrics_prefetch` is turned on.
+
+        See also
+        --------
+        :class:`wiki_music.library.lyrics.LyricsPrefetch`
+            background lyrics search
+        """
+        if not self.lyrics_prefetch:
+            return
+
+        if self._prefetched_lyrics:
+            self._prefetched_lyrics.cancel()
+
+        self._prefetched_lyrics = LyricsPrefetch(
+            self._tracks, self._types, self._band, self._album, self._GUI,
+            self.multi_threaded)
+
     def read_files(self):
         """Read tags from files in working directory.
 
@@ -506,24 +680,25 @@ class ParserInOut(ParserBase):
         --------
         :func:`wiki_music.library.tags_io.read_tags`
             function that thandles tag reading
+        :class:`wiki_music.library.index.LibraryIndex`
+            index which holds tags of files that were already read
         """
         # initialize variables
         self.reinit(protected_vars=False)
 
-        t = ThreadPool(read_tags, [(f, ) for f in self.files])
-        if self.multi_threaded:
-            t.run()
-        else:
-            t.run_serial()
+        # read tags while the directory is still being searched, unchanged
+        # files are served from library index
+        self.files, tags = LibraryIndex.read_stream(
+            iter_files(self.work_dir), self.multi_threaded,
+            directory=self.work_dir)
 
-        # read tags
-        for tag in t.results():
+        for tag in tags:
 
             for key, value in tag.items():
 
                 # TODO need more elegant way to avoid this difference
                 # between read tags and parser attributes
-                if key == "COMMENT":
+                if key in ("COMMENT", "DURATION"):
                     continue
 
                 if isinstance(getattr(self, key), list):
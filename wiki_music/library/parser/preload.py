@@ -15,7 +15,6 @@ import bs4  # lazy loaded
 import rapidfuzz.fuzz as fuzz  # lazy loaded
 import wikipedia as wiki  # lazy loaded
 
-from wiki_music.constants import OUTPUT_FOLDER
 from wiki_music.utilities import (Control, MultiLog, ThreadWithTrace,
                                   normalize_caseless)
 
@@ -82,12 +81,14 @@ class Preload:
     _error: str
     message: Queue
 
-    def __init__(self, album: str, band: str, offline_debug: bool) -> None:
+    def __init__(self, album: str, band: str, offline_debug: bool,
+                 debug_folder: "Path") -> None:
 
         # preload variables
         self._album = album
         self._band = band
         self._offline_debug = offline_debug
+        self._debug_folder = debug_folder
 
         # control
         self._log = MultiLog(log)
@@ -274,7 +275,7 @@ class Preload:
         Optional[str]
             if some error occured return string with its description
         """
-        path = OUTPUT_FOLDER / self._album / "page.pkl"
+        path = self._debug_folder / "page.pkl"
         log.debug(f"loading pickle file {path}")
 
         # TODO pickle probably cannot handle some complex pages
@@ -434,6 +435,7 @@ class WikiCooker(ParserBase):
     _sections: Dict[str, List["Tag"]]
     _preload_cache: Dict[Tuple[str, str, str], Preload]
     _preload_in_thread: bool
+    debug_folder: "Path"
 
     def __init__(self, protected_vars: bool) -> None:
 
@@ -471,7 +473,8 @@ class WikiCooker(ParserBase):
         # if preload config does not exist in cache, run it
         if pid not in self._preload_cache:
             log.debug(f"starting preload for: {pid}")
-            p = Preload(self._album, self._band, self.offline_debug)
+            p = Preload(self._album, self._band, self.offline_debug,
+                        self.debug_folder)
             self._preload_cache[pid] = p
 
             log.debug("pausing other preloads")
@@ -532,8 +535,9 @@ class WikiCooker(ParserBase):
         # stop all preloads
         self.stop_preload()
 
-        # if wrong wikipedia page was found ask to exit
-        if error == "Album doesnt't belong to the input band":
+        # if wrong wikipedia page was found ask to exit, without GUI there
+        # is no one to answer so just return the error
+        if error == "Album doesnt't belong to the input band" and self._GUI:
             self.terminate(error)
 
         return error
@@ -10,7 +10,7 @@ import re  # lazy loaded
 from os import path
 from operator import itemgetter
 from threading import Thread
-from typing import TYPE_CHECKING, List, Optional, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
 
 import datefinder  # lazy loaded
 import rapidfuzz.fuzz as fuzz  # lazy loaded
@@ -33,6 +33,7 @@ from .preload import WikiCooker
 
 if TYPE_CHECKING:
     from bs4.element import Tag
+    from ..tags_handler import CoverArt
 
 nc = normalize_caseless
 log = logging.getLogger(__name__)
@@ -146,7 +147,8 @@ class WikipediaParser(DataExtractors, WikiCooker, ParserInOut):
 
         return self.genres
 
-    def get_cover_art(self, in_thread: bool = False) -> Optional[bytes]:
+    def get_cover_art(self, in_thread: bool = False
+                      ) -> Optional[Union[bytes, "CoverArt"]]:
         """Get album cover art.
 
         Extracts from information box in the top right corner of wikipedia
@@ -178,14 +180,14 @@ class WikipediaParser(DataExtractors, WikiCooker, ParserInOut):
                 img = None
 
             if img:
-                self._cover_art = get_image(f"https:{img['src']}")
+                self.COVERART = get_image(f"https:{img['src']}")
             else:
-                self._cover_art = (FILES_DIR / "Na.jpg").read_bytes()
+                self.COVERART = (FILES_DIR / "Na.jpg").read_bytes()
                 raise NoCoverArtException("Couldn't extract cover art from "
                                           "wikipedia page")
 
             if not in_thread:
-                return self._cover_art
+                return self.COVERART
 
         if not in_thread:
             return cover_art_getter()
@@ -500,6 +502,11 @@ class WikipediaParser(DataExtractors, WikiCooker, ParserInOut):
                     tmp1, tmp2 = self._get_track(song[1])
                     self._tracks.append(tmp1)
                     self._subtracks.append(tmp2)
+                    # track length is in the last column
+                    if len(song) > 2:
+                        self._durations.append(self._get_duration(song[-1]))
+                    else:
+                        self._durations.append(0.0)
 
                     if len(song) > 3:
                         self._artists.append([])
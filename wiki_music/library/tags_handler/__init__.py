@@ -1,11 +1,14 @@
 """Low level tags handling implementation based on mutagen library."""
 
 import logging
-from typing import TYPE_CHECKING, Type, Union
+from typing import TYPE_CHECKING, Optional, Type, Union
 from pathlib import Path
 
 from wiki_music.utilities import exception, UnsupportedFileType
 
+from .cache import TagCache
+from .cover_art import CoverArt
+
 # TODO does not work, not sure why? gives wird attribute errors
 # from lazy_import import lazy_callable
 # TagMp3 = lazy_callable("wiki_music.library.tags_handler.mp3.TagMp3")
@@ -18,12 +21,27 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
-__all__ = ["File"]
+__all__ = ["File", "CoverArt", "TagCache"]
 
 
-def File(filename: Union[str, Path]) -> "TagBase":
+def File(filename: Union[str, Path], cached: bool = True) -> "TagBase":
     """Class factory which returns coresponding class based on file type.
 
+    Handlers are reused from session cache if the file has not changed since
+    it was last opened.
+
+    See also
+    --------
+    :class:`wiki_music.library.tags_handler.cache.TagCache`
+        cache of parsed tag handlers
+
+    Parameters
+    ----------
+    filename: Union[str, Path]
+        path to music file
+    cached: bool
+        if False, file is always parsed and the handler is not cached
+
     Note
     ----
     Currently supported types are: mp3, flac, m4a
@@ -41,15 +59,26 @@ def File(filename: Union[str, Path]) -> "TagBase":
     if isinstance(filename, str):
         filename = Path(filename)
 
+    handle: Optional["TagBase"]
+    if cached:
+        handle = TagCache.get(filename)
+        if handle:
+            return handle
+
     if filename.suffix.endswith("mp3"):
         from .mp3 import TagMp3
-        return TagMp3(filename)
+        handle = TagMp3(filename)
     elif filename.suffix.endswith("flac"):
         from .flac import TagFlac
-        return TagFlac(filename)
+        handle = TagFlac(filename)
     elif filename.suffix.endswith("m4a"):
         from .m4a import TagM4a
-        return TagM4a(filename)
+        handle = TagM4a(filename)
     else:
         e = (f"Tagging for {filename.suffix} files is not implemented")
         raise UnsupportedFileType(e)
+
+    if cached:
+        TagCache.put(handle)
+
+    return handle
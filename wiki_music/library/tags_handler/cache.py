@@ -0,0 +1,129 @@
+"""Session cache of opened tag handlers."""
+
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from threading import RLock
+from typing import TYPE_CHECKING, Optional, Tuple, Union
+
+from wiki_music.constants.tags import TAG_CACHE_SIZE
+
+if TYPE_CHECKING:
+    from .tag_base import TagBase
+
+log = logging.getLogger(__name__)
+
+_Stat = Optional[Tuple[int, int]]
+
+__all__ = ["TagCache"]
+
+
+class TagCache:
+    """Keeps parsed tag handlers so the file is not parsed again on write.
+
+    Handlers are keyed by file path and are valid while the file size and
+    modification time stay the same. Handlers are cached when files are
+    parsed through :func:`wiki_music.library.tags_handler.File`, e.g. by
+    :meth:`wiki_music.library.index.LibraryIndex.read_stream`. Cached
+    handlers do not hold picture payloads, those are moved to
+    :class:`wiki_music.utilities.image_store.ImageStore`, where the cover
+    shared by all album tracks is kept only once and can be spilled to
+    disk, and are put back when the handler saves the file. Least recently used handlers are dropped when
+    there are more than :const:`wiki_music.constants.tags.TAG_CACHE_SIZE`
+    of them. All methods are thread safe.
+
+    Attributes
+    ----------
+    _handles: OrderedDict[str, Tuple[Tuple[int, int], TagBase]]
+        cached handlers with file size and modification time at the time
+        they were cached
+    """
+
+    _lock: RLock = RLock()
+    _handles: "OrderedDict[str, Tuple[Tuple[int, int], TagBase]]" = \
+        OrderedDict()
+
+    @staticmethod
+    def _key(filename: Union[str, Path]) -> Tuple[str, _Stat]:
+        path = os.path.abspath(filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return path, None
+        else:
+            return path, (stat.st_size, stat.st_mtime_ns)
+
+    @classmethod
+    def get(cls, filename: Union[str, Path]) -> Optional["TagBase"]:
+        """Get handler for file if the file has not changed since caching.
+
+        Parameters
+        ----------
+        filename: Union[str, Path]
+            path to music file
+
+        Returns
+        -------
+        Optional[TagBase]
+            cached handler or None
+        """
+        path, stat = cls._key(filename)
+
+        with cls._lock:
+            try:
+                cached_stat, handle = cls._handles[path]
+            except KeyError:
+                return None
+
+            if stat and cached_stat == stat:
+                cls._handles.move_to_end(path)
+                return handle
+            else:
+                log.debug(f"{path} changed since it was cached")
+                del cls._handles[path]
+                return None
+
+    @classmethod
+    def put(cls, handle: "TagBase"):
+        """Cache handler, picture payloads are moved to image store.
+
+        Tags are read before caching if they were not read yet, because the
+        pictures are needed to describe cover art.
+
+        Parameters
+        ----------
+        handle: TagBase
+            tag handler of an unchanged file
+        """
+        path, stat = cls._key(handle._filename)
+        if not stat:
+            return
+
+        handle.tags
+        handle._strip_pictures()
+
+        with cls._lock:
+            cls._handles[path] = (stat, handle)
+            cls._handles.move_to_end(path)
+
+            while len(cls._handles) > TAG_CACHE_SIZE:
+                cls._handles.popitem(last=False)
+
+    @classmethod
+    def discard(cls, filename: Union[str, Path]):
+        """Remove file handler from cache, e.g. when saving has failed.
+
+        Parameters
+        ----------
+        filename: Union[str, Path]
+            path to music file
+        """
+        with cls._lock:
+            cls._handles.pop(os.path.abspath(filename), None)
+
+    @classmethod
+    def clear(cls):
+        """Remove all handlers from cache."""
+        with cls._lock:
+            cls._handles.clear()
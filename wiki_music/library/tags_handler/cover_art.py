@@ -0,0 +1,142 @@
+"""Lightweight handle to cover art embedded in music file."""
+
+import logging
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from wiki_music.utilities import ImageStore
+
+log = logging.getLogger(__name__)
+
+__all__ = ["CoverArt"]
+
+
+class CoverArt:
+    """Describes cover art picture without holding its data.
+
+    Tag reading returns this handle instead of picture bytes so reading
+    whole album does not keep copy of multi-megabyte image for every track.
+    Image data are loaded only when they are actually needed, e.g. for
+    displaying in GUI or writing to other file. Loaded images are kept in
+    :class:`wiki_music.utilities.image_store.ImageStore` so all the tracks
+    sharing the same picture reference one buffer.
+
+    Handles compare equal when the images have the same digest, comparison
+    to bytes hashes the bytes instead of loading the image.
+
+    Parameters
+    ----------
+    path: Optional[Union[str, Path]]
+        music file with embedded picture, None if the image exists only in
+        image store
+    size: int
+        picture size in bytes
+    mime: str
+        picture mime type
+    digest: str
+        sha1 hex digest of picture data
+
+    Attributes
+    ----------
+    data: bytes
+        picture data from image store or from file
+    """
+
+    __slots__ = ("path", "size", "mime", "digest")
+
+    def __init__(self, path: Optional[Union[str, Path]], size: int,
+                 mime: str, digest: str) -> None:
+
+        self.path = Path(path) if path else None
+        self.size = size
+        self.mime = mime
+        self.digest = digest
+
+    @classmethod
+    def from_data(cls, path: Union[str, Path], data: bytes,
+                  mime: str = "image/jpeg") -> "CoverArt":
+        """Create handle for picture data that were just read from file.
+
+        Data are not kept in memory, they will be read from file again when
+        needed.
+
+        Parameters
+        ----------
+        path: Union[str, Path]
+            music file with embedded picture
+        data: bytes
+            picture data
+        mime: str
+            picture mime type
+
+        Returns
+        -------
+        CoverArt
+            handle describing the picture
+        """
+        return cls(path, len(data), mime, ImageStore.digest(data))
+
+    @classmethod
+    def stored(cls, data: bytes, mime: str = "image/jpeg") -> "CoverArt":
+        """Move picture that is not backed by any file to image store.
+
+        Parameters
+        ----------
+        data: bytes
+            picture data, e.g. downloaded from internet
+        mime: str
+            picture mime type
+
+        Returns
+        -------
+        CoverArt
+            handle describing the picture
+        """
+        return cls(None, len(data), mime, ImageStore.put(data))
+
+    @property
+    def data(self) -> bytes:
+        data = ImageStore.get(self.digest)
+        if data is not None:
+            return data
+
+        if not self.path:
+            log.warning(f"Cover art {self.digest} is missing in image store")
+            return bytes()
+
+        from . import File
+
+        # cached handlers do not hold picture payloads
+        picture = File(self.path, cached=False)._read_picture()
+
+        if not picture:
+            log.warning(f"Cover art is no longer present in {self.path}")
+            return bytes()
+
+        data = picture[0]
+        if ImageStore.put(data) != self.digest:
+            log.warning(f"Cover art in {self.path} changed since it was read")
+
+        return data
+
+    def __bytes__(self) -> bytes:
+        return self.data
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, CoverArt):
+            return self.digest == other.digest
+        elif isinstance(other, (bytes, bytearray)):
+            return (self.size == len(other) and
+                    self.digest == ImageStore.digest(other))
+        else:
+            return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    def __repr__(self) -> str:
+        return (f"<CoverArt: {self.mime}, {self.size} bytes, "
+                f"digest={self.digest[:8]}, path={self.path}>")
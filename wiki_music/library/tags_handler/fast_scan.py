@@ -0,0 +1,616 @@
+"""Read-only fast path for reading tags and track length.
+
+Scanner memory maps the file and parses only the tag region and the few
+headers needed to compute track length, frames and atoms that are not
+needed are skipped by their size. Picture data are never copied, only
+hashed in place to create :class:`wiki_music.library.tags_handler.CoverArt`
+handle. Files with unusual structure, which would need the full mutagen
+machinery (e.g. unsynchronised or compressed ID3 frames), are rejected and
+should be read by :func:`wiki_music.library.tags_handler.File` instead.
+"""
+
+import logging
+import mmap
+import re
+import struct
+from hashlib import sha1
+from pathlib import Path
+from typing import (Any, Callable, Dict, Generator, List, Optional, Tuple,
+                    Union)
+
+from mutagen.id3 import TCON
+
+from .cover_art import CoverArt
+from .tag_base import TagBase
+
+log = logging.getLogger(__name__)
+
+__all__ = ["scan"]
+
+# raw tags as lists of values keyed by high level tag names and cover art
+# described by its mime type and position in file
+_Raw = Dict[str, List[Any]]
+_Picture = Optional[Tuple[str, int, int]]
+
+
+class _ScanError(Exception):
+    """Raised when file must be read by mutagen instead."""
+
+
+def _cover(view: memoryview, filename: Path,
+           picture: _Picture) -> Union[CoverArt, bytes]:
+    """Hash picture in place and return handle describing it."""
+    if not picture:
+        return TagBase._get_default_tag("COVERART")
+
+    mime, start, end = picture
+    return CoverArt(filename, end - start, mime,
+                    sha1(view[start:end]).hexdigest())
+
+
+def _syncsafe(data: bytes) -> int:
+    if any(b & 0x80 for b in data):
+        raise _ScanError("invalid syncsafe integer")
+
+    return ((data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3])
+
+
+def _id3_size(mm: mmap.mmap, offset: int) -> int:
+    """Size of ID3v2 tag including header at offset, 0 if there is none."""
+    header = mm[offset:offset + 10]
+    if len(header) != 10 or header[:3] != b"ID3":
+        return 0
+
+    footer = 10 if header[5] & 0x10 else 0
+    return 10 + footer + _syncsafe(header[6:10])
+
+
+# ID3 #########################################################################
+_ID3_FRAMES = {
+    "TALB": "ALBUM",
+    "TPE2": "ALBUMARTIST",
+    "TPE1": "ARTIST",
+    "COMM": "COMMENT",
+    "TCOM": "COMPOSER",
+    "TDRC": "DATE",
+    "TPOS": "DISCNUMBER",
+    "TCON": "GENRE",
+    "USLT": "LYRICS",
+    "TIT2": "TITLE",
+    "TRCK": "TRACKNUMBER",
+}
+# ID3v2.3 date frames, that mutagen merges to TDRC
+_ID3_DATE_FRAMES = ("TYER", "TDAT", "TIME")
+_ID3_ENCODINGS = {0: ("latin1", b"\x00"), 1: ("utf-16", b"\x00\x00"),
+                  2: ("utf-16-be", b"\x00\x00"), 3: ("utf-8", b"\x00")}
+
+
+def _terminator(data: Union[bytes, mmap.mmap], start: int, end: int,
+                encoding: int) -> Tuple[int, int]:
+    """Find end of null terminated string in given encoding.
+
+    Returns
+    -------
+    Tuple[int, int]
+        offset of string end and of the data that follow
+    """
+    terminator = _ID3_ENCODINGS[encoding][1]
+
+    pos = data.find(terminator, start, end)
+    # utf-16 terminator must be aligned to character boundary
+    while pos != -1 and (pos - start) % len(terminator):
+        pos = data.find(terminator, pos + 1, end)
+
+    if pos == -1:
+        return end, end
+    else:
+        return pos, pos + len(terminator)
+
+
+def _decode(data: bytes, encoding: int) -> List[str]:
+    """Decode null separated list of strings from ID3 text frame."""
+    try:
+        codec = _ID3_ENCODINGS[encoding][0]
+    except KeyError:
+        raise _ScanError(f"unknown text encoding {encoding}")
+
+    values = []
+    start = 0
+    while start < len(data):
+        end, next_start = _terminator(data, start, len(data), encoding)
+        values.append(data[start:end].decode(codec, "replace")
+                      .lstrip("\ufeff"))
+        start = next_start
+
+    # mutagen drops the trailing empty value left by terminator
+    return values if values else [""]
+
+
+def _scan_id3(mm: mmap.mmap) -> Tuple[_Raw, _Picture]:
+    """Read ID3v2.3 or ID3v2.4 tag at the start of file.
+
+    Returns
+    -------
+    _Raw
+        tags in the form returned by mutagen frames
+    _Picture
+        first attached picture
+    """
+    if not _id3_size(mm, 0):
+        raise _ScanError("file has no ID3v2 tag")
+
+    version, flags = mm[3], mm[5]
+    if version not in (3, 4):
+        raise _ScanError(f"unsupported ID3v2.{version} tag")
+    if flags & 0x80:
+        raise _ScanError("unsynchronised tag")
+
+    offset = 10
+    end = 10 + _syncsafe(mm[6:10])
+
+    if flags & 0x40:
+        if version == 4:
+            offset += _syncsafe(mm[10:14])
+        else:
+            offset += 4 + struct.unpack(">I", mm[10:14])[0]
+
+    raw: _Raw = {}
+    dates: Dict[str, str] = {}
+    picture: _Picture = None
+
+    while offset + 10 <= end:
+        header = mm[offset:offset + 10]
+        frame_id = header[:4]
+        if not frame_id.strip(b"\x00") or not frame_id.isalnum():
+            # reached padding
+            break
+
+        if version == 4:
+            frame_size = _syncsafe(header[4:8])
+            compressed = header[9] & 0x0C or header[9] & 0x02
+            skip = (1 if header[9] & 0x40 else 0) + \
+                (4 if header[9] & 0x01 else 0)
+        else:
+            frame_size = struct.unpack(">I", header[4:8])[0]
+            compressed = header[9] & 0xC0
+            skip = 1 if header[9] & 0x20 else 0
+
+        start = offset + 10
+        offset = start + frame_size
+        if offset > end:
+            raise _ScanError("frame exceeds tag size")
+
+        name = frame_id.decode("ascii")
+        if name not in _ID3_FRAMES and name not in _ID3_DATE_FRAMES and \
+                name != "APIC":
+            continue
+        if compressed:
+            raise _ScanError(f"compressed or encrypted {name} frame")
+
+        start += skip
+        if name == "APIC":
+            if picture:
+                continue
+            # picture data are only located, not copied
+            encoding = mm[start]
+            if encoding not in _ID3_ENCODINGS:
+                raise _ScanError(f"unknown text encoding {encoding}")
+            mime_end, type_pos = _terminator(mm, start + 1, offset, 0)
+            _, data = _terminator(mm, type_pos + 1, offset, encoding)
+            picture = (mm[start + 1:mime_end].decode("latin1"), data, offset)
+            continue
+
+        data = mm[start:offset]
+        if not data:
+            continue
+
+        if name in ("COMM", "USLT"):
+            if data[0] not in _ID3_ENCODINGS:
+                raise _ScanError(f"unknown text encoding {data[0]}")
+            desc, text = _terminator(data, 4, len(data), data[0])
+            if name == "COMM":
+                # comments with description are written by other programs,
+                # empty utf-16 description still has BOM and terminator
+                if _decode(data[4:desc], data[0])[0]:
+                    continue
+                value: Any = _decode(data[text:], data[0])
+            else:
+                value = _decode(data[text:], data[0])[0]
+        else:
+            value = _decode(data[1:], data[0])
+
+        if name in _ID3_DATE_FRAMES:
+            dates.setdefault(name, value[0])
+        else:
+            raw.setdefault(_ID3_FRAMES[name], []).append(value)
+
+    if "DATE" not in raw and "TYER" in dates:
+        date = dates["TYER"]
+        if len(dates.get("TDAT", "")) == 4:
+            date += f"-{dates['TDAT'][2:]}-{dates['TDAT'][:2]}"
+            if len(dates.get("TIME", "")) == 4:
+                date += f"T{dates['TIME'][:2]}:{dates['TIME'][2:]}:00"
+        raw["DATE"] = [[date]]
+
+    if "GENRE" in raw:
+        # resolve numeric genre references like mutagen does
+        raw["GENRE"] = [TCON(encoding=3, text=g).genres for g in raw["GENRE"]]
+
+    return raw, picture
+
+
+_MPEG_BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416,
+             448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320,
+             384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256,
+             320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224,
+             256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MPEG_BITRATES[(2, 3)] = _MPEG_BITRATES[(2, 2)]
+_MPEG_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000],
+               2.5: [11025, 12000, 8000]}
+
+
+def _mpeg_frame(mm: mmap.mmap, offset: int
+                ) -> Optional[Tuple[float, int, int, int, int, int, int]]:
+    """Parse MPEG audio frame header.
+
+    Returns
+    -------
+    Optional[Tuple[float, int, int, int, int, int, int]]
+        version, layer, channel mode, bitrate, sample rate, samples per frame
+        and frame length or None if there is no valid header at offset
+    """
+    header = mm[offset:offset + 4]
+    if len(header) != 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+
+    version_bits = (header[1] >> 3) & 0x03
+    layer_bits = (header[1] >> 1) & 0x03
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+
+    if version_bits == 1 or layer_bits == 0 or rate_index == 3 or \
+            bitrate_index in (0, 0xF):
+        return None
+
+    version = [2.5, 0, 2, 1][version_bits]
+    layer = 4 - layer_bits
+    bitrate = _MPEG_BITRATES[(int(version) if version == 1 else 2, layer)]
+    bitrate = bitrate[bitrate_index] * 1000
+    rate = _MPEG_RATES[version][rate_index]
+    padding = (header[2] >> 1) & 0x01
+    mode = header[3] >> 6
+
+    if layer == 1:
+        samples, slot = 384, 4
+    elif version != 1 and layer == 3:
+        samples, slot = 576, 1
+    else:
+        samples, slot = 1152, 1
+
+    length = ((samples // 8 * bitrate) // rate + padding) * slot
+
+    return version, layer, mode, bitrate, rate, samples, length
+
+
+def _mp3_duration(mm: mmap.mmap) -> float:
+    """Compute track length from Xing, VBRI or constant bitrate header."""
+    # players stack multiple ID3 tags, skip all of them
+    offset = 0
+    while True:
+        size = _id3_size(mm, offset)
+        if not size:
+            break
+        offset += size
+
+    # look for two consecutive valid frames in the first megabyte
+    limit = min(len(mm), offset + 2 ** 20)
+    while True:
+        offset = mm.find(b"\xff", offset, limit)
+        if offset == -1:
+            raise _ScanError("no MPEG frame found")
+
+        frame = _mpeg_frame(mm, offset)
+        if frame and _mpeg_frame(mm, offset + frame[-1]):
+            break
+        offset += 1
+
+    version, layer, mode, bitrate, rate, samples, _ = frame
+
+    if layer == 3:
+        if version == 1:
+            xing = offset + (21 if mode == 3 else 36)
+        else:
+            xing = offset + (13 if mode == 3 else 21)
+
+        if mm[xing:xing + 4] in (b"Xing", b"Info"):
+            flags = struct.unpack(">I", mm[xing + 4:xing + 8])[0]
+            pos = xing + 8
+            if flags & 0x01:
+                frames = struct.unpack(">I", mm[pos:pos + 4])[0]
+                pos += 4
+                pos += 4 if flags & 0x02 else 0
+                pos += 100 if flags & 0x04 else 0
+                pos += 4 if flags & 0x08 else 0
+
+                total = samples * frames
+                lame = re.match(rb"(?:LAME|L)(\d)\.(\d+)", mm[pos:pos + 20])
+                if lame and (int(lame[1]), int(lame[2])) >= (3, 90):
+                    delay = mm[pos + 21:pos + 24]
+                    total -= (delay[0] << 4) | (delay[1] >> 4)
+                    total -= ((delay[1] & 0x0F) << 8) | delay[2]
+
+                return max(total, 0) / rate
+
+        vbri = offset + 36
+        if mm[vbri:vbri + 4] == b"VBRI":
+            frames = struct.unpack(">I", mm[vbri + 14:vbri + 18])[0]
+            return samples * frames / rate
+
+    return 8 * (len(mm) - offset) / bitrate
+
+
+def _scan_mp3(mm: mmap.mmap) -> Tuple[_Raw, _Picture, float]:
+    raw, picture = _scan_id3(mm)
+
+    # mp3 handler uses only the first frame of each kind
+    tags = {k: v[0] for k, v in raw.items()}
+    if "LYRICS" in tags:
+        tags["LYRICS"] = [tags["LYRICS"]]
+
+    return tags, picture, _mp3_duration(mm)
+
+
+# FLAC ########################################################################
+_VORBIS_KEYS = {
+    "album": "ALBUM",
+    "albumartist": "ALBUMARTIST",
+    "artist": "ARTIST",
+    "comment": "COMMENT",
+    "composer": "COMPOSER",
+    "date": "DATE",
+    "discnumber": "DISCNUMBER",
+    "genre": "GENRE",
+    "lyrics": "LYRICS",
+    "title": "TITLE",
+    "tracknumber": "TRACKNUMBER",
+}
+
+
+def _scan_flac(mm: mmap.mmap) -> Tuple[_Raw, _Picture, float]:
+    offset = _id3_size(mm, 0)
+    if mm[offset:offset + 4] != b"fLaC":
+        raise _ScanError("not a FLAC file")
+    offset += 4
+
+    tags: _Raw = {}
+    picture: _Picture = None
+    duration: Optional[float] = None
+
+    last = False
+    while not last:
+        header = mm[offset:offset + 4]
+        if len(header) != 4:
+            raise _ScanError("truncated metadata block")
+
+        last = bool(header[0] & 0x80)
+        block_type = header[0] & 0x7F
+        start = offset + 4
+        offset = start + int.from_bytes(header[1:4], "big")
+
+        if block_type == 0:
+            info = int.from_bytes(mm[start + 10:start + 18], "big")
+            rate = info >> 44
+            samples = info & 0xFFFFFFFFF
+            duration = samples / rate if rate else 0.0
+        elif block_type == 4:
+            pos = start
+            vendor = struct.unpack("<I", mm[pos:pos + 4])[0]
+            pos += 4 + vendor
+            count = struct.unpack("<I", mm[pos:pos + 4])[0]
+            pos += 4
+            for _ in range(count):
+                length = struct.unpack("<I", mm[pos:pos + 4])[0]
+                comment = mm[pos + 4:pos + 4 + length]
+                pos += 4 + length
+
+                key, _, value = comment.partition(b"=")
+                name = _VORBIS_KEYS.get(key.decode("ascii", "replace").lower())
+                if name:
+                    tags.setdefault(name, []).append(
+                        value.decode("utf-8", "replace"))
+        elif block_type == 6 and not picture:
+            pos = start + 4
+            length = struct.unpack(">I", mm[pos:pos + 4])[0]
+            mime = mm[pos + 4:pos + 4 + length].decode("latin1")
+            pos += 4 + length
+            pos += 4 + struct.unpack(">I", mm[pos:pos + 4])[0] + 16
+            length = struct.unpack(">I", mm[pos:pos + 4])[0]
+            picture = (mime, pos + 4, pos + 4 + length)
+
+    if duration is None:
+        raise _ScanError("FLAC file has no stream info")
+
+    return tags, picture, duration
+
+
+# MP4 #########################################################################
+_MP4_KEYS = {
+    b"\xa9alb": "ALBUM",
+    b"aART": "ALBUMARTIST",
+    b"\xa9ART": "ARTIST",
+    b"\xa9cmt": "COMMENT",
+    b"\xa9wrt": "COMPOSER",
+    b"\xa9day": "DATE",
+    b"disk": "DISCNUMBER",
+    b"\xa9gen": "GENRE",
+    b"\xa9lyr": "LYRICS",
+    b"\xa9nam": "TITLE",
+    b"trkn": "TRACKNUMBER",
+}
+
+
+def _atoms(mm: mmap.mmap, start: int, end: int
+           ) -> Generator[Tuple[bytes, int, int], None, None]:
+    """Iterate over atoms between offsets, yield name and payload offsets."""
+    offset = start
+    while offset + 8 <= end:
+        size, name = struct.unpack(">I4s", mm[offset:offset + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", mm[offset + 8:offset + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+
+        if size < header or offset + size > end:
+            raise _ScanError(f"invalid atom {name!r}")
+
+        yield name, offset + header, offset + size
+        offset += size
+
+
+def _find_atom(mm: mmap.mmap, start: int, end: int, *path: bytes
+               ) -> Optional[Tuple[int, int]]:
+    """Find payload of atom nested in the given path of atoms."""
+    for name, payload, atom_end in _atoms(mm, start, end):
+        if name == path[0]:
+            if len(path) == 1:
+                return payload, atom_end
+            return _find_atom(mm, payload, atom_end, *path[1:])
+
+    return None
+
+
+def _scan_m4a(mm: mmap.mmap) -> Tuple[_Raw, _Picture, float]:
+    moov = _find_atom(mm, 0, len(mm), b"moov")
+    if not moov:
+        raise _ScanError("not a MP4 file")
+
+    # length of the first audio track
+    duration = None
+    for name, payload, end in _atoms(mm, *moov):
+        if name != b"trak":
+            continue
+
+        hdlr = _find_atom(mm, payload, end, b"mdia", b"hdlr")
+        if not hdlr or mm[hdlr[0] + 8:hdlr[0] + 12] != b"soun":
+            continue
+
+        mdhd = _find_atom(mm, payload, end, b"mdia", b"mdhd")
+        if not mdhd:
+            raise _ScanError("audio track has no header")
+
+        pos = mdhd[0]
+        if mm[pos] == 0:
+            unit, length = struct.unpack(">2I", mm[pos + 12:pos + 20])
+        elif mm[pos] == 1:
+            unit, length = struct.unpack(">IQ", mm[pos + 20:pos + 32])
+        else:
+            raise _ScanError("unknown mdhd version")
+
+        duration = length / unit if unit else 0.0
+        break
+
+    if duration is None:
+        raise _ScanError("MP4 file has no audio track")
+
+    tags: _Raw = {}
+    picture: _Picture = None
+
+    meta = _find_atom(mm, *moov, b"udta", b"meta")
+    # meta is full atom with 4 bytes of version and flags
+    ilst = _find_atom(mm, meta[0] + 4, meta[1], b"ilst") if meta else None
+
+    for name, payload, end in _atoms(mm, *ilst) if ilst else ():
+        key = _MP4_KEYS.get(name)
+        if not key and name != b"covr":
+            continue
+
+        for data_name, data, data_end in _atoms(mm, payload, end):
+            if data_name != b"data":
+                continue
+
+            kind = int.from_bytes(mm[data + 1:data + 4], "big")
+
+            if name == b"covr":
+                if not picture:
+                    mime = "image/png" if kind == 14 else "image/jpeg"
+                    picture = (mime, data + 8, data_end)
+            elif name in (b"trkn", b"disk"):
+                tags.setdefault(key, []).append(
+                    struct.unpack(">2H", mm[data + 10:data + 14]))
+            elif kind in (0, 1):
+                tags.setdefault(key, []).append(
+                    mm[data + 8:data_end].decode("utf-8"))
+            else:
+                raise _ScanError(f"unexpected data type of {key}")
+
+    for key in ("DISCNUMBER", "TRACKNUMBER"):
+        if key in tags:
+            tags[key] = tags[key][0]
+
+    return tags, picture, duration
+
+
+_SCANNERS: Dict[str, Callable[[mmap.mmap],
+                              Tuple[_Raw, _Picture, float]]] = {
+    ".mp3": _scan_mp3,
+    ".flac": _scan_flac,
+    ".m4a": _scan_m4a,
+}
+
+
+def scan(filename: Path) -> Optional[Dict[str, Any]]:
+    """Read tags and track length without mutagen.
+
+    Tags are processed in the same way as in
+    :meth:`wiki_music.library.tags_handler.tag_base.TagBase._read` so the
+    result is interchangeable with tags read by mutagen.
+
+    Parameters
+    ----------
+    filename: Path
+        path to music file
+
+    See also
+    --------
+    :func:`wiki_music.library.tags_io.read_tags`
+        uses the scanner when `fast` argument is True
+
+    Returns
+    -------
+    Optional[Dict[str, Any]]
+        dictionary of tag names and values extended with `DURATION` key,
+        None if the file could not be scanned and must be read by mutagen
+    """
+    scanner = _SCANNERS.get(filename.suffix)
+    if not scanner:
+        return None
+
+    try:
+        with filename.open("rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                memoryview(mm) as view:
+
+            raw, picture, duration = scanner(mm)
+            cover = _cover(view, filename, picture)
+    except (_ScanError, OSError, ValueError, struct.error, IndexError,
+            UnicodeDecodeError) as e:
+        log.debug(f"fast scan of {filename} failed: {e}")
+        return None
+
+    tags: Dict[str, Any] = {}
+    for name in _ID3_FRAMES.values():
+        tags[name] = TagBase._process_tag(
+            name, raw.get(name, TagBase._get_default_tag(name)))
+
+    tags["COVERART"] = cover
+    tags["DURATION"] = float(duration)
+
+    return tags
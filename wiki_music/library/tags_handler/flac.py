@@ -2,7 +2,7 @@
 
 import logging
 from collections import OrderedDict
-from typing import TYPE_CHECKING, Dict, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
 from mutagen.flac import FLAC, FLACNoHeaderError, Picture
 from mutagen.id3 import PictureType
@@ -11,6 +11,7 @@ from .tag_base import TagBase
 
 if TYPE_CHECKING:
     from pathlib import Path
+    from .cover_art import CoverArt
 
 log = logging.getLogger(__name__)
 log.debug("loading flac module")
@@ -52,10 +53,7 @@ class TagFlac(TagBase):
         for key, value in self._map_keys.items():  # pylint: disable=no-member
             try:
                 if key == "picture":
-                    try:
-                        tag = [self._song.pictures[0].data]
-                    except IndexError:
-                        raise KeyError("No cover art in file")
+                    tag = [self._get_cover_art()]
                 else:
                     tag = self._song.tags[key]
 
@@ -66,14 +64,30 @@ class TagFlac(TagBase):
 
         return tags
 
-    def _write(self, tag: str, value: Union[str, bytes]):
+    def _read_picture(self) -> Optional[Tuple[bytes, str]]:
+
+        try:
+            picture = self._song.pictures[0]
+        except (IndexError, AttributeError):
+            return None
+        else:
+            return picture.data, picture.mime
+
+    def _get_pictures(self) -> List[bytes]:
+        return [picture.data for picture in self._song.pictures]
+
+    def _set_pictures(self, pictures: List[bytes]):
+        for picture, data in zip(self._song.pictures, pictures):
+            picture.data = data
+
+    def _write(self, tag: str, value: Union[str, bytes, "CoverArt"]):
 
         if tag == "COVERART":
 
             pic = Picture()
             pic.type = PictureType.COVER_FRONT
             pic.mime = "image/jpeg"
-            pic.data = value
+            pic.data = bytes(value)
             pic.desc = "Front Cover"
 
             # first we have to delete previous pictures and then write new
@@ -2,7 +2,7 @@
 
 import logging
 from collections import OrderedDict
-from typing import TYPE_CHECKING, Dict, Union, cast
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union, cast
 
 from mutagen.mp4 import MP4, MP4Cover, MP4MetadataError
 
@@ -10,6 +10,7 @@ from .tag_base import TagBase
 
 if TYPE_CHECKING:
     from pathlib import Path
+    from .cover_art import CoverArt
 
 log = logging.getLogger(__name__)
 log.debug("loading m4a module")
@@ -50,7 +51,10 @@ class TagM4a(TagBase):
         tags = dict()
         for key, value in self._map_keys.items():  # pylint: disable=no-member
             try:
-                tag = self._song.tags[key]
+                if value == "COVERART":
+                    tag = [self._get_cover_art()]
+                else:
+                    tag = self._song.tags[key]
                 if value in ("DISCNUMBER", "TRACKNUMBER"):
                     tag = tag[0]
 
@@ -61,12 +65,37 @@ class TagM4a(TagBase):
 
         return tags
 
-    def _write(self, tag: str, value: Union[str, bytes]):
+    def _read_picture(self) -> Optional[Tuple[bytes, str]]:
+
+        try:
+            cover = self._song.tags["covr"][0]
+        except (KeyError, IndexError, TypeError):
+            return None
+        else:
+            if cover.imageformat == MP4Cover.FORMAT_PNG:
+                return bytes(cover), "image/png"
+            else:
+                return bytes(cover), "image/jpeg"
+
+    def _get_pictures(self) -> List[bytes]:
+        try:
+            return [bytes(cover) for cover in self._song.tags["covr"]]
+        except (KeyError, TypeError):
+            return []
+
+    def _set_pictures(self, pictures: List[bytes]):
+        # MP4Cover is immutable bytes subclass, covers must be recreated
+        if pictures:
+            self._song.tags["covr"] = [
+                MP4Cover(data, imageformat=cover.imageformat)
+                for cover, data in zip(self._song.tags["covr"], pictures)]
+
+    def _write(self, tag: str, value: Union[str, bytes, "CoverArt"]):
 
         if tag in ("DISCNUMBER", "TRACKNUMBER"):
             value = [[int(value), 0]]  # type: ignore
         elif tag == "COVERART":
             fmt = MP4Cover.FORMAT_JPEG
-            value = [MP4Cover(value, imageformat=fmt)]  # type: ignore
+            value = [MP4Cover(bytes(value), imageformat=fmt)]  # type: ignore
 
         self._song.tags[self._reverse_map[tag]] = value
@@ -3,15 +3,18 @@
 import logging
 from ast import literal_eval
 from collections import OrderedDict
-from typing import TYPE_CHECKING, Dict, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
+from mutagen import MutagenError
 from mutagen.id3 import (APIC, COMM, ID3, TALB, TCOM, TCON, TDRC, TIT2, TPE1,
                          TPE2, TPOS, TRCK, USLT, ID3NoHeaderError, PictureType)
+from mutagen.mp3 import MP3
 
 from .tag_base import TagBase
 
 if TYPE_CHECKING:
     from pathlib import Path
+    from .cover_art import CoverArt
 
 log = logging.getLogger(__name__)
 log.debug("loading mp3 module")
@@ -47,6 +50,20 @@ class TagMp3(TagBase):
             log.warning("Cannot read Mp3 tags")
             log.debug(e)
 
+    @property
+    def duration(self) -> float:
+        """Track length in seconds, 0 if it cannot be determined.
+
+        ID3 class does not parse audio stream so the file has to be opened as
+        MP3 to get the length.
+
+        :type: float
+        """
+        try:
+            return float(MP3(self._filename).info.length)
+        except MutagenError:
+            return 0.0
+
     @staticmethod
     def _key2str(key):
         """From string like <class 'mutagen.id3.TCOM'> get the name TCOM.
@@ -63,13 +80,20 @@ class TagMp3(TagBase):
         tags = dict()
         for key, value in self._map_keys.items():  # pylint: disable=no-member
             frame = self._song.getall(self._key2str(key))
+            if value == "COMMENT":
+                # comments with description are written by other programs
+                # e.g. iTunNORM, those are not meant for user
+                frame = [f for f in frame if not f.desc]
             try:
                 if value == "COVERART":
-                    tag = frame[0].data
+                    tag = [self._get_cover_art()]
                 else:
                     tag = frame[0].text
                     if value == "LYRICS":
                         tag = [tag]
+                    elif value == "DATE":
+                        # convert from ID3TimeStamp
+                        tag = [str(t) for t in tag]
 
             except IndexError:
                 tag = self._get_default_tag(value)
@@ -78,20 +102,37 @@ class TagMp3(TagBase):
 
         return tags
 
-    def _write(self, tag: str, value: Union[str, bytes]):
+    def _read_picture(self) -> Optional[Tuple[bytes, str]]:
+
+        try:
+            frame = self._song.getall("APIC")[0]
+        except (IndexError, AttributeError):
+            return None
+        else:
+            return frame.data, frame.mime
+
+    def _get_pictures(self) -> List[bytes]:
+        return [frame.data for frame in self._song.getall("APIC")]
+
+    def _set_pictures(self, pictures: List[bytes]):
+        for frame, data in zip(self._song.getall("APIC"), pictures):
+            frame.data = data
+
+    def _write(self, tag: str, value: Union[str, bytes, "CoverArt"]):
 
         if tag == "COVERART":
-            try:
-                self._song[self._reverse_map[tag]](
-                    mime=u"image/jpeg", type=PictureType.COVER_FRONT,
-                    desc=u"Cover", data=value, encoding=3)
-            except KeyError:
-                self._song.add(self._reverse_map[tag](
-                    mime=u"image/jpeg", type=PictureType.COVER_FRONT,
-                    desc=u"Cover", data=value, encoding=3))
-                log.warning(f"Couldn't find tag {tag}: "
-                            f"{self._reverse_map[tag]}")
+            # first we have to delete previous pictures and then write new,
+            # otherwise picture with different description is kept first
+            self._song.delall(self._key2str(self._reverse_map[tag]))
+            self._song.add(self._reverse_map[tag](
+                mime=u"image/jpeg", type=PictureType.COVER_FRONT,
+                desc=u"Cover", data=bytes(value), encoding=3))
         else:
+            # lyrics frames are keyed also by language and description,
+            # delete the old ones so new lyrics are not added beside them
+            if tag == "LYRICS":
+                self._song.delall(self._key2str(self._reverse_map[tag]))
+
             # if tag is not present add it
             try:
                 self._song[self._reverse_map[tag]](encoding=3, text=value)
@@ -4,23 +4,65 @@ import collections
 import logging
 import re
 from abc import ABC, abstractmethod
-from typing import (ClassVar, Dict, List, Optional, Union, Callable,
-                    TYPE_CHECKING)
-from wiki_music.constants.tags import LIST_TAGS
+from pathlib import Path
+from typing import (Any, BinaryIO, ClassVar, Dict, List, Optional, Tuple,
+                    Union, Callable, TYPE_CHECKING)
+from wiki_music.constants.tags import LIST_TAGS, TAG_PADDING
+from wiki_music.utilities import ImageStore, IniSettings
+
+from .cache import TagCache
+from .cover_art import CoverArt
 
 if TYPE_CHECKING:
-    from pathlib import Path
+    from mutagen._tags import PaddingInfo
 
 
-logging.getLogger(__name__)
+log = logging.getLogger(__name__)
 
 __all__ = ["TagBase"]
 
 
+def _normalize(key: str, value: Any) -> Any:
+    """Convert tag value to canonical form used to detect real changes.
+
+    Lists and comma separated strings are compared as tuples of stripped
+    values, as this is how they are written to files. Binary data are
+    compared by digest so the comparison does not need to load images.
+
+    Parameters
+    ----------
+    key: str
+        tag name
+    value: Any
+        tag value
+
+    Returns
+    -------
+    Any
+        hashable canonical value
+    """
+    if isinstance(value, CoverArt):
+        return value.digest
+    elif isinstance(value, (bytes, bytearray)):
+        return ImageStore.digest(value) if value else ""
+    elif value is None:
+        value = ""
+
+    if isinstance(value, list) or key in LIST_TAGS:
+        if not isinstance(value, list):
+            value = [value]
+        values = [v.strip() for val in value for v in str(val).split(",")]
+        return tuple(v for v in values if v)
+    else:
+        return str(value).strip()
+
+
 class SelectiveDict(dict):
     """A subclass of a dictionary which remembers which keys are being changed.
 
-    Behaviur is archieved by simply overriding the __setitem__ method.
+    Behaviur is archieved by simply overriding the __setitem__ method. Only
+    assignments that actually change tag value, as it would be written to
+    file, are recorded.
 
     Attributes
     ----------
@@ -47,7 +89,7 @@ class SelectiveDict(dict):
         except KeyError:
             self.writable.add(key)
         else:
-            if old_val != val:
+            if _normalize(key, old_val) != _normalize(key, val):
                 self.writable.add(key)
         finally:
             super().__setitem__(key, val)
@@ -65,12 +107,42 @@ class SelectiveDict(dict):
     def to_dict(self):
         """Cast contents of selective dict to dict.
 
+        Lists are copied so changing the returned values cannot change the
+        tags of cached handler.
+
         Returns
         -------
         dict
             tags dictionary
         """
-        return dict(self)
+        return {k: list(v) if isinstance(v, list) else v
+                for k, v in self.items()}
+
+
+class _WriteCounter:
+    """Wraps binary file object and counts bytes written through it.
+
+    Parameters
+    ----------
+    fileobj: BinaryIO
+        file opened for reading and writing
+
+    Attributes
+    ----------
+    written: int
+        number of bytes written to file
+    """
+
+    def __init__(self, fileobj: BinaryIO) -> None:
+        self._fileobj = fileobj
+        self.written = 0
+
+    def write(self, data: bytes) -> int:
+        self.written += len(data)
+        return self._fileobj.write(data)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._fileobj, name)
 
 
 class TagBase(ABC):
@@ -82,10 +154,16 @@ class TagBase(ABC):
         a maping between highlevel tag names and lowlevel tag names used by
         mutagen impementation of tags for specific file type
     _reverse_map: dict
-        reversed `_map_keys` dictionary
+        reversed `_map_keys` dictionary, computed once for each subclass
+    _stripped: Optional[List[str]]
+        digests of picture payloads moved to image store while the handler
+        is cached, None if the pictures are in place
     _tags: Selective_dict
         private attribute which caches the read tags and records any occuring
         changes, it is exposed in class API through tags property
+    bytes_rewritten: Optional[int]
+        estimated number of bytes written to disk by the last :meth:`save`,
+        None if the file was not saved
 
     See also
     --------
@@ -103,33 +181,168 @@ class TagBase(ABC):
 
     __doc__: Optional[str]
     _map_keys: ClassVar[Dict[str, str]]
-    _reverse_map: Dict[str, Union[str, Callable]]
+    _reverse_map: ClassVar[Dict[str, Union[str, Callable]]]
     _tags: SelectiveDict
+    _stripped: Optional[List[str]]
+    bytes_rewritten: Optional[int]
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._reverse_map = cls._get_reversed(cls._map_keys)
 
     def __init__(self, filename: "Path") -> None:
 
         self._song = None
         self._tags = None
-
-        self._reverse_map = self._get_reversed(self._map_keys)
+        self._stripped = None
+        self._filename = filename
+        self.bytes_rewritten = None
 
         self._open(filename)
 
-    def save(self):
-        """Write tags to song file and than save to disk."""
-        for tag, value in self._tags.save_items():
+    def _padding(self, info: "PaddingInfo") -> int:
+        """Choose amount of padding left after the tags when saving.
+
+        Existing padding is always kept if the new tags fit in, so the tags
+        are rewritten in place. If the tags have grown over the available
+        padding, the whole file must be rewritten anyway, so generous
+        padding is reserved to make the future edits fit in place.
+
+        See also
+        --------
+        :const:`wiki_music.constants.tags.TAG_PADDING`
+            default padding size which can be overridden by `tag_padding`
+            setting
+
+        Parameters
+        ----------
+        info: PaddingInfo
+            mutagen padding information
+
+        Returns
+        -------
+        int
+            padding size in bytes
+        """
+        if info.padding >= 0:
+            return info.padding
+        else:
+            return max(IniSettings.read("tag_padding", TAG_PADDING, int),
+                       info.get_default_padding())
+
+    def save(self) -> bool:
+        """Write changed tags to song file and than save to disk.
+
+        If no tag value has changed the file is not touched at all. Tags are
+        saved with padding which allows later changes to be written in place,
+        see :meth:`_padding`. Number of bytes written is stored in
+        :attr:`bytes_rewritten`.
+
+        Returns
+        -------
+        bool
+            True if the file was saved
+        """
+        if not self._tags or not self._tags.writable:
+            log.debug(f"no tags changed in {self._filename}")
+            return False
+
+        # file has not changed since the handler was cached, so if the
+        # pictures are no longer in image store it can be simply reopened
+        if not self._restore_pictures():
+            self._open(self._filename)
+
+        try:
+            for tag, value in self._tags.save_items():
+
+                # lists must joined before writing,
+                # otherwise results are inconsistent
+                if isinstance(value, list):
+                    if len(value) == 1:
+                        value = value[0]
+                    else:
+                        value = ", ".join(value)
+
+                self._write(tag, value)
+
+            with Path(self._filename).open("rb+") as f:
+                counter = _WriteCounter(f)
+                self._song.save(counter, padding=self._padding)
+        except Exception:
+            # handler holds tags that were not written, do not reuse it
+            TagCache.discard(self._filename)
+            raise
+
+        self._tags.writable.clear()
 
-            # lists must joined before writing,
-            # otherwise results are inconsistent
-            if isinstance(value, list):
-                if len(value) == 1:
-                    value = value[0]
-                else:
-                    value = ", ".join(value)
+        self.bytes_rewritten = counter.written
+        log.debug(f"rewritten {self.bytes_rewritten} bytes of "
+                  f"{self._filename}")
 
-            self._write(tag, value)
+        # handler is up to date with the file, so it can be reused
+        TagCache.put(self)
 
-        self._song.save()
+        return True
+
+    def _strip_pictures(self):
+        """Move picture payloads to image store to save memory.
+
+        See also
+        --------
+        :meth:`_restore_pictures`
+            puts the pictures back
+        """
+        if self._stripped is not None or not self._song:
+            return
+
+        pictures = self._get_pictures()
+        self._stripped = [ImageStore.put(p) for p in pictures]
+        self._set_pictures([bytes()] * len(pictures))
+
+    def _restore_pictures(self) -> bool:
+        """Put back picture payloads moved to image store.
+
+        Returns
+        -------
+        bool
+            False if some picture is missing in image store
+        """
+        if self._stripped is None:
+            return True
+
+        pictures = [ImageStore.get(d) for d in self._stripped]
+        self._stripped = None
+
+        if any(p is None for p in pictures):
+            log.warning(f"Pictures of {self._filename} are missing in image "
+                        f"store")
+            return False
+
+        self._set_pictures(pictures)  # type: ignore
+        return True
+
+    @abstractmethod
+    def _get_pictures(self) -> List[bytes]:
+        """Get payloads of all pictures embedded in file.
+
+        Returns
+        -------
+        List[bytes]
+            picture data in order in which they are stored in file
+        """
+        raise NotImplementedError("Call to abstarct method!")
+
+    @abstractmethod
+    def _set_pictures(self, pictures: List[bytes]):
+        """Replace payloads of all pictures embedded in file.
+
+        Parameters
+        ----------
+        pictures: List[bytes]
+            picture data in the same order as returned by
+            :meth:`_get_pictures`
+        """
+        raise NotImplementedError("Call to abstarct method!")
 
     @abstractmethod
     def _read(self):
@@ -145,6 +358,32 @@ class TagBase(ABC):
         """
         raise NotImplementedError("Call to abstarct method!")
 
+    @abstractmethod
+    def _read_picture(self) -> Optional[Tuple[bytes, str]]:
+        """Reads the first picture embedded in file.
+
+        Returns
+        -------
+        Optional[Tuple[bytes, str]]
+            picture data and its mime type or None if file has no picture
+        """
+        raise NotImplementedError("Call to abstarct method!")
+
+    def _get_cover_art(self) -> Union[CoverArt, bytes]:
+        """Create lightweight handle describing file cover art.
+
+        Returns
+        -------
+        Union[CoverArt, bytes]
+            cover art handle or empty bytes if file has no picture
+        """
+        picture = self._read_picture()
+
+        if picture:
+            return CoverArt.from_data(self._filename, *picture)
+        else:
+            return self._get_default_tag("COVERART")
+
     @abstractmethod
     def _write(self, tag, value):
         """Write single tag to file.
@@ -184,6 +423,17 @@ class TagBase(ABC):
 
         return self._tags
 
+    @property
+    def duration(self) -> float:
+        """Track length in seconds, 0 if it cannot be determined.
+
+        :type: float
+        """
+        try:
+            return float(self._song.info.length)
+        except AttributeError:
+            return 0.0
+
     @staticmethod
     def _get_reversed(map_keys: Dict[str, str]
                       ) -> Dict[str, Union[str, Callable]]:
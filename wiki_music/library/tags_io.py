@@ -49,9 +49,12 @@ def supported_tags():
 # TODO someting is wrong with m4a lyrics reading
 @exception(log)
 @warning(log)
-def write_tags(data: "SongDict"):
+def write_tags(data: "SongDict") -> bool:
     """Convenience function which takes care of writing data to tags.
 
+    Tags are compared with the ones already in file and only the changed ones
+    are written. If nothing has changed file is not saved at all.
+
     See also
     --------
     :const:`wiki_music.constants.tags.TAGS`
@@ -63,11 +66,18 @@ def write_tags(data: "SongDict"):
     ----------
     data: dict
         containes dictionary of tag names and coresponding values
+
+    Returns
+    -------
+    bool
+        True if the tags were written or were already up to date, False if
+        there is no file to write to. If writing fails None is returned by
+        the error handling decorators.
     """
     if not data["FILE"]:
         print(f"{data['TITLE']} {data['TYPE']}" + YELLOW +
               f"does not have matching file!")
-        return
+        return False
 
     try:
         song = tags_handler.File(data["FILE"])
@@ -75,45 +85,60 @@ def write_tags(data: "SongDict"):
         raise TagReadException(f"Couldn´t open file {data['FILE']} "
                                f"for writing")
     else:
-        print(GREEN + "Writing tags to:" + RESET, data["FILE"])
-
-        # preprocess data
-        if isinstance(data["ARTIST"], list):
-            data["ARTIST"].append(data["ALBUMARTIST"])
-        elif isinstance(data["ARTIST"], str):
-            # if the Artist field is not empty
-            if data["ARTIST"].strip():
-                data["ARTIST"] = [data["ALBUMARTIST"], data["ARTIST"]]
-            # if it is empty
+        try:
+            print(GREEN + "Writing tags to:" + RESET, data["FILE"])
+
+            # preprocess data
+            if isinstance(data["ARTIST"], list):
+                data["ARTIST"].append(data["ALBUMARTIST"])
+            elif isinstance(data["ARTIST"], str):
+                # if the Artist field is not empty
+                if data["ARTIST"].strip():
+                    data["ARTIST"] = [data["ALBUMARTIST"], data["ARTIST"]]
+                # if it is empty
+                else:
+                    data["ARTIST"] = [data["ALBUMARTIST"]]
             else:
-                data["ARTIST"] = [data["ALBUMARTIST"]]
-        else:
-            raise NotImplementedError("Unsupported data type for "
-                                      "ARTIST tag")
-
-        data["ARTIST"] = sorted(list(set(data["ARTIST"])))
-        if data["TYPE"]:
-            data["TITLE"] = f"{data['TITLE']} {data['TYPE']}"
-
-        # write tags, except file and type,
-        # these don't belong in music tags
-        for t in TAGS:
-            if t not in ("FILE", "TYPE"):
-                song.tags[t] = data[t]
-
-        song.tags["COMMENT"] = ""
+                raise NotImplementedError("Unsupported data type for "
+                                          "ARTIST tag")
+
+            data["ARTIST"] = sorted(list(set(data["ARTIST"])))
+            if data["TYPE"]:
+                data["TITLE"] = f"{data['TITLE']} {data['TYPE']}"
+
+            # write tags, except file and type,
+            # these don't belong in music tags
+            for t in TAGS:
+                if t not in ("FILE", "TYPE"):
+                    song.tags[t] = data[t]
+
+            song.tags["COMMENT"] = ""
+
+            try:
+                saved = song.save()
+            except (mutagen.MutagenError, TypeError, ValueError) as e:
+                raise TagSaveException(f'Couldn´t save file '
+                                       f'{data["FILE"]}: {e}')
+            else:
+                if saved:
+                    print(GREEN + "Tags written succesfully!" + RESET,
+                          f"({song.bytes_rewritten / 1024:.1f} kB "
+                          f"rewritten)")
+                else:
+                    print(YELLOW + "Tags are unchanged, file was not "
+                          "touched")
 
-        try:
-            song.save()
-        except (mutagen.MutagenError, TypeError, ValueError) as e:
-            raise TagSaveException(f'Couldn´t save file {data["FILE"]}: {e}')
-        else:
-            print(GREEN + "Tags written succesfully!")
+                return True
+        except Exception:
+            # handler is cached and may hold tags that were not written
+            tags_handler.TagCache.discard(data["FILE"])
+            raise
 
 
 @exception(log)
 @warning(log)
-def read_tags(song_file: Path) -> Dict[str, Union[str, list, bytes]]:
+def read_tags(song_file: Path, cover_art: bool = True, duration: bool = False,
+              fast: bool = False) -> Dict[str, Union[str, list, bytes]]:
     """Convenience function which takes care of reading tags from file.
 
     Abstracts away from low level mutagen API. If no tags are read, function
@@ -125,11 +150,21 @@ def read_tags(song_file: Path) -> Dict[str, Union[str, list, bytes]]:
         for list of supported tags
     :mod:`wiki_music.library.tags_handler`
         low level implemetation of tags handling built on mutagen library
+    :func:`wiki_music.library.tags_handler.fast_scan.scan`
+        read-only scanner used when `fast` is True
 
     Parameters
     ----------
     song_file: Path
         path to song on disk
+    cover_art: bool
+        if False, cover art is not returned which keeps the tags record
+        small, e.g. when it must be sent between processes
+    duration: bool
+        if True, track length in seconds is added under `DURATION` key
+    fast: bool
+        try to read the file with lightweight scanner first and fall back to
+        mutagen only if the scanner fails
 
     Returns
     -------
@@ -137,6 +172,19 @@ def read_tags(song_file: Path) -> Dict[str, Union[str, list, bytes]]:
         dictionary of tag labels with coresponding values if the file could be
         loaded. If not then the dictionary is empty
     """
+    if fast:
+        from .tags_handler.fast_scan import scan
+
+        scanned = scan(song_file)
+        if scanned is not None:
+            if not cover_art:
+                scanned.pop("COVERART", None)
+            if not duration:
+                scanned.pop("DURATION", None)
+            if not scanned["TITLE"]:
+                scanned["TITLE"] = _name2tag(song_file)
+            return scanned
+
     try:
         song = tags_handler.File(song_file)
     except mutagen.MutagenError:
@@ -147,6 +195,12 @@ def read_tags(song_file: Path) -> Dict[str, Union[str, list, bytes]]:
         # for writing tags
         tags = song.tags.to_dict()
 
+        if not cover_art:
+            tags.pop("COVERART", None)
+
+        if duration:
+            tags["DURATION"] = song.duration
+
         if not tags["TITLE"]:
             tags["TITLE"] = _name2tag(song_file)
     finally:
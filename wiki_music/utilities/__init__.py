@@ -10,5 +10,8 @@ from .sync import *
 from .utils import *
 from .wrappers import *
 from .getters import *
+from .journal import *
+from .image_store import *
+from .http_client import *
 
 logging.getLogger(__name__)
@@ -35,9 +35,17 @@ class GoogleApiKey:
     _api_key: Optional[str] = None
 
     @classmethod
-    def value(cls, GUI: bool) -> Optional[str]:
+    def value(cls, GUI: bool, prompt: bool = True) -> Optional[str]:
         """Reads google api key needed by lyricsfinder from file.
 
+        Parameters
+        ----------
+        GUI: bool
+            whether app is running in GUI mode
+        prompt: bool
+            if False user is never asked for the key, even if settings
+            allow it
+
         Returns
         -------
         Optional[str]
@@ -49,7 +57,9 @@ class GoogleApiKey:
                 cls._api_key = API_KEY_FILE.read_text("r").strip()
             except Exception:
                 cls._log.debug("api key not present in file")
-                if IniSettings.read("api_key_dont_bother", False):
+                if not prompt:
+                    return None
+                elif IniSettings.read("api_key_dont_bother", False):
                     cls._log.debug("will try to obtain api key from internet")
                     cls._api_key = cls.get(GUI)
                 else:
@@ -318,6 +328,8 @@ class NLTK(metaclass=_NltkMeta):
         else:
             t.run_serial()
 
+        t.results()
+
         # clear unnecessary files
         cls._download_postprocess(NLTK_DATA)
 
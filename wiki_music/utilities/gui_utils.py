@@ -3,19 +3,19 @@
 import io  # lazy loaded
 import logging
 import sys
-import urllib  # lazy loaded
-import winreg  # lazy loaded
-from http.client import HTTPException
 from pathlib import Path
-from typing import TYPE_CHECKING, BinaryIO, Optional, Tuple, Union, cast
+from typing import BinaryIO, Optional, Tuple, Union, cast
 
 import requests  # lazy loaded
 from PIL import Image, ImageFile  # lazy loaded
 
 from wiki_music.constants.paths import FILES_DIR
 
-if TYPE_CHECKING:
-    from http.client import HTTPResponse
+from .http_client import HttpClient
+
+# module exists only on windows
+if sys.platform.startswith("win32"):
+    import winreg  # lazy loaded
 
 log = logging.getLogger(__name__)
 
@@ -127,7 +127,7 @@ def get_image(address: Union["Path", str]) -> bytes:
         not valid
     """
     if isinstance(address, str):
-        return requests.get(address).content
+        return HttpClient.get(address).content
     else:
         # this is for offline debug when address is pathlib.Path instance
         try:
@@ -235,7 +235,7 @@ def get_sizes(uri: Union[str, Path]
         and dimensions tuple as a second element
     """
     # type anotation for fileobject
-    file_object: Union["HTTPResponse", BinaryIO]
+    file_object: BinaryIO
 
     if isinstance(uri, Path):
         try:
@@ -245,27 +245,38 @@ def get_sizes(uri: Union[str, Path]
             log.exception(f"Couldn't open cover art from disk -> {e}")
             return None, None
     else:
+        response = None
         try:
-            file_object = urllib.request.urlopen(uri)
-            size = file_object.headers.get("content-length")
-        except (HTTPException, urllib.error.HTTPError) as e:
+            # stream only the image header through pooled connection
+            response = HttpClient.get(uri, stream=True)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            # unread stream would keep the connection out of the pool
+            if response is not None:
+                response.close()
             log.exception(f"Couldn't open cover art from url -> {e}")
             return None, None
+        else:
+            response.raw.decode_content = True
+            file_object = cast(BinaryIO, response.raw)
+            size = response.headers.get("content-length")
 
     if size:
         size = int(size)
 
     p = ImageFile.Parser()
-    while True:
-        data = file_object.read(1024)
-        # if no data was recieved break out of the loop, without getting dims
-        if not data:
-            break
-        else:
-            p.feed(data)
-            if p.image:
-                return size, p.image.size
-
-    file_object.close()
+    try:
+        while True:
+            data = file_object.read(1024)
+            # if no data was recieved break out of the loop, without getting
+            # dims
+            if not data:
+                break
+            else:
+                p.feed(data)
+                if p.image:
+                    return size, p.image.size
+    finally:
+        file_object.close()
 
     return size, None
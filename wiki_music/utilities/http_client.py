@@ -0,0 +1,94 @@
+"""Shared HTTP session with connection pooling and retries."""
+
+import logging
+from threading import RLock
+from typing import Any, Optional
+
+import requests  # lazy loaded
+from requests.adapters import HTTPAdapter  # lazy loaded
+from urllib3.util.retry import Retry  # lazy loaded
+
+from wiki_music.constants import (HTTP_POOL_HOSTS, HTTP_POOL_SIZE,
+                                  HTTP_RETRIES, HTTP_TIMEOUT)
+
+log = logging.getLogger(__name__)
+
+__all__ = ["HttpClient"]
+
+
+class HttpClient:
+    """Holds one :class:`requests.Session` shared by the whole application.
+
+    Connections are kept alive in per-host pools, so repeated requests to
+    the same server, e.g. during lyrics or cover art search, do not pay for
+    new TCP and TLS handshake. Responses are gzip compressed when server
+    supports it. Requests have default timeout
+    :const:`wiki_music.constants.parser_const.HTTP_TIMEOUT` and idempotent
+    requests are retried with backoff on connection errors and on responses
+    indicating overloaded server. Session is created on first use.
+
+    Attributes
+    ----------
+    _session: Optional[requests.Session]
+        session shared by all threads
+    """
+
+    _lock: RLock = RLock()
+    _session: Optional[requests.Session] = None
+
+    @classmethod
+    def session(cls) -> requests.Session:
+        """Get shared session, create it if it does not exist yet.
+
+        Returns
+        -------
+        requests.Session
+            session with pooled connections
+        """
+        with cls._lock:
+            if not cls._session:
+                retry = Retry(total=HTTP_RETRIES, connect=HTTP_RETRIES,
+                              read=HTTP_RETRIES, backoff_factor=0.5,
+                              status_forcelist=(429, 502, 503, 504),
+                              allowed_methods=("GET", "HEAD"),
+                              raise_on_status=False)
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS,
+                                      pool_maxsize=HTTP_POOL_SIZE,
+                                      max_retries=retry)
+
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+
+                cls._session = session
+                log.debug("created shared http session")
+
+            return cls._session
+
+    @classmethod
+    def get(cls, url: str, **kwargs: Any) -> requests.Response:
+        """Send GET request through shared session.
+
+        Parameters
+        ----------
+        url: str
+            requested url
+        kwargs: Any
+            keyword arguments passed to :meth:`requests.Session.get`, timeout
+            defaults to :const:`wiki_music.constants.parser_const.HTTP_TIMEOUT`
+
+        Returns
+        -------
+        requests.Response
+            server response
+        """
+        kwargs.setdefault("timeout", HTTP_TIMEOUT)
+        return cls.session().get(url, **kwargs)
+
+    @classmethod
+    def close(cls):
+        """Close session and all pooled connections."""
+        with cls._lock:
+            if cls._session:
+                cls._session.close()
+                cls._session = None
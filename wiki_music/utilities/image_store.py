@@ -0,0 +1,225 @@
+"""Content addressed in-memory store for images with disk spill."""
+
+import logging
+import os  # lazy loaded
+from collections import OrderedDict
+from hashlib import sha1
+from pathlib import Path
+from threading import RLock
+from typing import Dict, List, Optional, Tuple
+
+from wiki_music.constants import IMAGE_STORE_DIR, IMAGE_STORE_MEMORY
+
+log = logging.getLogger(__name__)
+
+__all__ = ["ImageStore"]
+
+
+class ImageStore:
+    """Holds exactly one copy of each image, addressed by its sha1 digest.
+
+    Images are kept in memory until their total size exceeds
+    :const:`wiki_music.constants.parser_const.IMAGE_STORE_MEMORY`, after
+    that the least recently used ones are spilled to process own
+    subdirectory of :const:`wiki_music.constants.paths.IMAGE_STORE_DIR` and
+    loaded back on next access. Spilled images are deleted by
+    :func:`wiki_music.utilities.utils.exit_cleaner`, images of other running
+    instances are left alone. All methods are thread safe.
+
+    Attributes
+    ----------
+    _images: OrderedDict[str, bytes]
+        images held in memory in least recently used order
+    _spilling: Dict[str, bytes]
+        images removed from memory which are being written to disk
+    _size: int
+        total size of images in memory
+    """
+
+    _lock: RLock = RLock()
+    _images: "OrderedDict[str, bytes]" = OrderedDict()
+    _spilling: Dict[str, bytes] = {}
+    _size: int = 0
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        """Compute key under which the image is stored.
+
+        Parameters
+        ----------
+        data: bytes
+            image data
+
+        Returns
+        -------
+        str
+            sha1 hex digest of image
+        """
+        return sha1(data).hexdigest()
+
+    @staticmethod
+    def _directory() -> Path:
+        """Get directory to which this process spills images.
+
+        Returns
+        -------
+        Path
+            subdirectory of image store dir named by process id
+        """
+        return IMAGE_STORE_DIR / str(os.getpid())
+
+    @classmethod
+    def put(cls, data: bytes, digest: Optional[str] = None) -> str:
+        """Add image to store, identical image is stored only once.
+
+        Parameters
+        ----------
+        data: bytes
+            image data
+        digest: Optional[str]
+            precomputed digest of the data
+
+        Returns
+        -------
+        str
+            digest under which the image can be retrieved
+        """
+        if not digest:
+            digest = cls.digest(data)
+
+        with cls._lock:
+            if digest in cls._images:
+                cls._images.move_to_end(digest)
+                return digest
+
+            cls._images[digest] = bytes(data)
+            cls._size += len(data)
+            victims = cls._evict()
+
+        # disk writes do not block other threads
+        cls._spill(victims)
+
+        return digest
+
+    @classmethod
+    def get(cls, digest: str) -> Optional[bytes]:
+        """Get image from memory or disk.
+
+        Parameters
+        ----------
+        digest: str
+            image digest
+
+        Returns
+        -------
+        Optional[bytes]
+            image data or None if the image is not in store
+        """
+        with cls._lock:
+            try:
+                cls._images.move_to_end(digest)
+            except KeyError:
+                pass
+            else:
+                return cls._images[digest]
+
+            if digest in cls._spilling:
+                return cls._spilling[digest]
+
+        try:
+            data = (cls._directory() / digest).read_bytes()
+        except OSError:
+            return None
+        else:
+            cls.put(data, digest)
+            return data
+
+    @classmethod
+    def contains(cls, digest: str) -> bool:
+        """Check if image is in store.
+
+        Parameters
+        ----------
+        digest: str
+            image digest
+
+        Returns
+        -------
+        bool
+            True if image is held in memory or on disk
+        """
+        with cls._lock:
+            return (digest in cls._images or digest in cls._spilling or
+                    (cls._directory() / digest).is_file())
+
+    @classmethod
+    def _evict(cls) -> List[Tuple[str, bytes]]:
+        """Remove least recently used images until memory limit is met.
+
+        The most recently added image is always kept in memory. Must be
+        called with lock held.
+
+        Returns
+        -------
+        List[Tuple[str, bytes]]
+            digests and data of removed images, which must be passed to
+            :meth:`_spill`
+        """
+        victims = []
+        while cls._size > IMAGE_STORE_MEMORY and len(cls._images) > 1:
+            digest, data = cls._images.popitem(last=False)
+            cls._size -= len(data)
+            cls._spilling[digest] = data
+            victims.append((digest, data))
+
+        return victims
+
+    @classmethod
+    def _spill(cls, victims: List[Tuple[str, bytes]]):
+        """Write images removed from memory to disk.
+
+        Parameters
+        ----------
+        victims: List[Tuple[str, bytes]]
+            digests and data of images returned by :meth:`_evict`
+        """
+        directory = cls._directory()
+        for digest, data in victims:
+            path = directory / digest
+            try:
+                directory.mkdir(parents=True, exist_ok=True)
+                if not path.is_file():
+                    path.write_bytes(data)
+            except OSError as e:
+                log.warning(f"Could not spill image to disk: {e}")
+            else:
+                log.debug(f"spilled image {digest} to disk")
+            finally:
+                with cls._lock:
+                    cls._spilling.pop(digest, None)
+
+    @classmethod
+    def clear(cls):
+        """Remove all images from memory and images spilled by this process."""
+        with cls._lock:
+            cls._images.clear()
+            cls._spilling.clear()
+            cls._size = 0
+
+            directory = cls._directory()
+            if directory.is_dir():
+                for path in directory.iterdir():
+                    path.unlink()
+                directory.rmdir()
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        """Get store memory usage.
+
+        Returns
+        -------
+        Dict[str, int]
+            number of images and their total size held in memory
+        """
+        with cls._lock:
+            return {"images": len(cls._images), "size": cls._size}
@@ -0,0 +1,218 @@
+"""Append-only checkpoint journal used to resume interrupted batch runs."""
+
+import json  # lazy loaded
+import logging
+from hashlib import sha1
+from pathlib import Path
+from threading import RLock
+from time import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional
+
+from wiki_music.constants import JOURNAL_DIR
+
+if TYPE_CHECKING:
+    from typing_extensions import TypedDict
+
+    JournalEntry = TypedDict("JournalEntry", {"album": str, "stage": str,
+                                              "time": float,
+                                              "files": Dict[str, int],
+                                              "data": Any})
+
+log = logging.getLogger(__name__)
+
+__all__ = ["Journal"]
+
+
+class Journal:
+    """Records completion of album processing stages to a file on disk.
+
+    Each completed stage is appended to the journal as one JSON line, so the
+    file is never rewritten and a run killed at any moment (Ctrl-C, network
+    drop) loses at most the stage that was in progress. On restart, the
+    journal is replayed to memory and stages that are already done can be
+    skipped.
+
+    A stage can record modification times of files it produced. Such stage
+    is considered done only while all of those files stay unchanged on disk,
+    so files modified after the journal entry are processed again.
+
+    Parameters
+    ----------
+    path: Path
+        journal file location, it is created if it does not exist
+
+    Attributes
+    ----------
+    _entries: Dict[str, Dict[str, JournalEntry]]
+        latest entry for each album and stage replayed from the journal
+    """
+
+    _entries: Dict[str, Dict[str, "JournalEntry"]]
+
+    def __init__(self, path: Path) -> None:
+
+        self.path = path
+        self._lock = RLock()
+        self._entries = dict()
+
+        self._replay()
+
+    def _replay(self):
+        """Load entries already present in journal file to memory.
+
+        Lines that cannot be decoded, e.g. the last line of journal that was
+        being written when the run was killed, are skipped.
+        """
+        if not self.path.is_file():
+            return
+
+        with self.path.open("r", encoding="utf-8") as f:
+            for i, line in enumerate(f, 1):
+                try:
+                    entry = json.loads(line)
+                    album, stage = entry["album"], entry["stage"]
+                except (ValueError, KeyError, TypeError):
+                    log.warning(f"Skipping corrupted journal line {i} "
+                                f"in {self.path}")
+                else:
+                    self._entries.setdefault(album, dict())[stage] = entry
+
+        log.debug(f"replayed journal with {len(self._entries)} albums")
+
+    @classmethod
+    def for_directory(cls, directory: Path) -> "Journal":
+        """Open default journal of the music library directory.
+
+        Journal is kept in :const:`wiki_music.constants.paths.JOURNAL_DIR`
+        under name unique for each directory.
+
+        Parameters
+        ----------
+        directory: Path
+            resolved music library directory
+
+        Returns
+        -------
+        Journal
+            journal of the directory
+        """
+        name = sha1(str(directory).encode()).hexdigest()[:16]
+        return cls(JOURNAL_DIR / f"{name}.jsonl")
+
+    @staticmethod
+    def _mtimes(files: Iterable[Optional[Path]]) -> Dict[str, int]:
+        """Get modification times of existing files.
+
+        Parameters
+        ----------
+        files: Iterable[Optional[Path]]
+            files to stat, None values are skipped
+
+        Returns
+        -------
+        Dict[str, int]
+            file paths mapped to their modification times in nanoseconds
+        """
+        mtimes = dict()
+        for f in files:
+            if not f:
+                continue
+            try:
+                mtimes[str(f)] = Path(f).stat().st_mtime_ns
+            except OSError:
+                log.debug(f"cannot stat file {f}")
+
+        return mtimes
+
+    def record(self, album: str, stage: str,
+               files: Iterable[Optional[Path]] = (), data: Any = None):
+        """Append completed stage to journal and flush it to disk.
+
+        Parameters
+        ----------
+        album: str
+            unique album identifier
+        stage: str
+            name of the completed stage
+        files: Iterable[Optional[Path]]
+            files whose change should invalidate the stage
+        data: Any
+            json serializable stage results, that can be used to resume
+            processing from this stage
+        """
+        entry: "JournalEntry" = {"album": album, "stage": stage,
+                                 "time": time(), "files": self._mtimes(files),
+                                 "data": data}
+
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+
+            self._entries.setdefault(album, dict())[stage] = entry
+
+    def done(self, album: str, stage: str) -> bool:
+        """Check if stage is complete and its files have not changed since.
+
+        Parameters
+        ----------
+        album: str
+            unique album identifier
+        stage: str
+            name of the stage
+
+        Returns
+        -------
+        bool
+            True if stage can be skipped
+        """
+        with self._lock:
+            entry = self._entries.get(album, dict()).get(stage)
+
+        if not entry:
+            return False
+
+        files = entry["files"]
+        if self._mtimes(Path(f) for f in files) != files:
+            log.debug(f"files changed since {stage} stage for {album}")
+            return False
+
+        return True
+
+    def artifacts(self, album: str) -> Path:
+        """Directory for stage results too large to be kept in journal.
+
+        Directories are placed next to the journal file and named by hash of
+        the album identifier, so albums with the same title do not collide.
+
+        Parameters
+        ----------
+        album: str
+            unique album identifier
+
+        Returns
+        -------
+        Path
+            album artifacts directory, it is not created by this method
+        """
+        name = sha1(album.encode()).hexdigest()[:16]
+        return self.path.with_suffix("") / name
+
+    def data(self, album: str, stage: str) -> Any:
+        """Get data recorded with the stage.
+
+        Parameters
+        ----------
+        album: str
+            unique album identifier
+        stage: str
+            name of the stage
+
+        Returns
+        -------
+        Any
+            recorded data or None if the stage was not recorded
+        """
+        with self._lock:
+            return self._entries.get(album, dict()).get(stage, {}).get("data")
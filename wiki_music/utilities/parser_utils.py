@@ -2,21 +2,28 @@
 
 import collections  # lazy loaded
 import logging
+import os  # lazy loaded
 import sys
 import time  # lazy loaded
-from threading import Thread
-from queue import Queue, Empty
-from time import sleep
+from concurrent.futures import (Future, ProcessPoolExecutor,
+                                ThreadPoolExecutor, TimeoutError,
+                                as_completed, wait)
+from functools import partial
+from multiprocessing import get_context
+from threading import Lock, Thread
 from typing import (TYPE_CHECKING, Any, Callable, Dict, Generator, List,
                     Optional, Tuple, Union, Generator)
 
+import numpy as np
 import rapidfuzz.fuzz as fuzz  # lazy loaded
+import rapidfuzz.process as process  # lazy loaded
+from rapidfuzz.utils import default_process
 import json  # lazy loaded
 
-from wiki_music.constants import GREEN, RESET
+from wiki_music.constants import DEVICE_WORKERS, GREEN, MAX_WORKERS, RESET
 
 from .sync import ThreadPoolProgress
-from .utils import normalize
+from .utils import device_kind, normalize
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -26,7 +33,8 @@ log = logging.getLogger(__name__)
 __all__ = ["ThreadWithTrace", "bracket", "write_roman", "normalize",
            "normalize_caseless", "caseless_equal", "caseless_contains",
            "count_spaces", "json_dump", "complete_N_dim",
-           "delete_N_dim", "ThreadPool"]
+           "delete_N_dim", "ThreadPool", "ProcessPool", "DeviceThreadPool",
+           "score_matrix", "linear_assignment"]
 
 
 class ThreadWithTrace(Thread):
@@ -119,7 +127,12 @@ class ThreadWithReturn(Thread):
 
 
 class ThreadPool:
-    """Spawns pool of threads to excecute function.
+    """Executes function for each set of arguments in bounded pool of threads.
+
+    Work is distributed among at most `max_workers` threads regardless of the
+    number of tasks. Each submitted task is represented by a
+    :class:`concurrent.futures.Future` so results can be collected in order,
+    streamed as they complete or the remaining tasks cancelled.
 
     If the list of arguments contains only one tuple, run the function
     in the calling thread to avoid unnecessary overhead as a result of
@@ -130,61 +143,95 @@ class ThreadPool:
     target: Callable
         callable that each thread should run
     args: List[tuple]
-        each tuple in list contains args for one thread running target
+        each tuple in list contains args for one call of target
+    max_workers: Optional[int]
+        maximum number of threads running at once, if not specified
+        :const:`wiki_music.constants.parser_const.MAX_WORKERS` is used
+    progress: Optional[Callable[[int, int], Any]]
+        called with number of finished and total number of tasks each time
+        a task is finished, by default progress is reported to GUI through
+        :class:`wiki_music.utilities.sync.ThreadPoolProgress`
     """
 
-    def __init__(self, target: Callable[..., list] = lambda *args: [],
-                 args: List[tuple] = [tuple()]) -> None:
+    def __init__(self, target: Callable[..., Any] = lambda *args: [],
+                 args: List[tuple] = [tuple()],
+                 max_workers: Optional[int] = None,
+                 progress: Optional[Callable[[int, int], Any]] = None
+                 ) -> None:
 
         self._args = args
         self._target = target
+        self._max_workers = max_workers if max_workers else MAX_WORKERS
+        self._progress = progress if progress else self._report_progress
 
         # progress inform variables
         self._N_threads = len(self._args)
+        self._finished = 0
+        self._lock = Lock()
 
-        # return values
-        self._returns: Queue = Queue()
+        self._futures: List["Future"] = []
+        self._timeout: Optional[float] = None
 
-    def results(self) -> list:
+    @staticmethod
+    def _report_progress(actual: int, maximum: int):
+        ThreadPoolProgress(actual=actual, maximum=maximum)
 
-        return_list: List[Tuple[int, list]] = []
-        while self._returns.qsize() < self._N_threads:
-            sleep(0.1)
+    def _task_done(self, future: "Future", n_tasks: int = 1):
+        """Count finished tasks and report progress.
 
-        while len(return_list) < self._N_threads:
-            try:
-                return_list.append(self._returns.get_nowait())
-            except Empty:
-                sleep(0.1)
+        Parameters
+        ----------
+        future: Future
+            future of the finished task
+        n_tasks: int
+            number of tasks the future represents
+        """
+        if future.cancelled():
+            return
 
-        # first item is thread index second is return value of that thread
-        return [i[1] for i in sorted(return_list, key=lambda x: x[0])]
+        with self._lock:
+            self._finished += n_tasks
+            self._progress(self._finished, self._N_threads)
 
-    def _progress_tracker(self, index, *args, **kwargs):
-        """Wrap the callable passed to class constructor and report progress.
+    def results(self, timeout: Optional[float] = None) -> list:
+        """Wait for all tasks to finish and return their results.
 
         Parameters
         ----------
-        args: tuple
-            arguments needed by callable
-        kwargs: dict
-            keyword arguments needed by callable
-        """
-        response = self._target(*args, **kwargs)
+        timeout: Optional[float]
+            timeout after which waiting for results will be abandoned, if not
+            specified timeout passed to :meth:`run` is used
 
-        self._returns.put((index, response), block=True)
+        Raises
+        ------
+        concurrent.futures.TimeoutError
+            if tasks do not finish in time
+        concurrent.futures.CancelledError
+            if the tasks were cancelled
+        Exception
+            any exception raised by the target function is re-raised
+
+        Returns
+        -------
+        list
+            results in the same order as arguments passed to constructor
+        """
+        if timeout is None:
+            timeout = self._timeout
 
-        ThreadPoolProgress(actual=self._returns.qsize(),
-                           maximum=self._N_threads)
+        done, not_done = wait(self._futures, timeout=timeout)
+        if not_done:
+            raise TimeoutError(f"{len(not_done)} tasks have not finished "
+                               f"in {timeout} seconds")
 
-    def run(self, timeout: Optional[float] = 60, serial: bool = False):
-        """Starts the execution of threads in pool.
+        return [f.result() for f in self._futures]
 
-        Returns after all threads join() metod has returned.
+    def run(self, timeout: Optional[float] = None, serial: bool = False):
+        """Starts the execution of tasks in pool and returns immediately.
 
         Note
         ----
-        To get the result :meth:`results` must be called
+        To get the result :meth:`results` or :meth:`run_async` must be called
 
         See also
         --------
@@ -200,24 +247,27 @@ class ThreadPool:
         serial: bool
             run threadpool in orderly fasion, mainly for debugging
         """
+        self._timeout = timeout
+
         if serial or self._N_threads == 1:
             self.run_serial()
-
-        threads: List[Thread] = []
+            return
 
         log.debug("spawn threadpool threads")
 
-        for i, a in enumerate(self._args):
-            # add thread index as the first argument
-            a = (i, ) + a
-            threads.append(Thread(target=self._progress_tracker, args=a,
-                                  daemon=True, name=f"ThreadPoolWorker-{i}"))
-            threads[-1].start()
+        executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                      thread_name_prefix="ThreadPoolWorker")
+        for a in self._args:
+            self._futures.append(executor.submit(self._target, *a))
+            self._futures[-1].add_done_callback(self._task_done)
+
+        # threads exit as soon as all the tasks are done
+        executor.shutdown(wait=False)
 
         log.debug("threadpool is running")
 
     def run_serial(self):
-        """Starts the execution of threads in pool in serial fasion.
+        """Runs the tasks one after another in calling thread.
 
         Note
         ----
@@ -230,24 +280,25 @@ class ThreadPool:
         :meth:`results`
             holds results values from threadpool
         """
-        for i, a in enumerate(self._args):
-            self._progress_tracker(i, *a)
+        for a in self._args:
+            future: "Future" = Future()
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(self._target(*a))
+            except Exception as e:
+                future.set_exception(e)
+
+            self._futures.append(future)
+            self._task_done(future)
 
-    # TODO this is executed wrong, see run method
-    def run_async(self, timeout: Optional[float] = 60
+    def run_async(self, timeout: Optional[float] = None
                   ) -> Generator[Any, None, None]:
-        """Starts the execution of threads in pool. Returns asynchronously.
+        """Starts the execution of tasks in pool. Returns asynchronously.
 
-        This method yields resuls in order threds finish execution. Suitable
+        This method yields resuls in order tasks finish execution. Suitable
         for long running tasks. Results can be processed in main thread until
         other threads finish.
 
-        Note
-        ----
-        For this method to make sense, tasks need to be longer running,
-        and each should take at least slightly different time to complete and
-        the folowwing processing of the results must take some time too.
-
         See also
         --------
         :class:`wiki_music.utilities.sync.ThreadPoolProgress`
@@ -258,44 +309,169 @@ class ThreadPool:
         timeout: Optional[float]
             timeout after which waiting for results will be abandoned
 
+        Raises
+        ------
+        concurrent.futures.TimeoutError
+            if all tasks do not finish in time
+
         Yields
         ------
-        list
-            list of returned values from the functions run by the ThreadPool
+        Any
+            values returned by the function run by the ThreadPool
         """
-        N_threads = len(self._args)
+        if not self._futures:
+            self.run(timeout=timeout)
+
+        for future in as_completed(self._futures, timeout=timeout):
+            yield future.result()
+
+    def cancel(self) -> int:
+        """Cancel tasks that have not started running yet.
+
+        Returns
+        -------
+        int
+            number of cancelled tasks
+        """
+        return sum(f.cancel() for f in self._futures)
+
+
+def _run_chunk(target: Callable[..., Any], chunk: List[tuple]) -> list:
+    """Run target for each arguments tuple in chunk inside worker process.
+
+    Parameters
+    ----------
+    target: Callable[..., Any]
+        picklable callable, it must be defined at module level
+    chunk: List[tuple]
+        arguments tuples for target
+
+    Returns
+    -------
+    list
+        target return values in the same order as arguments
+    """
+    return [target(*a) for a in chunk]
+
+
+class ProcessPool(ThreadPool):
+    """Executes function for each set of arguments in pool of processes.
+
+    Suitable for CPU bound pure python work which does not scale with threads
+    because of the GIL. Arguments are split into chunks and each chunk is sent
+    to worker process at once to amortize inter process communication.
+    Target function and its arguments and results must be picklable.
+
+    Workers are started with `spawn` method so the pool is safe to use from
+    multithreaded GUI application on all platforms.
+
+    See also
+    --------
+    :class:`ThreadPool`
+
+    Parameters
+    ----------
+    target: Callable
+        callable that each process should run, must be defined at module
+        level
+    args: List[tuple]
+        each tuple in list contains args for one call of target
+    max_workers: Optional[int]
+        maximum number of processes, defaults to number of CPUs
+    progress: Optional[Callable[[int, int], Any]]
+        called with number of finished and total number of tasks each time
+        a chunk is finished
+    chunksize: Optional[int]
+        number of tasks sent to worker process at once, by default the tasks
+        are split to four chunks per worker
+    """
+
+    def __init__(self, target: Callable[..., Any] = lambda *args: [],
+                 args: List[tuple] = [tuple()],
+                 max_workers: Optional[int] = None,
+                 progress: Optional[Callable[[int, int], Any]] = None,
+                 chunksize: Optional[int] = None) -> None:
+
+        super().__init__(target=target, args=args,
+                         max_workers=max_workers if max_workers
+                         else os.cpu_count(), progress=progress)
 
-        if N_threads == 1:
-            ThreadPoolProgress(actual=1, maximum=1)
-            yield self._target(*self._args[0])
+        if not chunksize:
+            chunksize = -(-self._N_threads // (self._max_workers * 4))
+        self._chunksize = max(chunksize, 1)
+        self._chunked = False
+
+    def results(self, timeout: Optional[float] = None) -> list:
+        results = super().results(timeout=timeout)
+
+        if self._chunked:
+            return [r for chunk in results for r in chunk]
         else:
-            threads: List[ThreadWithReturn] = []
-
-            for i, a in enumerate(self._args):
-                threads.append(ThreadWithReturn(target=self._target, args=a,
-                                                name=f"ThreadPoolWorker-{i}"))
-                threads[-1].daemon = True
-                threads[-1].start()
-
-            # report progress to gui and yield values
-            count = 0
-            returned: set = set()
-            for _ in range(N_threads):
-
-                outer_break = False
-                while True:
-                    for i, t in enumerate(threads):
-                        if not t.is_alive() and i not in returned:
-                            count += 1
-                            returned.add(i)
-                            ThreadPoolProgress(actual=count, maximum=N_threads)
-                            outer_break = True
-                            break
-                    if outer_break:
-                        break
-                    sleep(0.001)
-
-                yield threads[i].join(timeout=timeout)
+            return results
+
+    results.__doc__ = ThreadPool.results.__doc__
+
+    def run(self, timeout: Optional[float] = None, serial: bool = False):
+        """Starts the execution of tasks in process pool.
+
+        Note
+        ----
+        To get the result :meth:`results` or :meth:`run_async` must be called
+
+        Parameters
+        ----------
+        timeout: Optional[float]
+            timeout after which waiting for results will be abandoned
+        serial: bool
+            run tasks in calling process, mainly for debugging
+        """
+        self._timeout = timeout
+
+        if serial or self._N_threads == 1:
+            self.run_serial()
+            return
+
+        log.debug("spawn processpool workers")
+
+        self._chunked = True
+        executor = ProcessPoolExecutor(max_workers=self._max_workers,
+                                       mp_context=get_context("spawn"))
+        for i in range(0, self._N_threads, self._chunksize):
+            chunk = self._args[i:i + self._chunksize]
+            self._futures.append(executor.submit(_run_chunk, self._target,
+                                                 chunk))
+            self._futures[-1].add_done_callback(
+                partial(self._task_done, n_tasks=len(chunk)))
+
+        # workers exit as soon as all the tasks are done
+        executor.shutdown(wait=False)
+
+        log.debug("processpool is running")
+
+    def run_async(self, timeout: Optional[float] = None
+                  ) -> Generator[Any, None, None]:
+        """Starts the execution of tasks in pool. Returns asynchronously.
+
+        Results are yielded in order in which chunks finish execution.
+
+        Parameters
+        ----------
+        timeout: Optional[float]
+            timeout after which waiting for results will be abandoned
+
+        Yields
+        ------
+        Any
+            values returned by the function run by the ProcessPool
+        """
+        if not self._futures:
+            self.run(timeout=timeout)
+
+        for future in as_completed(self._futures, timeout=timeout):
+            if self._chunked:
+                yield from future.result()
+            else:
+                yield future.result()
 
 
 def bracket(data: List[str]) -> List[str]:
@@ -458,6 +634,128 @@ def count_spaces(*lists: Tuple[List[str], ...]) -> Tuple[List[str], int]:
     return spaces, max_length
 
 
+def score_matrix(queries: List[str], choices: List[str],
+                 mask: Optional["np.ndarray"] = None) -> "np.ndarray":
+    """Compute similarity of all queries with all choices at once.
+
+    Strings are compared by :func:`rapidfuzz.fuzz.token_set_ratio` after
+    caseless normalization and rapidfuzz default processing. The whole
+    matrix is computed by :func:`rapidfuzz.process.cdist` in one call spread
+    over all CPU cores.
+
+    Parameters
+    ----------
+    queries: List[str]
+        strings for matrix rows
+    choices: List[str]
+        strings for matrix columns
+    mask: Optional[np.ndarray]
+        boolean matrix of pairs that should be compared, other pairs are
+        not scored and get 0
+
+    Returns
+    -------
+    np.ndarray
+        matrix of shape `(len(queries), len(choices))` with scores from 0
+        to 100
+    """
+    queries = [normalize_caseless(q) for q in queries]
+    choices = [normalize_caseless(c) for c in choices]
+
+    if not queries or not choices:
+        return np.zeros((len(queries), len(choices)))
+
+    scores = process.cdist(queries, choices, scorer=fuzz.token_set_ratio,
+                           processor=default_process, dtype=np.float64,
+                           workers=-1)
+    if mask is not None:
+        scores[~mask] = 0
+
+    return scores
+
+
+def linear_assignment(cost: "np.ndarray") -> Tuple["np.ndarray",
+                                                   "np.ndarray"]:
+    """Solve linear assignment problem with minimal total cost.
+
+    Hungarian algorithm with row and column potentials, runs in
+    O(n^2 m) for matrix with n <= m. Rectangular matrices are accepted, in
+    that case only the smaller dimension is fully assigned.
+
+    Parameters
+    ----------
+    cost: np.ndarray
+        2D matrix of finite assignment costs
+
+    Returns
+    -------
+    np.ndarray
+        assigned row indices in increasing order
+    np.ndarray
+        column indices assigned to the rows
+
+    Examples
+    --------
+    >>> linear_assignment(np.array([[4, 1, 3], [2, 0, 5], [3, 2, 2]]))
+    (array([0, 1, 2]), array([1, 0, 2]))
+    """
+    cost = np.asarray(cost, dtype=float)
+
+    if cost.ndim != 2:
+        raise ValueError("Cost matrix must be two dimensional")
+
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+
+    n, m = cost.shape
+    # potentials, rows and columns are indexed from 1, 0 is the sentinel
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    # row assigned to each column and the previous column on augmenting path
+    row_of = np.zeros(m + 1, dtype=int)
+    way = np.zeros(m + 1, dtype=int)
+
+    for i in range(1, n + 1):
+        row_of[0] = i
+        j0 = 0
+        min_v = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+
+        while row_of[j0]:
+            used[j0] = True
+            free = ~used[1:]
+            reduced = cost[row_of[j0] - 1] - u[row_of[j0]] - v[1:]
+
+            update = free & (reduced < min_v[1:])
+            min_v[1:][update] = reduced[update]
+            way[1:][update] = j0
+
+            candidates = np.where(free, min_v[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+
+            u[row_of[used]] += delta
+            v[used] -= delta
+            min_v[~used] -= delta
+            j0 = j1
+
+        # flip assignments along the augmenting path
+        while j0:
+            j1 = way[j0]
+            row_of[j0] = row_of[j1]
+            j0 = j1
+
+    cols = np.nonzero(row_of[1:])[0]
+    rows = row_of[1:][cols] - 1
+
+    if transposed:
+        rows, cols = cols, rows
+
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
 def json_dump(dict_data: List[Dict[str, str]], save_dir: "Path"):
     """Save json tracklist file to disk.
 
@@ -560,3 +858,170 @@ def delete_N_dim(to_delete: list, to_find: list) -> list:  # type: ignore
             return [td for td in to_delete if td not in to_find]
     else:
         return []
+
+
+class DeviceThreadPool(ThreadPool):
+    """Executes I/O bound function with concurrency limited for each device.
+
+    Tasks are grouped by storage device which holds their file and each
+    device gets its own pool of threads sized by the device kind, so e.g.
+    spinning disk is written by one thread at a time while SSD is written in
+    parallel. Within one device tasks are started in order of their paths
+    which keeps the disk head movement low. Completion of each task is
+    reported with file name, so the GUI can show which file is being worked
+    on and which have failed.
+
+    See also
+    --------
+    :class:`ThreadPool`
+    :func:`wiki_music.utilities.utils.device_kind`
+        detects device kind
+    :const:`wiki_music.constants.parser_const.DEVICE_WORKERS`
+        number of threads for each device kind
+
+    Parameters
+    ----------
+    target: Callable
+        callable that each thread should run, task that raises exception or
+        returns None is considered failed
+    args: List[tuple]
+        each tuple in list contains args for one call of target
+    paths: List[Optional[Path]]
+        file which each task works on, tasks without file run in separate
+        group limited by `max_workers`
+    max_workers: Optional[int]
+        maximum number of threads running for tasks without file, if not
+        specified :const:`wiki_music.constants.parser_const.MAX_WORKERS` is
+        used
+    progress: Optional[Callable[[int, int, str], Any]]
+        called with number of finished and total number of tasks and with
+        description of finished task each time a task is finished, by
+        default progress is reported to GUI through
+        :class:`wiki_music.utilities.sync.ThreadPoolProgress`
+    """
+
+    def __init__(self, target: Callable[..., Any] = lambda *args: [],
+                 args: List[tuple] = [tuple()],
+                 paths: List[Optional["Path"]] = [None],
+                 max_workers: Optional[int] = None,
+                 progress: Optional[Callable[[int, int, str], Any]] = None
+                 ) -> None:
+
+        super().__init__(target=target, args=args, max_workers=max_workers)
+
+        self._paths = paths
+        self._device_progress = (progress if progress
+                                 else self._report_device_progress)
+
+    @staticmethod
+    def _report_device_progress(actual: int, maximum: int, description: str):
+        ThreadPoolProgress(description=description, actual=actual,
+                           maximum=maximum)
+
+    def _task_done(self, future: "Future", n_tasks: int = 1,
+                   path: Optional["Path"] = None):
+        """Count finished tasks and report progress with task file name.
+
+        Parameters
+        ----------
+        future: Future
+            future of the finished task
+        n_tasks: int
+            number of tasks the future represents
+        path: Optional[Path]
+            file that the task worked on
+        """
+        if future.cancelled():
+            return
+
+        name = path.name if path else "task"
+        if future.exception() is not None or future.result() is None:
+            description = f"Failed: {name}"
+        else:
+            description = f"Done: {name}"
+
+        with self._lock:
+            self._finished += n_tasks
+            self._device_progress(self._finished, self._N_threads,
+                                  description)
+
+    def _groups(self) -> Dict[int, Tuple[int, List[int]]]:
+        """Sort task indices to groups by device.
+
+        Returns
+        -------
+        Dict[int, Tuple[int, List[int]]]
+            for each device number, the number of threads and indices of its
+            tasks ordered by path
+        """
+        groups: Dict[int, Tuple[int, List[int]]] = dict()
+
+        for i, path in enumerate(self._paths):
+            if path:
+                device, kind = device_kind(path)
+                workers = DEVICE_WORKERS[kind]
+            else:
+                device, workers = -1, self._max_workers
+
+            groups.setdefault(device, (workers, []))[1].append(i)
+
+        for _, indices in groups.values():
+            indices.sort(key=lambda i: str(self._paths[i] or ""))
+
+        return groups
+
+    def run(self, timeout: Optional[float] = None, serial: bool = False):
+        """Starts the execution of tasks in per device pools.
+
+        Note
+        ----
+        To get the result :meth:`results` or :meth:`run_async` must be called
+
+        Parameters
+        ----------
+        timeout: Optional[float]
+            timeout after which waiting for results will be abandoned
+        serial: bool
+            run tasks in calling thread, mainly for debugging
+        """
+        self._timeout = timeout
+
+        if serial or self._N_threads == 1:
+            self.run_serial()
+            return
+
+        futures: List[Optional["Future"]] = [None] * self._N_threads
+
+        for device, (workers, indices) in self._groups().items():
+            log.debug(f"writing {len(indices)} files on device {device} with "
+                      f"{workers} threads")
+
+            executor = ThreadPoolExecutor(max_workers=workers,
+                                          thread_name_prefix=f"Device{device}")
+            for i in indices:
+                futures[i] = executor.submit(self._target, *self._args[i])
+                futures[i].add_done_callback(  # type: ignore
+                    partial(self._task_done, path=self._paths[i]))
+
+            # threads exit as soon as all the tasks are done
+            executor.shutdown(wait=False)
+
+        self._futures = futures  # type: ignore
+
+    def run_serial(self):
+        """Runs the tasks one after another in calling thread.
+
+        Note
+        ----
+        To get the result :meth:`results` must be called
+        """
+        for a, path in zip(self._args, self._paths):
+            future: "Future" = Future()
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(self._target(*a))
+            except Exception as e:
+                future.set_exception(e)
+
+            self._futures.append(future)
+            self._task_done(future, path=path)
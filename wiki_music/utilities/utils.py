@@ -2,23 +2,30 @@
 
 import argparse  # lazy loaded
 import logging
+import os
 import re  # lazy loaded
 import signal
 import sys
 import unicodedata
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from itertools import chain
 from pathlib import Path
 from shutil import rmtree
 from time import sleep
-from typing import Any, List, Optional, Sized, Tuple, TypeVar, Union
+from typing import (Any, Dict, Generator, List, Optional, Set, Sized,
+                    Tuple, TypeVar, Union)
 
+from wiki_music.constants import MAX_WORKERS, NETWORK_FILESYSTEMS
+
+from .image_store import ImageStore
 from .sync import GuiLoggger
 
-logging.getLogger(__name__)
+log = logging.getLogger(__name__)
 
-__all__ = ["list_files", "to_bool", "normalize", "we_are_frozen",
-           "win_naming_convetion", "flatten_set", "input_parser", "MultiLog",
-           "limited_input", "set_signal_handler", "lrange", "exit_cleaner"]
+__all__ = ["list_files", "iter_files", "device_kind", "to_bool", "normalize",
+           "we_are_frozen", "win_naming_convetion", "flatten_set",
+           "input_parser", "MultiLog", "limited_input", "set_signal_handler",
+           "lrange", "exit_cleaner"]
 
 
 class MultiLog:
@@ -68,6 +75,156 @@ class MultiLog:
         GuiLoggger.exception(message)
 
 
+def _allowed_suffixes(file_type: str) -> Tuple[str, ...]:
+    """Get file name endings of files of given type.
+
+    Parameters
+    ----------
+    file_type: str
+        type of files to search
+
+    Raises
+    ------
+    NotImplementedError
+        if file_type is unsupported
+
+    Returns
+    -------
+    Tuple[str, ...]
+        allowed file extensions including the leading dot
+    """
+    allowed_types: Tuple[str, ...]
+
+    if file_type == "music":
+        # TODO list of files we aim to support:
+        # ("m4a", "mp3", "flac", "alac", "wav", "wma", "ogg")
+        allowed_types = ("m4a", "mp3", "flac")
+    elif file_type == "image":
+        allowed_types = ("jpg", "png")
+    else:
+        raise NotImplementedError(f"file type {file_type} is not supported")
+
+    return tuple(f".{t}" for t in allowed_types)
+
+
+def _scan_dir(directory: str, suffixes: Tuple[str, ...], recurse: bool
+              ) -> Tuple[List[Path], List[Tuple[str, Tuple[int, int]]]]:
+    """List one directory without descending to subdirectories.
+
+    Parameters
+    ----------
+    directory: str
+        directory to scan
+    suffixes: Tuple[str, ...]
+        allowed file extensions
+    recurse: bool
+        whether to collect subdirectories
+
+    Returns
+    -------
+    List[Path]
+        files in directory with allowed extensions
+    List[Tuple[str, Tuple[int, int]]]
+        subdirectories with their device and inode numbers
+    """
+    files: List[Path] = []
+    subdirs: List[Tuple[str, Tuple[int, int]]] = []
+
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    # filter by raw name first, so no Path object and no
+                    # stat call is needed for files that are not wanted
+                    if entry.name.endswith(suffixes) and entry.is_file():
+                        files.append(Path(entry.path))
+                    elif recurse and entry.is_dir():
+                        # DirEntry.stat does not fill inode on windows
+                        stat = os.stat(entry.path)
+                        subdirs.append((entry.path,
+                                        (stat.st_dev, stat.st_ino)))
+                except OSError as e:
+                    log.debug(f"skipping {entry.path}: {e}")
+    except OSError as e:
+        log.warning(f"Could not list directory {directory}: {e}")
+
+    return files, subdirs
+
+
+def iter_files(work_dir: Path, file_type: str = "music",
+               recurse: bool = True, max_workers: Optional[int] = None
+               ) -> Generator[Path, None, None]:
+    """Lazily find files in directory tree.
+
+    Subdirectories are listed in parallel and files are yielded as soon as
+    their directory is listed, so the processing can start before the whole
+    tree is walked, which matters mainly on network drives. Symbolic links
+    to directories are followed, each directory is visited only once so
+    link loops are harmless.
+
+    Parameters
+    ----------
+    work_dir: Path
+        directory to search
+    file_type: str
+        type of files to search
+    recurse: bool
+        whether to preform the search recursively
+    max_workers: Optional[int]
+        maximum number of directories listed at once, if None
+        :const:`wiki_music.constants.parser_const.MAX_WORKERS` is used
+
+    Raises
+    ------
+    NotImplementedError
+        if file_type is unsupported
+
+    Note
+    ----
+    Order of yielded files is not defined.
+
+    See also
+    --------
+    :func:`list_files`
+        sorted list of files
+
+    Yields
+    ------
+    Path
+        file in folder with specified file_type
+    """
+    suffixes = _allowed_suffixes(file_type)
+
+    try:
+        stat = os.stat(work_dir)
+    except OSError:
+        return
+
+    visited: Set[Tuple[int, int]] = {(stat.st_dev, stat.st_ino)}
+
+    with ThreadPoolExecutor(max_workers if max_workers else MAX_WORKERS,
+                            thread_name_prefix="DirWalker") as executor:
+        futures = {executor.submit(_scan_dir, str(work_dir), suffixes,
+                                   recurse)}
+
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                files, subdirs = future.result()
+
+                for directory, key in subdirs:
+                    if key in visited:
+                        log.debug(f"already visited {directory}")
+                        continue
+
+                    visited.add(key)
+                    futures.add(executor.submit(_scan_dir, directory,
+                                                suffixes, recurse))
+
+                yield from files
+
+
 def list_files(work_dir: Path, file_type: str = "music",
                recurse: bool = True) -> List[Path]:
     """List music files in directory.
@@ -92,33 +249,93 @@ def list_files(work_dir: Path, file_type: str = "music",
     supprted image formats are: .jpg, .png Qt library has trouble reading
     other formats.
 
+    See also
+    --------
+    :func:`iter_files`
+        generator which does the search
+
     Returns
     -------
     list
-        returns list of Path objects in folder with specified file_type
+        returns sorted list of Path objects in folder with specified file_type
     """
-    found_files: List[Path] = []
-    allowed_types: Tuple[str, ...]
+    return sorted(iter_files(work_dir, file_type=file_type, recurse=recurse))
+
+
+def _linux_device_kind(device: int) -> str:
+    """Find device kind from mount table and block device attributes."""
+    major, minor = os.major(device), os.minor(device)
+
+    try:
+        with open("/proc/self/mountinfo") as f:
+            for line in f:
+                fields = line.split()
+                if fields[2] == f"{major}:{minor}":
+                    fs_type = fields[fields.index("-") + 1]
+                    if fs_type in NETWORK_FILESYSTEMS:
+                        return "network"
+                    break
+    except (OSError, ValueError, IndexError):
+        pass
+
+    # partitions do not have queue attributes, they are on parent device
+    block = Path(f"/sys/dev/block/{major}:{minor}")
+    for queue in (block / "queue", block / ".." / "queue"):
+        try:
+            rotational = (queue / "rotational").read_text().strip()
+        except OSError:
+            continue
+        else:
+            return "hdd" if rotational == "1" else "ssd"
 
-    if file_type == "music":
-        # TODO list of files we aim to support:
-        # ("m4a", "mp3", "flac", "alac", "wav", "wma", "ogg")
-        allowed_types = ("m4a", "mp3", "flac")
-    elif file_type == "image":
-        allowed_types = ("jpg", "png")
-    else:
-        raise NotImplementedError(f"file type {file_type} is not supported")
+    return "unknown"
 
-    if recurse:
-        pattern = "**/*"  # glog recurse
+
+_DEVICE_KINDS: Dict[int, str] = {}
+
+
+def device_kind(path: Path) -> Tuple[int, str]:
+    """Identify storage device holding the path and guess its kind.
+
+    Kind is one of: `ssd`, `hdd`, `network` or `unknown`. It is detected
+    only on linux, on other platforms all devices are `unknown`.
+
+    See also
+    --------
+    :const:`wiki_music.constants.parser_const.DEVICE_WORKERS`
+        number of parallel writes allowed for each device kind
+
+    Parameters
+    ----------
+    path: Path
+        file or directory, if it does not exist its parent is used
+
+    Returns
+    -------
+    int
+        device number, -1 if the path and its parent do not exist
+    str
+        device kind
+    """
+    for p in (path, path.parent):
+        try:
+            device = os.stat(p).st_dev
+        except OSError:
+            continue
+        else:
+            break
     else:
-        pattern = "*"
+        return -1, "unknown"
+
+    if device not in _DEVICE_KINDS:
+        if sys.platform.startswith("linux"):
+            _DEVICE_KINDS[device] = _linux_device_kind(device)
+        else:
+            _DEVICE_KINDS[device] = "unknown"
 
-    for f in work_dir.glob(pattern):
-        if f.suffix.endswith(allowed_types):
-            found_files.append(f)
+        log.debug(f"device {device} is {_DEVICE_KINDS[device]}")
 
-    return found_files
+    return device, _DEVICE_KINDS[device]
 
 
 def to_bool(string: Union[str, bool]) -> bool:
@@ -245,7 +462,8 @@ def flatten_set(array: List[list]) -> set:
     return set(chain(*array))
 
 
-def input_parser() -> Tuple[bool, bool, bool, str, str, str, bool]:
+def input_parser() -> Tuple[bool, bool, bool, str, str, str, bool, bool,
+                            str, bool]:
     """Parse command line input parameters.
 
     Parameters
@@ -266,6 +484,8 @@ def input_parser() -> Tuple[bool, bool, bool, str, str, str, bool]:
         offline_debug switch to turn on offline debugging
     bool
         lyrics_only search only for lyrics switch
+    bool
+        lyrics_prefetch switch to search lyrics in advance
     str
         album name
     str
@@ -274,6 +494,10 @@ def input_parser() -> Tuple[bool, bool, bool, str, str, str, bool]:
         path to working directorym, default is current dir
     bool
         with_log switch on logging
+    bool
+        batch switch to run over whole library tree
+    str
+        path to batch run journal file
     bool
         true if logging level is debug
     """
@@ -291,7 +515,12 @@ def input_parser() -> Tuple[bool, bool, bool, str, str, str, bool]:
                         "web page?")
     parser.add_argument("-lo", "--lyrics_only",
                         action="store_true",
-                        help="Download only lyrics?")
+                        help="Download only lyrics missing in tags, "
+                        "together with --batch for the whole library tree?")
+    parser.add_argument("-lp", "--lyrics_prefetch",
+                        action="store_true",
+                        help="Start lyrics search as soon as tracklist is "
+                        "known?")
     parser.add_argument("-a", "--album",
                         default=None,
                         help="Album name",
@@ -309,6 +538,14 @@ def input_parser() -> Tuple[bool, bool, bool, str, str, str, bool]:
                         action="store_false",
                         help="Print loggning output, "
                         "applies only to console app")
+    parser.add_argument("-B", "--batch",
+                        action="store_true",
+                        help="Run non-interactively for every album in "
+                        "working directory tree, resuming interrupted run")
+    parser.add_argument("-jr", "--journal",
+                        default=None,
+                        help="Batch run checkpoint journal file",
+                        type=str)
     parser.add_argument("-d", "--debug",
                         default=False,
                         action="store_true",
@@ -359,10 +596,15 @@ def lrange(iterable: Sized) -> range:
 
 
 def exit_cleaner():
+    """Release resources held by the session when the program exits.
+
+    Images spilled to disk by
+    :class:`wiki_music.utilities.image_store.ImageStore` of this process are
+    deleted.
+    """
     # TODO use weakref to all threads
     # https://docs.python.org/3/library/weakref.html
-    print("TODO clean at exit")
-    
+    ImageStore.clear()
 
 
 def loading():